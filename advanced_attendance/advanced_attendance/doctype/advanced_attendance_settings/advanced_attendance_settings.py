@@ -0,0 +1,16 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt
+
+
+class AdvancedAttendanceSettings(Document):
+    def validate(self):
+        if self.enable_attendance_archive and cint(self.archive_after_months) < 1:
+            frappe.throw(_("Archive After (Months) must be at least 1"))
+
+        if self.enable_slow_save_profiling and not 0 < flt(self.profiling_sample_rate) <= 100:
+            frappe.throw(_("Sample Rate must be between 0 and 100 percent"))
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+
+class UnitTestAdvancedAttendanceSettings(UnitTestCase):
+    pass
+
+
+class IntegrationTestAdvancedAttendanceSettings(IntegrationTestCase):
+    pass
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AttendanceArchive(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("Attendance Archive", ["employee", "attendance_date"])
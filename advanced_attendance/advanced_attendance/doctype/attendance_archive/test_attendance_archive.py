@@ -0,0 +1,97 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import getdate
+
+from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+    get_summary_name
+)
+from advanced_attendance.archive import SETTINGS_DOCTYPE, archive_attendance, get_archived_through
+from advanced_attendance.tests.utils import count_attendance, make_attendance, make_test_employee
+
+CUTOFF = "2021-01-01"
+ARCHIVED_DATE = "2020-06-01"
+
+
+class UnitTestAttendanceArchive(UnitTestCase):
+    pass
+
+
+class IntegrationTestAttendanceArchive(IntegrationTestCase):
+    def setUp(self):
+        # Chunks are committed on their own, keep them inside the test transaction
+        patcher = patch.object(frappe.db, "commit")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        frappe.clear_document_cache(SETTINGS_DOCTYPE)
+        self.addCleanup(frappe.clear_document_cache, SETTINGS_DOCTYPE)
+
+        self.employee = make_test_employee("archive@example.com")
+
+    def test_closed_records_are_moved(self):
+        submitted = make_attendance(self.employee, ARCHIVED_DATE)
+        cancelled = make_attendance(self.employee, "2020-06-02")
+        cancelled.cancel()
+        kept = make_attendance(self.employee, CUTOFF)
+
+        self.assertEqual(archive_attendance(CUTOFF, chunk_size=1), 2)
+
+        self.assertFalse(frappe.db.exists("Attendance", submitted.name))
+        self.assertFalse(frappe.db.exists("Attendance", cancelled.name))
+        self.assertTrue(frappe.db.exists("Attendance", kept.name))
+        self.assertEqual(frappe.db.get_value("Attendance Archive", submitted.name, "source_docstatus"), 1)
+        self.assertEqual(frappe.db.get_value("Attendance Archive", cancelled.name, "source_docstatus"), 2)
+        self.assertEqual(get_archived_through(), getdate("2020-12-31"))
+
+    def test_drafts_in_the_period_block_archiving(self):
+        submitted = make_attendance(self.employee, ARCHIVED_DATE)
+        draft = make_attendance(self.employee, "2020-06-03", submit=False)
+
+        with self.assertRaises(frappe.ValidationError):
+            archive_attendance(CUTOFF)
+
+        self.assertTrue(frappe.db.exists("Attendance", submitted.name))
+        self.assertTrue(frappe.db.exists("Attendance", draft.name))
+        self.assertIsNone(get_archived_through())
+
+    def test_archived_days_can_not_be_written_again(self):
+        make_attendance(self.employee, ARCHIVED_DATE)
+        archive_attendance(CUTOFF)
+
+        # The live table no longer counts the archived record
+        with self.assertRaises(frappe.ValidationError):
+            make_attendance(self.employee, ARCHIVED_DATE)
+
+        self.assertEqual(count_attendance(self.employee, ARCHIVED_DATE), 0)
+
+    def test_links_and_summaries_follow_the_move(self):
+        attendance = make_attendance(self.employee, ARCHIVED_DATE)
+        checkin = frappe.get_doc({
+            "doctype": "Employee Checkin",
+            "employee": self.employee,
+            "time": f"{ARCHIVED_DATE} 09:00:00",
+            "log_type": "IN"
+        }).insert()
+        checkin.db_set("attendance", attendance.name)
+        summary_name = get_summary_name(self.employee, ARCHIVED_DATE)
+        self.assertTrue(frappe.db.exists("Attendance Day Summary", summary_name))
+
+        archive_attendance(CUTOFF)
+
+        self.assertIsNone(frappe.db.get_value("Employee Checkin", checkin.name, "attendance"))
+        self.assertEqual(
+            frappe.parse_json(frappe.db.get_value("Attendance Archive", attendance.name, "cleared_links")),
+            [{"doctype": "Employee Checkin", "fieldname": "attendance", "name": checkin.name}]
+        )
+        self.assertFalse(frappe.db.exists("Attendance Day Summary", summary_name))
+
+    def test_running_again_moves_nothing(self):
+        make_attendance(self.employee, ARCHIVED_DATE)
+
+        self.assertEqual(archive_attendance(CUTOFF), 1)
+        self.assertEqual(archive_attendance(CUTOFF), 0)
+        self.assertEqual(frappe.db.count("Attendance Archive", {"employee": self.employee}), 1)
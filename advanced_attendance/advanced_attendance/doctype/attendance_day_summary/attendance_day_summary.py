@@ -0,0 +1,258 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_days, cint, date_diff, flt, getdate, now
+
+from advanced_attendance.locks import get_read_committed_prefix, is_employee_day_locking_enabled
+
+# Final status of a day with several records: highest rank wins
+STATUS_RANKS = {
+    "Present": 5,
+    "Work From Home": 4,
+    "Half Day": 3,
+    "On Leave": 2,
+    "Absent": 1
+}
+
+# Days rebuilt per committed chunk
+REBUILD_CHUNK_DAYS = 7
+
+SUMMARY_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "employee",
+    "employee_name",
+    "company",
+    "attendance_date",
+    "status",
+    "record_count",
+    "overlap_count",
+    "additional_count",
+    "working_hours"
+]
+
+
+class AttendanceDaySummary(Document):
+    def autoname(self):
+        self.name = get_summary_name(self.employee, self.attendance_date)
+
+
+def on_doctype_update():
+    frappe.db.add_unique("Attendance Day Summary", ["employee", "attendance_date"])
+
+
+def get_summary_name(employee, attendance_date):
+    """One summary per employee-day, so the name is derived from both."""
+    return f"{employee}-{getdate(attendance_date)}"
+
+
+def get_final_status(rank):
+    """Status for the highest status rank found on a day."""
+    for status, status_rank in STATUS_RANKS.items():
+        if status_rank == cint(rank):
+            return status
+
+    return "Absent"
+
+
+def get_status_rank_expression():
+    cases = " ".join(f"when '{status}' then {rank}" for status, rank in STATUS_RANKS.items())
+    return f"max(case status {cases} else 0 end)"
+
+
+def get_day_aggregates(conditions, values, read_committed=False):
+    """
+    Aggregate submitted attendance per employee-day in one grouped query.
+
+    Args:
+        conditions: SQL conditions on tabAttendance
+        values: Query parameters
+        read_committed: Read the latest committed records instead of the
+            transaction's snapshot, without locking them
+    """
+    prefix = get_read_committed_prefix() if read_committed else ""
+
+    return frappe.db.sql(
+        f"""
+        {prefix}select
+            employee,
+            max(employee_name) as employee_name,
+            max(company) as company,
+            attendance_date,
+            count(*) as record_count,
+            sum(custom_overlap) as overlap_count,
+            sum(custom_additional_attendance) as additional_count,
+            sum(working_hours) as working_hours,
+            {get_status_rank_expression()} as status_rank
+        from `tabAttendance`
+        where docstatus = 1 and {conditions}
+        group by employee, attendance_date
+        """,
+        values,
+        as_dict=True
+    )
+
+
+def write_summaries(aggregates, upsert=False):
+    """
+    Write summary rows for aggregated employee-days in one batched statement.
+
+    Args:
+        aggregates: Rows from get_day_aggregates
+        upsert: Replace existing summaries of the same employee-days
+            instead of failing on their names
+    """
+    if not aggregates:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    values = [
+        (
+            get_summary_name(row.employee, row.attendance_date),
+            timestamp,
+            timestamp,
+            user,
+            user,
+            row.employee,
+            row.employee_name,
+            row.company,
+            row.attendance_date,
+            get_final_status(row.status_rank),
+            cint(row.record_count),
+            cint(row.overlap_count),
+            cint(row.additional_count),
+            flt(row.working_hours, 2)
+        )
+        for row in aggregates
+    ]
+
+    if upsert:
+        upsert_summaries(values)
+    else:
+        frappe.db.bulk_insert("Attendance Day Summary", SUMMARY_FIELDS, values)
+
+
+def upsert_summaries(values):
+    """Insert summary rows, updating the ones that already exist, in one statement."""
+    columns = ", ".join(f"`{field}`" for field in SUMMARY_FIELDS)
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(SUMMARY_FIELDS)) + ")"] * len(values))
+    updated = [field for field in SUMMARY_FIELDS if field not in ("name", "creation", "owner")]
+
+    if frappe.db.db_type == "postgres":
+        on_conflict = "on conflict (name) do update set " + ", ".join(
+            f"`{field}` = excluded.`{field}`" for field in updated
+        )
+    else:
+        on_conflict = "on duplicate key update " + ", ".join(
+            f"`{field}` = values(`{field}`)" for field in updated
+        )
+
+    frappe.db.sql(
+        f"insert into `tabAttendance Day Summary` ({columns}) values {placeholders} {on_conflict}",
+        [value for row in values for value in row]
+    )
+
+
+def refresh_day_summaries(keys):
+    """
+    Recompute the summaries of the given employee-days from submitted attendance.
+
+    Summaries are upserted, so concurrent refreshes of the same employee-day
+    never fail on its name; days left without submitted records lose their
+    summary. With employee-day locks enabled, writers of an employee-day
+    are serialized from validate to commit and the aggregates are read at
+    READ COMMITTED, so the last refresh always sees every record.
+    Without them, concurrent submits of one employee-day may leave a
+    summary missing the other record until it is rebuilt.
+
+    Args:
+        keys: Iterable of (employee, attendance_date)
+    """
+    keys = {(employee, str(getdate(attendance_date))) for employee, attendance_date in keys}
+    if not keys:
+        return
+
+    employees = sorted({employee for employee, _date in keys})
+    dates = sorted({attendance_date for _employee, attendance_date in keys})
+    aggregates = [
+        row
+        for row in get_day_aggregates(
+            "employee in %(employees)s and attendance_date between %(from_date)s and %(to_date)s",
+            {"employees": employees, "from_date": dates[0], "to_date": dates[-1]},
+            read_committed=is_employee_day_locking_enabled()
+        )
+        if (row.employee, str(getdate(row.attendance_date))) in keys
+    ]
+
+    write_summaries(aggregates, upsert=True)
+
+    written = {(row.employee, str(getdate(row.attendance_date))) for row in aggregates}
+    empty = [get_summary_name(employee, attendance_date) for employee, attendance_date in keys - written]
+    if empty:
+        frappe.db.delete("Attendance Day Summary", {"name": ["in", empty]})
+
+
+def update_day_summary(doc, method=None):
+    """Doc event hook: keep the employee-day summary in sync on submit and cancel."""
+    if doc.employee and doc.attendance_date:
+        refresh_day_summaries([(doc.employee, doc.attendance_date)])
+
+
+def rebuild_day_summaries(from_date, to_date, chunk_days=REBUILD_CHUNK_DAYS):
+    """
+    Rebuild all summaries for a date range from submitted attendance.
+
+    Works in chunks of days, each replaced with one delete, one grouped
+    query and one batched insert, and committed on its own.
+
+    Returns:
+        int: Number of summary rows written
+    """
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    chunk_days = cint(chunk_days) or REBUILD_CHUNK_DAYS
+    written = 0
+
+    chunk_start = from_date
+    while chunk_start <= to_date:
+        chunk_end = min(add_days(chunk_start, chunk_days - 1), to_date)
+
+        frappe.db.delete("Attendance Day Summary", {"attendance_date": ["between", [chunk_start, chunk_end]]})
+        aggregates = get_day_aggregates(
+            "attendance_date between %(from_date)s and %(to_date)s",
+            {"from_date": chunk_start, "to_date": chunk_end}
+        )
+        write_summaries(aggregates)
+        frappe.db.commit()
+
+        written += len(aggregates)
+        frappe.publish_progress(
+            (date_diff(chunk_end, from_date) + 1) * 100 / (date_diff(to_date, from_date) + 1),
+            title=_("Rebuilding Attendance Day Summary")
+        )
+        chunk_start = add_days(chunk_end, 1)
+
+    return written
+
+
+@frappe.whitelist()
+def rebuild_attendance_day_summary(from_date, to_date):
+    """Queue a rebuild of the Attendance Day Summary for a date range."""
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    if getdate(from_date) > getdate(to_date):
+        frappe.throw(_("From Date cannot be after To Date"))
+
+    frappe.enqueue(
+        "advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary.rebuild_day_summaries",
+        queue="long",
+        timeout=3600 * 4,
+        from_date=from_date,
+        to_date=to_date
+    )
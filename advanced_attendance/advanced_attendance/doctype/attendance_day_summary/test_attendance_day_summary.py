@@ -0,0 +1,48 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+    get_final_status,
+    get_summary_name
+)
+from advanced_attendance.tests.utils import make_attendance, make_test_employee
+
+
+class UnitTestAttendanceDaySummary(UnitTestCase):
+    def test_final_status_priority(self):
+        self.assertEqual(get_final_status(5), "Present")
+        self.assertEqual(get_final_status(2), "On Leave")
+        self.assertEqual(get_final_status(0), "Absent")
+
+    def test_summary_name_is_deterministic(self):
+        self.assertEqual(get_summary_name("HR-EMP-00001", "2026-01-05"), "HR-EMP-00001-2026-01-05")
+
+
+class IntegrationTestAttendanceDaySummary(IntegrationTestCase):
+    def test_summary_follows_submit_and_cancel(self):
+        employee = make_test_employee("day_summary@example.com")
+        attendance_date = add_days(nowdate(), -3)
+        summary_name = get_summary_name(employee, attendance_date)
+
+        first = make_attendance(employee, attendance_date, status="Present", working_hours=6)
+        second = make_attendance(
+            employee, attendance_date, status="Absent", custom_additional_attendance=1
+        )
+
+        summary = frappe.get_doc("Attendance Day Summary", summary_name)
+        self.assertEqual(summary.record_count, 2)
+        self.assertEqual(summary.additional_count, 1)
+        self.assertEqual(summary.status, "Present")
+        self.assertEqual(summary.working_hours, 6)
+
+        first.cancel()
+        summary.reload()
+        self.assertEqual(summary.record_count, 1)
+        self.assertEqual(summary.status, "Absent")
+
+        second.cancel()
+        self.assertFalse(frappe.db.exists("Attendance Day Summary", summary_name))
@@ -0,0 +1,2 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
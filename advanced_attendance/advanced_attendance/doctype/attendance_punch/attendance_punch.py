@@ -0,0 +1,14 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AttendancePunch(Document):
+    pass
+
+
+def on_doctype_update():
+    # Scan of pending punches by the coalescing worker
+    frappe.db.add_index("Attendance Punch", ["status", "employee", "punch_time"])
@@ -0,0 +1,114 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.punches import (
+    MAX_COALESCE_ATTEMPTS,
+    check_punch,
+    coalesce_pending_punches,
+    record_failed_attempt,
+    store_punches
+)
+from advanced_attendance.tests.utils import count_attendance, make_test_employee
+
+
+class UnitTestAttendancePunch(UnitTestCase):
+    def test_punch_shape_is_checked(self):
+        punch = {"idempotency_key": "k1", "employee": "HR-EMP-00001", "punch_time": "2026-01-05 09:00:00"}
+
+        self.assertIsNone(check_punch(punch))
+        self.assertTrue(check_punch(dict(punch, idempotency_key=None)))
+        self.assertTrue(check_punch(dict(punch, punch_time="not a time")))
+        self.assertTrue(check_punch(dict(punch, log_type="BREAK")))
+
+
+class IntegrationTestAttendancePunch(IntegrationTestCase):
+    def setUp(self):
+        # Chunks are committed on their own, keep them inside the test transaction
+        for method in ("commit", "rollback"):
+            patcher = patch.object(frappe.db, method)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.employee = make_test_employee("punches@example.com")
+        self.attendance_date = add_days(nowdate(), -2)
+
+    def punch(self, key, time, log_type):
+        return {
+            "idempotency_key": f"{self.employee}-{key}",
+            "employee": self.employee,
+            "punch_time": f"{self.attendance_date} {time}",
+            "log_type": log_type
+        }
+
+    def get_punch_statuses(self):
+        return frappe.get_all(
+            "Attendance Punch",
+            filters={"employee": self.employee},
+            fields=["idempotency_key", "status", "attempts"],
+            order_by="punch_time"
+        )
+
+    def test_retried_delivery_is_stored_once(self):
+        punches = [self.punch("in", "09:00:00", "IN"), self.punch("out", "17:00:00", "OUT")]
+
+        first = store_punches(punches)
+        retried = store_punches(punches + [self.punch("in", "09:00:00", "IN")])
+
+        self.assertEqual([result.status for result in first], ["accepted", "accepted"])
+        self.assertEqual([result.status for result in retried], ["duplicate", "duplicate", "duplicate"])
+        self.assertEqual(len(self.get_punch_statuses()), 2)
+
+    def test_coalescing_creates_one_record_per_session(self):
+        store_punches([self.punch("in", "09:00:00", "IN"), self.punch("out", "17:00:00", "OUT")])
+
+        coalesce_pending_punches()
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+        self.assertEqual({punch.status for punch in self.get_punch_statuses()}, {"Processed"})
+
+    def test_coalescing_again_adds_nothing(self):
+        punches = [self.punch("in", "09:00:00", "IN"), self.punch("out", "17:00:00", "OUT")]
+        store_punches(punches)
+        coalesce_pending_punches()
+
+        store_punches(punches)
+        coalesce_pending_punches()
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_second_session_of_a_day_is_flagged(self):
+        store_punches([
+            self.punch("in-1", "08:00:00", "IN"),
+            self.punch("out-1", "12:00:00", "OUT"),
+            self.punch("in-2", "13:00:00", "IN"),
+            self.punch("out-2", "17:00:00", "OUT")
+        ])
+
+        coalesce_pending_punches()
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 2)
+        self.assertEqual(
+            count_attendance(
+                self.employee, self.attendance_date, custom_overlap=0, custom_additional_attendance=0
+            ),
+            1
+        )
+
+    def test_punches_fail_after_max_attempts(self):
+        store_punches([self.punch("in", "09:00:00", "IN")])
+        names = frappe.get_all("Attendance Punch", filters={"employee": self.employee}, pluck="name")
+
+        for _attempt in range(MAX_COALESCE_ATTEMPTS - 1):
+            record_failed_attempt(names, "error")
+        self.assertEqual(self.get_punch_statuses()[0].status, "Pending")
+
+        record_failed_attempt(names, "error")
+        punch = self.get_punch_statuses()[0]
+        self.assertEqual(punch.status, "Failed")
+        self.assertEqual(punch.attempts, MAX_COALESCE_ATTEMPTS)
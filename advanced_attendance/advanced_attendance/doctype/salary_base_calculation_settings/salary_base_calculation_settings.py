@@ -4,6 +4,24 @@
 import frappe
 from frappe.model.document import Document
 
+from advanced_attendance.overrides.salary_structure_assignment import invalidate_base_settings
+from advanced_attendance.salary_base import enqueue_base_recompute
+
+# Fields that change the base of existing Salary Structure Assignments
+RECOMPUTE_FIELDS = ("enable_auto_base", "gross_divider", "default_min_base", "default_max_base")
+
 
 class SalaryBaseCalculationSettings(Document):
-    pass
+    def on_update(self):
+        """Recompute base of existing assignments when the calculation changes."""
+        # Drop the settings cached in every worker process
+        invalidate_base_settings()
+
+        if not self.enable_auto_base:
+            return
+
+        if any(self.has_value_changed(field) for field in RECOMPUTE_FIELDS):
+            # Submitted assignments only when explicitly requested
+            enqueue_base_recompute(
+                submitted_from=self.recompute_submitted_from if self.recompute_submitted_assignments else None
+            )
@@ -0,0 +1,81 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+import cProfile
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from advanced_attendance import profiler
+from advanced_attendance.metrics import get_query_count
+
+
+def make_settings(sample_rate=1, threshold_ms=0):
+    return frappe._dict(sample_rate=sample_rate, threshold_ms=threshold_ms)
+
+
+@profiler.profiled("test.profiled")
+def profiled_call(doc, value):
+    frappe.db.sql("select 1")
+    return value
+
+
+class UnitTestSlowSaveLog(UnitTestCase):
+    pass
+
+
+class IntegrationTestSlowSaveLog(IntegrationTestCase):
+    def test_not_sampled_call_is_not_profiled(self):
+        with (
+            patch.object(profiler, "get_profiling_settings", return_value=make_settings(sample_rate=0)),
+            patch.object(profiler, "log_slow_save") as log_slow_save
+        ):
+            self.assertEqual(profiled_call(None, 1), 1)
+
+        log_slow_save.assert_not_called()
+
+    def test_fast_call_is_not_logged(self):
+        with (
+            patch.object(profiler, "get_profiling_settings", return_value=make_settings(threshold_ms=60_000)),
+            patch.object(profiler, "log_slow_save") as log_slow_save
+        ):
+            self.assertEqual(profiled_call(None, 2), 2)
+
+        log_slow_save.assert_not_called()
+
+    def test_slow_call_is_logged_with_its_statements(self):
+        doc = frappe._dict(doctype="Attendance", name="HR-ATT-TEST-0001")
+        with (
+            patch.object(profiler, "get_profiling_settings", return_value=make_settings()),
+            patch.object(profiler, "log_slow_save") as log_slow_save
+        ):
+            self.assertEqual(profiled_call(doc, 3), 3)
+
+        name, logged_doc, _duration_ms, _profile, statements = log_slow_save.call_args.args
+        self.assertEqual(name, "test.profiled")
+        self.assertIs(logged_doc, doc)
+        self.assertIn("select 1", [query for query, _elapsed in statements])
+        self.assertFalse(frappe.local.slow_save_profiling)
+
+    def test_active_profiler_falls_back_to_unprofiled_call(self):
+        with (
+            patch.object(profiler, "get_profiling_settings", return_value=make_settings()),
+            patch.object(cProfile.Profile, "enable", side_effect=ValueError("Another profiling tool is already active")),
+            patch.object(profiler, "log_slow_save") as log_slow_save
+        ):
+            self.assertEqual(profiled_call(None, 4), 4)
+
+        log_slow_save.assert_not_called()
+
+    def test_query_count_survives_a_profiled_call(self):
+        with (
+            patch.object(profiler, "get_profiling_settings", return_value=make_settings()),
+            patch.object(profiler, "log_slow_save")
+        ):
+            before = get_query_count()
+            profiled_call(None, 5)
+
+        self.assertEqual(get_query_count(), before + 1)
+        frappe.db.sql("select 1")
+        self.assertEqual(get_query_count(), before + 2)
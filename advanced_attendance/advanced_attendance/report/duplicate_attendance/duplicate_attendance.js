@@ -0,0 +1,64 @@
+// Copyright (c) 2026, eng.khalidselim and contributors
+// For license information, please see license.txt
+
+frappe.query_reports['Duplicate Attendance'] = {
+    filters: [
+        {
+            fieldname: 'from_date',
+            label: __('From Date'),
+            fieldtype: 'Date'
+        },
+        {
+            fieldname: 'to_date',
+            label: __('To Date'),
+            fieldtype: 'Date'
+        },
+        {
+            fieldname: 'employee',
+            label: __('Employee'),
+            fieldtype: 'Link',
+            options: 'Employee'
+        },
+        {
+            fieldname: 'limit',
+            label: __('Maximum Rows'),
+            fieldtype: 'Select',
+            options: ['1000', '5000', '20000'],
+            default: '5000'
+        }
+    ],
+
+    onload: function(report) {
+        report.page.add_inner_button(__('Resolve Duplicates'), function() {
+            frappe.prompt([
+                {
+                    fieldname: 'action',
+                    label: __('Action'),
+                    fieldtype: 'Select',
+                    options: [
+                        {value: 'flag', label: __('Flag as Overlap / Additional Attendance')},
+                        {value: 'cancel', label: __('Cancel submitted, delete drafts')}
+                    ],
+                    default: 'flag',
+                    reqd: 1
+                }
+            ], function(values) {
+                frappe.call({
+                    method: 'advanced_attendance.duplicates.resolve_duplicate_attendance',
+                    args: {
+                        action: values.action,
+                        from_date: report.get_filter_value('from_date'),
+                        to_date: report.get_filter_value('to_date'),
+                        employee: report.get_filter_value('employee')
+                    },
+                    callback: function() {
+                        frappe.show_alert({
+                            message: __('Resolution queued. Records marked Keep are not changed.'),
+                            indicator: 'blue'
+                        });
+                    }
+                });
+            }, __('Resolve Duplicate Attendance'), __('Queue'));
+        });
+    }
+};
@@ -0,0 +1,64 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+from advanced_attendance.duplicates import count_duplicates, get_duplicate_query
+
+DEFAULT_LIMIT = 5000
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    validate_filters(filters)
+
+    limit = cint(filters.limit) or DEFAULT_LIMIT
+    data = get_data(filters, limit)
+
+    # Counted over the whole range, the rows shown may be truncated
+    counts = count_duplicates(filters.from_date, filters.to_date, filters.employee)
+    message = _("{0} duplicate employee-day(s), {1} record(s) proposed for resolution").format(
+        counts.days, counts.extra_records
+    )
+    if len(data) >= limit:
+        message += " " + _("Only the first {0} records are shown.").format(limit)
+
+    return get_columns(), data, message
+
+
+def validate_filters(filters):
+    if filters.from_date and filters.to_date and getdate(filters.from_date) > getdate(filters.to_date):
+        frappe.throw(_("From Date cannot be after To Date"))
+
+
+def get_columns():
+    return [
+        {"fieldname": "employee", "label": _("Employee"), "fieldtype": "Link", "options": "Employee", "width": 140},
+        {"fieldname": "employee_name", "label": _("Employee Name"), "fieldtype": "Data", "width": 180},
+        {"fieldname": "attendance_date", "label": _("Attendance Date"), "fieldtype": "Date", "width": 110},
+        {"fieldname": "name", "label": _("Attendance"), "fieldtype": "Link", "options": "Attendance", "width": 160},
+        {"fieldname": "document_status", "label": _("Document Status"), "fieldtype": "Data", "width": 110},
+        {"fieldname": "status", "label": _("Status"), "fieldtype": "Data", "width": 100},
+        {"fieldname": "creation", "label": _("Created On"), "fieldtype": "Datetime", "width": 160},
+        {"fieldname": "day_records", "label": _("Records on Day"), "fieldtype": "Int", "width": 110},
+        {"fieldname": "proposal", "label": _("Proposal"), "fieldtype": "Data", "width": 100}
+    ]
+
+
+def get_data(filters, limit):
+    """Every record of every duplicate employee-day, with the proposed action."""
+    query, values = get_duplicate_query(
+        filters.from_date,
+        filters.to_date,
+        filters.employee,
+        limit=limit
+    )
+
+    data = frappe.db.sql(query, values, as_dict=True)
+    for row in data:
+        row.document_status = _("Submitted") if row.docstatus == 1 else _("Draft")
+        row.proposal = _("Keep") if row.rank_in_day == 1 else _("Resolve")
+
+    return data
@@ -0,0 +1,65 @@
+// Copyright (c) 2026, eng.khalidselim and contributors
+// For license information, please see license.txt
+
+frappe.query_reports['Multi Attendance Analytics'] = {
+    filters: [
+        {
+            fieldname: 'from_date',
+            label: __('From Date'),
+            fieldtype: 'Date',
+            default: frappe.datetime.add_months(frappe.datetime.month_start(), -11),
+            reqd: 1
+        },
+        {
+            fieldname: 'to_date',
+            label: __('To Date'),
+            fieldtype: 'Date',
+            default: frappe.datetime.month_end(),
+            reqd: 1
+        },
+        {
+            fieldname: 'periodicity',
+            label: __('Periodicity'),
+            fieldtype: 'Select',
+            options: ['Monthly', 'Yearly'],
+            default: 'Monthly'
+        },
+        {
+            fieldname: 'company',
+            label: __('Company'),
+            fieldtype: 'Link',
+            options: 'Company'
+        },
+        {
+            fieldname: 'department',
+            label: __('Department'),
+            fieldtype: 'Link',
+            options: 'Department'
+        },
+        {
+            fieldname: 'employee',
+            label: __('Employee'),
+            fieldtype: 'Link',
+            options: 'Employee'
+        },
+        {
+            fieldname: 'page',
+            label: __('Page'),
+            fieldtype: 'Int',
+            default: 1
+        },
+        {
+            fieldname: 'page_length',
+            label: __('Rows per Page'),
+            fieldtype: 'Select',
+            options: ['100', '500', '1000', '5000'],
+            default: '500'
+        },
+        {
+            fieldname: 'include_archived',
+            label: __('Include Archived Attendance'),
+            fieldtype: 'Check',
+            default: 0
+        }
+    ]
+};
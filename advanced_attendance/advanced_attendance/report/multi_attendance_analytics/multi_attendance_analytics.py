@@ -0,0 +1,136 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+DEFAULT_PAGE_LENGTH = 500
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    validate_filters(filters)
+
+    # Frappe runs script reports through frappe.read_only, so they already
+    # read from the replica when read_from_replica is configured
+    data = get_data(filters)
+    set_employee_names(data)
+
+    message = _("Page {0}, showing {1} row(s)").format(cint(filters.page) or 1, len(data))
+    return get_columns(filters), data, message
+
+
+def validate_filters(filters):
+    if not filters.from_date or not filters.to_date:
+        frappe.throw(_("From Date and To Date are required"))
+
+    if getdate(filters.from_date) > getdate(filters.to_date):
+        frappe.throw(_("From Date cannot be after To Date"))
+
+
+def get_columns(filters):
+    return [
+        {"fieldname": "employee", "label": _("Employee"), "fieldtype": "Link", "options": "Employee", "width": 140},
+        {"fieldname": "employee_name", "label": _("Employee Name"), "fieldtype": "Data", "width": 180},
+        {"fieldname": "period", "label": _("Period"), "fieldtype": "Data", "width": 100},
+        {"fieldname": "multiple_days", "label": _("Days with Multiple Records"), "fieldtype": "Int", "width": 120},
+        {"fieldname": "overlap_days", "label": _("Days with Overlap"), "fieldtype": "Int", "width": 120},
+        {"fieldname": "additional_days", "label": _("Days with Additional Attendance"), "fieldtype": "Int", "width": 120},
+        {"fieldname": "total_records", "label": _("Records on Those Days"), "fieldtype": "Int", "width": 120},
+        {"fieldname": "overlap_records", "label": _("Overlap Records"), "fieldtype": "Int", "width": 120},
+        {"fieldname": "additional_records", "label": _("Additional Records"), "fieldtype": "Int", "width": 120}
+    ]
+
+
+def get_period_expression(periodicity):
+    if frappe.db.db_type == "postgres":
+        return "to_char(attendance_date, 'YYYY')" if periodicity == "Yearly" else "to_char(attendance_date, 'YYYY-MM')"
+
+    return "date_format(attendance_date, '%%Y')" if periodicity == "Yearly" else "date_format(attendance_date, '%%Y-%%m')"
+
+
+def get_source(filters):
+    """Attendance table, or Attendance together with archived attendance."""
+    if not cint(filters.include_archived):
+        return "`tabAttendance`"
+
+    columns = "employee, attendance_date, company, department, custom_overlap, custom_additional_attendance"
+    return f"""(
+            select {columns}, docstatus from `tabAttendance`
+            union all
+            select {columns}, source_docstatus as docstatus from `tabAttendance Archive`
+        ) attendance"""
+
+
+def get_conditions(filters):
+    conditions = ["docstatus != 2", "attendance_date between %(from_date)s and %(to_date)s"]
+
+    if filters.employee:
+        conditions.append("employee = %(employee)s")
+    if filters.company:
+        conditions.append("company = %(company)s")
+    if filters.department:
+        conditions.append("department = %(department)s")
+
+    return " and ".join(conditions)
+
+
+def get_data(filters):
+    """
+    One grouped aggregate query: employee-days with more than one record are
+    grouped per employee and period, then paginated on the server.
+    """
+    page = max(cint(filters.page), 1)
+    page_length = cint(filters.page_length) or DEFAULT_PAGE_LENGTH
+
+    values = dict(filters)
+    values.update(limit=page_length, offset=(page - 1) * page_length)
+
+    return frappe.db.sql(
+        f"""
+        select
+            employee,
+            period,
+            count(*) as multiple_days,
+            sum(case when overlap_records > 0 then 1 else 0 end) as overlap_days,
+            sum(case when additional_records > 0 then 1 else 0 end) as additional_days,
+            sum(records) as total_records,
+            sum(overlap_records) as overlap_records,
+            sum(additional_records) as additional_records
+        from (
+            select
+                employee,
+                {get_period_expression(filters.periodicity)} as period,
+                count(*) as records,
+                sum(custom_overlap) as overlap_records,
+                sum(custom_additional_attendance) as additional_records
+            from {get_source(filters)}
+            where {get_conditions(filters)}
+            group by employee, attendance_date
+            having count(*) > 1
+        ) employee_days
+        group by employee, period
+        order by employee, period
+        limit %(limit)s offset %(offset)s
+        """,
+        values,
+        as_dict=True
+    )
+
+
+def set_employee_names(data):
+    """Employee names for the current page only, in one query."""
+    employees = list({row.employee for row in data})
+    if not employees:
+        return
+
+    names = dict(frappe.get_all(
+        "Employee",
+        filters={"name": ["in", employees]},
+        fields=["name", "employee_name"],
+        as_list=True
+    ))
+
+    for row in data:
+        row.employee_name = names.get(row.employee)
@@ -0,0 +1,25 @@
+// Copyright (c) 2026, eng.khalidselim and contributors
+// For license information, please see license.txt
+
+frappe.query_reports['Salary Base Simulation'] = {
+    filters: [
+        {
+            fieldname: 'gross_divider',
+            label: __('Gross Divider'),
+            fieldtype: 'Float',
+            description: __('Leave empty to use the current setting')
+        },
+        {
+            fieldname: 'default_min_base',
+            label: __('Default Minimum Base'),
+            fieldtype: 'Currency',
+            description: __('Leave empty to use the current setting')
+        },
+        {
+            fieldname: 'default_max_base',
+            label: __('Default Maximum Base'),
+            fieldtype: 'Currency',
+            description: __('Leave empty to use the current setting')
+        }
+    ]
+};
@@ -0,0 +1,58 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+
+from advanced_attendance.salary_base import get_simulation_settings, simulate_base_settings
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+
+    settings = get_simulation_settings(
+        filters.get("gross_divider"),
+        filters.get("default_min_base"),
+        filters.get("default_max_base")
+    )
+    result = simulate_base_settings(settings)
+
+    return get_columns(), result["distribution"], None, get_chart(result), get_summary(result)
+
+
+def get_columns():
+    return [
+        {"fieldname": "from", "label": _("Base From"), "fieldtype": "Currency", "width": 150},
+        {"fieldname": "to", "label": _("Base To"), "fieldtype": "Currency", "width": 150},
+        {"fieldname": "current", "label": _("Current Assignments"), "fieldtype": "Int", "width": 180},
+        {"fieldname": "simulated", "label": _("Simulated Assignments"), "fieldtype": "Int", "width": 180}
+    ]
+
+
+def get_chart(result):
+    return {
+        "data": {
+            "labels": [frappe.format(row["to"], {"fieldtype": "Currency"}) for row in result["distribution"]],
+            "datasets": [
+                {"name": _("Current"), "values": [row["current"] for row in result["distribution"]]},
+                {"name": _("Simulated"), "values": [row["simulated"] for row in result["distribution"]]}
+            ]
+        },
+        "type": "bar"
+    }
+
+
+def get_summary(result):
+    return [
+        {"label": _("Assignments"), "value": result["assignments"], "datatype": "Int"},
+        {"label": _("Clamped at Minimum"), "value": result["clamped_at_min"], "datatype": "Int"},
+        {"label": _("Clamped at Maximum"), "value": result["clamped_at_max"], "datatype": "Int"},
+        {"label": _("Current Total Base"), "value": result["current_total"], "datatype": "Currency"},
+        {"label": _("Simulated Total Base"), "value": result["simulated_total"], "datatype": "Currency"},
+        {
+            "label": _("Total Base Delta"),
+            "value": result["total_delta"],
+            "datatype": "Currency",
+            "indicator": "Red" if result["total_delta"] > 0 else "Green"
+        }
+    ]
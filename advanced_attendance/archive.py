@@ -0,0 +1,276 @@
+"""
+Attendance Archive
+
+Moves closed-period attendance out of the live Attendance table into the
+compact Attendance Archive table, so duplicate checks, occupancy seeding
+and list views only touch recent records.
+
+- Submitted and cancelled records dated before the cutoff are moved.
+  Drafts before the cutoff block archiving: once the period is closed
+  they could never be submitted
+- The cutoff is the first day of the month `archive_after_months` months
+  ago, set in Advanced Attendance Settings
+- Archived Through is recorded before any record is moved, and no
+  attendance can be created or changed on or before that date, so
+  counts on the live table stay complete for every date still writable
+- Periods with open payroll (draft Payroll Entries or Salary Slips) or
+  draft attendance are not archived
+- Records are copied and deleted in chunks with one INSERT ... SELECT and
+  one DELETE each, committed together. Per chunk, links to the moved
+  records (e.g. Employee Checkin.attendance) are cleared and recorded in
+  the Cleared Links of the archive row, and the day summaries and
+  occupancy counters of the moved employee-days are updated
+
+Archived records are no longer Attendance documents: hrms payroll
+(payment days of new salary slips), the standard attendance reports and
+the Attendance list do not see them. Only this app's reports read them,
+with the include_archived option.
+
+Date-range partitioning of tabAttendance is not used: MariaDB requires the
+partitioning column in every unique key, and the primary key is `name`.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, add_months, cint, get_first_day, getdate, now, nowdate
+
+from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+    refresh_day_summaries
+)
+from advanced_attendance.occupancy import is_occupancy_cache_enabled, queue_occupancy_deltas
+
+SETTINGS_DOCTYPE = "Advanced Attendance Settings"
+
+# Attendance moved per committed chunk
+ARCHIVE_CHUNK_SIZE = 1000
+
+# Columns copied from Attendance to Attendance Archive
+ARCHIVE_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "employee",
+    "employee_name",
+    "company",
+    "department",
+    "attendance_date",
+    "status",
+    "leave_type",
+    "shift",
+    "in_time",
+    "out_time",
+    "working_hours",
+    "custom_overlap",
+    "custom_additional_attendance"
+]
+
+
+def get_archived_through():
+    """Last archived attendance date, or None if nothing was archived."""
+    try:
+        value = frappe.get_cached_doc(SETTINGS_DOCTYPE).archived_through
+    except (frappe.DoesNotExistError, ImportError):
+        # Settings not synced yet
+        return None
+
+    return getdate(value) if value else None
+
+
+def validate_archived_period(doc):
+    """Reject attendance dated in the archived period."""
+    archived_through = get_archived_through()
+    if archived_through and doc.attendance_date and getdate(doc.attendance_date) <= archived_through:
+        frappe.throw(
+            _("Attendance up to {0} is archived and can no longer be created or changed").format(
+                frappe.format(archived_through, {"fieldtype": "Date"})
+            ),
+            title=_("Archived Period")
+        )
+
+
+def get_archive_cutoff(archive_after_months):
+    """First date that is not archived: the first day of the month N months ago."""
+    return get_first_day(add_months(nowdate(), -cint(archive_after_months)))
+
+
+def validate_payroll_closed(cutoff):
+    """Refuse to archive a period that open payroll still reads attendance from."""
+    for doctype in ("Payroll Entry", "Salary Slip"):
+        open_doc = frappe.db.get_value(doctype, {"docstatus": 0, "start_date": ["<", cutoff]}, "name")
+        if open_doc:
+            frappe.throw(
+                _("{0} {1} is still open for a period before {2}. Submit or delete it before archiving.").format(
+                    _(doctype), open_doc, frappe.format(cutoff, {"fieldtype": "Date"})
+                ),
+                title=_("Open Payroll")
+            )
+
+
+def validate_no_draft_attendance(cutoff):
+    """Refuse to archive a period with draft attendance, it could no longer be submitted."""
+    draft = frappe.db.get_value("Attendance", {"docstatus": 0, "attendance_date": ["<", cutoff]}, "name")
+    if draft:
+        frappe.throw(
+            _("Draft Attendance {0} is dated before {1}. Submit or delete it before archiving.").format(
+                draft, frappe.format(cutoff, {"fieldtype": "Date"})
+            ),
+            title=_("Draft Attendance")
+        )
+
+
+def validate_archivable(cutoff):
+    validate_payroll_closed(cutoff)
+    validate_no_draft_attendance(cutoff)
+
+
+def get_attendance_link_fields():
+    """(doctype, fieldname) of every stored Link field pointing to Attendance."""
+    fields = frappe.get_all(
+        "DocField",
+        filters={"fieldtype": "Link", "options": "Attendance"},
+        fields=["parent", "fieldname"]
+    ) + frappe.get_all(
+        "Custom Field",
+        filters={"fieldtype": "Link", "options": "Attendance"},
+        fields=["dt as parent", "fieldname"]
+    )
+
+    link_fields = []
+    for field in fields:
+        meta = frappe.get_meta(field.parent)
+        if not meta.issingle and not meta.get("is_virtual"):
+            link_fields.append((field.parent, field.fieldname))
+
+    return link_fields
+
+
+def unlink_archived(names, link_fields):
+    """
+    Clear links to archived records, they no longer exist as Attendance.
+
+    The cleared links are stored in Cleared Links of each archive row, so
+    they can be traced or restored.
+    """
+    cleared = {}
+    for doctype, fieldname in link_fields:
+        linked = frappe.db.sql(
+            f"select name, `{fieldname}` from `tab{doctype}` where `{fieldname}` in %(names)s",
+            {"names": names}
+        )
+        if not linked:
+            continue
+
+        for name, attendance in linked:
+            cleared.setdefault(attendance, []).append(
+                {"doctype": doctype, "fieldname": fieldname, "name": name}
+            )
+
+        frappe.db.sql(
+            f"update `tab{doctype}` set `{fieldname}` = null where `{fieldname}` in %(names)s",
+            {"names": names}
+        )
+
+    for attendance, links in cleared.items():
+        frappe.db.set_value(
+            "Attendance Archive", attendance, "cleared_links", frappe.as_json(links), update_modified=False
+        )
+
+
+def archive_attendance(cutoff, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """
+    Move submitted and cancelled attendance dated before cutoff to the archive.
+
+    Args:
+        cutoff: First date to keep in Attendance
+        chunk_size: Records moved per committed chunk
+
+    Returns:
+        int: Number of archived records
+    """
+    cutoff = getdate(cutoff)
+    chunk_size = cint(chunk_size) or ARCHIVE_CHUNK_SIZE
+    validate_archivable(cutoff)
+
+    # Close the period before moving anything out of it
+    archived_through = add_days(cutoff, -1)
+    current = get_archived_through()
+    if not current or current < archived_through:
+        frappe.db.set_single_value(SETTINGS_DOCTYPE, "archived_through", archived_through)
+        frappe.db.commit()
+
+    columns = ", ".join(f"`{field}`" for field in ARCHIVE_FIELDS)
+    link_fields = get_attendance_link_fields()
+    archived = 0
+
+    while True:
+        records = frappe.db.sql(
+            """
+            select name, employee, attendance_date, docstatus from `tabAttendance`
+            where attendance_date < %(cutoff)s and docstatus in (1, 2)
+            order by attendance_date, name
+            limit %(limit)s
+            """,
+            {"cutoff": cutoff, "limit": chunk_size},
+            as_dict=True
+        )
+        if not records:
+            break
+
+        names = [record.name for record in records]
+
+        frappe.db.sql(
+            f"""
+            insert into `tabAttendance Archive` ({columns}, `docstatus`, `idx`, `source_docstatus`, `archived_on`)
+            select {columns}, 0, 0, `docstatus`, %(now)s
+            from `tabAttendance`
+            where name in %(names)s
+            """,
+            {"names": names, "now": now()}
+        )
+        frappe.db.delete("Attendance", {"name": ["in", names]})
+        unlink_archived(names, link_fields)
+
+        # Deleted without doc events: summaries and counters follow here
+        submitted = [(record.employee, record.attendance_date) for record in records if record.docstatus == 1]
+        refresh_day_summaries(submitted)
+        if is_occupancy_cache_enabled():
+            queue_occupancy_deltas([((employee, str(getdate(date))), -1) for employee, date in submitted])
+
+        frappe.db.commit()
+
+        archived += len(names)
+
+    return archived
+
+
+def archive_old_attendance():
+    """Scheduled job: archive attendance older than the configured cutoff."""
+    settings = frappe.get_cached_doc(SETTINGS_DOCTYPE)
+    if not settings.enable_attendance_archive:
+        return
+
+    archived = archive_attendance(get_archive_cutoff(settings.archive_after_months))
+    if archived:
+        frappe.logger("advanced_attendance").info(f"Archived {archived} attendance record(s)")
+
+
+@frappe.whitelist()
+def archive_attendance_now():
+    """Queue archiving with the configured cutoff."""
+    frappe.only_for("System Manager")
+
+    settings = frappe.get_cached_doc(SETTINGS_DOCTYPE)
+    if not settings.enable_attendance_archive:
+        frappe.throw(_("Enable Attendance Archive in {0} first").format(SETTINGS_DOCTYPE))
+
+    # Fail in the request rather than in the job
+    validate_archivable(get_archive_cutoff(settings.archive_after_months))
+
+    frappe.enqueue(
+        "advanced_attendance.archive.archive_attendance",
+        queue="long",
+        timeout=3600 * 4,
+        cutoff=get_archive_cutoff(settings.archive_after_months)
+    )
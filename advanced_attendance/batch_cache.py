@@ -0,0 +1,182 @@
+"""
+Batch Lookup Cache
+
+Employee, shift and leave data preloaded once for a batch of attendance
+records, so validating thousands of records in the bulk paths does not
+repeat the same Employee, Shift Assignment and Leave Application lookups
+per record.
+
+The cache only answers lookups a path already makes, with the same rules:
+CustomAttendance reads the employee status and approved leave of the
+hrms validation from it, and the bulk marking path, which resolves the
+shift of rows sent without one, reads employees and shifts from it.
+
+The cache lives in frappe.local and is only active inside batch_cache().
+Records outside the preloaded employees or dates are loaded on first use
+and kept for the rest of the batch. Employee, Shift Assignment and Leave
+Application doc events drop the entries of the changed employee, so a
+batch that also edits them never reads stale data.
+"""
+
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import getdate
+
+EMPLOYEE_FIELDS = [
+    "name",
+    "employee_name",
+    "company",
+    "department",
+    "status",
+    "date_of_joining",
+    "relieving_date",
+    "default_shift"
+]
+
+
+def _covers(ranges, employee, attendance_date):
+    """Check if the records loaded for an employee cover the date."""
+    from_date, to_date = ranges.get(employee, (False, False))
+    if from_date is False:
+        return False
+
+    return not from_date or from_date <= attendance_date <= to_date
+
+
+class BatchCache:
+    """Employee, shift assignment and leave application lookups for one batch."""
+
+    def __init__(self):
+        self.employees = {}
+        self.shift_assignments = {}
+        self.leave_applications = {}
+        # Date range the loaded assignments and leaves cover, (None, None) for all
+        self.assignment_ranges = {}
+        self.leave_ranges = {}
+
+    def preload(self, employees, from_date, to_date):
+        """Load the employees, their shift assignments and approved leave for the date range."""
+        employees = sorted({employee for employee in employees if employee} - set(self.employees))
+        if not employees:
+            return
+
+        self.employees.update(dict.fromkeys(employees))
+        for employee in frappe.get_all("Employee", filters={"name": ["in", employees]}, fields=EMPLOYEE_FIELDS):
+            self.employees[employee.name] = employee
+
+        self._load_shift_assignments(employees, from_date, to_date)
+        self._load_leave_applications(employees, from_date, to_date)
+
+    def _load_shift_assignments(self, employees, from_date=None, to_date=None):
+        filters = {"employee": ["in", employees], "docstatus": 1, "status": "Active"}
+        or_filters = None
+        if from_date and to_date:
+            filters["start_date"] = ["<=", to_date]
+            or_filters = [["end_date", "is", "not set"], ["end_date", ">=", from_date]]
+
+        for employee in employees:
+            self.shift_assignments[employee] = []
+            self.assignment_ranges[employee] = (from_date, to_date)
+
+        assignments = frappe.get_all(
+            "Shift Assignment",
+            filters=filters,
+            or_filters=or_filters,
+            fields=["employee", "shift_type", "start_date", "end_date"],
+            order_by="start_date desc"
+        )
+        for assignment in assignments:
+            self.shift_assignments[assignment.employee].append(assignment)
+
+    def _load_leave_applications(self, employees, from_date=None, to_date=None):
+        filters = {"employee": ["in", employees], "status": "Approved", "docstatus": 1}
+        if from_date and to_date:
+            filters["from_date"] = ["<=", to_date]
+            filters["to_date"] = [">=", from_date]
+
+        for employee in employees:
+            self.leave_applications[employee] = []
+            self.leave_ranges[employee] = (from_date, to_date)
+
+        applications = frappe.get_all(
+            "Leave Application",
+            filters=filters,
+            fields=["name", "employee", "leave_type", "half_day", "half_day_date", "from_date", "to_date"]
+        )
+        for application in applications:
+            self.leave_applications[application.employee].append(application)
+
+    def get_employee(self, employee):
+        """Employee fields, or None if the employee does not exist."""
+        if employee not in self.employees:
+            self.employees[employee] = frappe.db.get_value("Employee", employee, EMPLOYEE_FIELDS, as_dict=True)
+
+        return self.employees[employee]
+
+    def get_shift(self, employee, attendance_date):
+        """Shift of the active assignment covering the date, else the employee's default shift."""
+        attendance_date = getdate(attendance_date)
+        if not _covers(self.assignment_ranges, employee, attendance_date):
+            # Not loaded for this date: all active assignments of the employee
+            self._load_shift_assignments([employee])
+
+        for assignment in self.shift_assignments[employee]:
+            if getdate(assignment.start_date) <= attendance_date and (
+                not assignment.end_date or getdate(assignment.end_date) >= attendance_date
+            ):
+                return assignment.shift_type
+
+        employee_details = self.get_employee(employee)
+        return employee_details.default_shift if employee_details else None
+
+    def get_leave_records(self, employee, attendance_date):
+        """Approved, submitted leave applications of the employee covering the date."""
+        attendance_date = getdate(attendance_date)
+        if not _covers(self.leave_ranges, employee, attendance_date):
+            self._load_leave_applications([employee], attendance_date, attendance_date)
+
+        return [
+            application for application in self.leave_applications[employee]
+            if getdate(application.from_date) <= attendance_date <= getdate(application.to_date)
+        ]
+
+    def forget(self, employee):
+        self.employees.pop(employee, None)
+        self.shift_assignments.pop(employee, None)
+        self.assignment_ranges.pop(employee, None)
+        self.leave_applications.pop(employee, None)
+        self.leave_ranges.pop(employee, None)
+
+
+def get_batch_cache():
+    """The active batch cache, or None outside batch_cache()."""
+    return getattr(frappe.local, "attendance_batch_cache", None)
+
+
+@contextmanager
+def batch_cache(employees=(), from_date=None, to_date=None):
+    """
+    Activate a batch cache, preloaded for the employees and date range.
+
+    Nested use keeps the outer cache and only preloads the new employees.
+    """
+    cache = get_batch_cache()
+    outer = cache is not None
+    if not outer:
+        cache = frappe.local.attendance_batch_cache = BatchCache()
+
+    try:
+        if employees and from_date and to_date:
+            cache.preload(employees, getdate(from_date), getdate(to_date))
+        yield cache
+    finally:
+        if not outer:
+            frappe.local.attendance_batch_cache = None
+
+
+def invalidate_batch_cache(doc, method=None):
+    """Doc event hook for Employee, Shift Assignment and Leave Application: drop the changed employee."""
+    cache = get_batch_cache()
+    if cache:
+        cache.forget(doc.name if doc.doctype == "Employee" else doc.employee)
@@ -0,0 +1,6 @@
+"""
+Benchmarks for Advanced Attendance hot paths.
+
+Run against a site with:
+    bench --site your-site.local execute advanced_attendance.benchmarks.<module>.run
+"""
@@ -0,0 +1,152 @@
+"""
+Attendance Lookup Index Benchmark
+
+Measures the latency of the employee+date attendance count used by
+CustomAttendance, before and after adding the composite
+(employee, attendance_date, docstatus) index.
+
+The benchmark seeds a scratch copy of the relevant Attendance columns,
+so the live Attendance table is never touched. Like a site with years of
+history, every employee has a record on most days and every day has a
+record for most employees, so neither single-column index narrows a
+lookup down to a few rows on its own:
+
+    bench --site your-site.local execute \
+        advanced_attendance.benchmarks.attendance_index.run \
+        --kwargs "{'employees': 1000, 'days': 1000}"
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+import frappe
+
+from advanced_attendance.install import ATTENDANCE_LOOKUP_INDEX_FIELDS
+
+BENCH_TABLE = "__advanced_attendance_index_bench"
+BENCH_INDEX = "bench_employee_attendance_date_docstatus_index"
+
+COUNT_QUERY = f"""
+    select count(*) from `{BENCH_TABLE}`
+    where employee = %s and attendance_date = %s and docstatus != 2 and name != %s
+"""
+
+
+def run(employees=1000, days=1000, samples=500, batch_size=10_000):
+    """
+    Seed a large table and compare count latency without and with the index.
+
+    Args:
+        employees: Number of distinct employees
+        days: Number of consecutive days of history per employee
+        samples: Number of count queries measured per phase
+        batch_size: Rows per seeding insert
+
+    Returns:
+        dict: Latency statistics (milliseconds) before and after indexing
+    """
+    _create_table()
+    try:
+        rows, keys = _seed(employees, days, batch_size)
+        sample_keys = random.sample(keys, min(samples, len(keys)))
+
+        before = _measure(sample_keys)
+        frappe.db.sql_ddl(
+            f"alter table `{BENCH_TABLE}` add index `{BENCH_INDEX}` "
+            f"({', '.join(ATTENDANCE_LOOKUP_INDEX_FIELDS)})"
+        )
+        after = _measure(sample_keys)
+    finally:
+        frappe.db.sql_ddl(f"drop table if exists `{BENCH_TABLE}`")
+
+    result = {"rows": rows, "employees": employees, "days": days, "before": before, "after": after}
+    print(frappe.as_json(result))
+    return result
+
+
+def _create_table():
+    frappe.db.sql_ddl(f"drop table if exists `{BENCH_TABLE}`")
+    # Mirror the weak single-column indexes found on a stock Attendance table
+    frappe.db.sql_ddl(f"""
+        create table `{BENCH_TABLE}` (
+            name varchar(140) primary key,
+            employee varchar(140),
+            attendance_date date,
+            docstatus int(1) not null default 0,
+            index employee (employee),
+            index attendance_date (attendance_date)
+        )
+    """)
+
+
+def _seed(employees, days, batch_size):
+    """
+    Insert a record per employee on most days of the period.
+
+    Roughly 1 in 10 employee-days is skipped (leave, weekly off), 1 in 50
+    has a second, overlapping record and 1 in 20 records is cancelled.
+
+    Returns:
+        tuple: (rows inserted, list of seeded (employee, date) keys)
+    """
+    start_date = date(2020, 1, 1)
+    keys = []
+    batch = []
+    rows = 0
+
+    def add(employee, attendance_date, docstatus):
+        nonlocal rows, batch
+        batch.append((f"HR-ATT-{rows:09d}", employee, attendance_date, docstatus))
+        rows += 1
+        if len(batch) >= batch_size:
+            _insert(batch)
+            batch = []
+
+    for day in range(days):
+        attendance_date = start_date + timedelta(days=day)
+        for i in range(employees):
+            if random.random() < 0.1:
+                continue
+
+            employee = f"HR-EMP-{i:06d}"
+            add(employee, attendance_date, 2 if random.random() < 0.05 else 1)
+            if random.random() < 0.02:
+                add(employee, attendance_date, 1)
+            keys.append((employee, attendance_date))
+
+    if batch:
+        _insert(batch)
+
+    frappe.db.commit()
+    return rows, keys
+
+
+def _insert(batch):
+    values = ", ".join(
+        "({}, {}, {}, {})".format(
+            frappe.db.escape(name),
+            frappe.db.escape(employee),
+            frappe.db.escape(str(attendance_date)),
+            docstatus
+        )
+        for name, employee, attendance_date, docstatus in batch
+    )
+    frappe.db.sql(f"insert into `{BENCH_TABLE}` (name, employee, attendance_date, docstatus) values {values}")
+
+
+def _measure(sample_keys):
+    timings = []
+    for employee, attendance_date in sample_keys:
+        start = time.perf_counter()
+        frappe.db.sql(COUNT_QUERY, (employee, attendance_date, "new-attendance"))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "samples": len(timings),
+        "mean_ms": round(sum(timings) / len(timings), 3) if timings else 0,
+        "p50_ms": round(timings[len(timings) // 2], 3) if timings else 0,
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3) if timings else 0,
+        "max_ms": round(timings[-1], 3) if timings else 0,
+    }
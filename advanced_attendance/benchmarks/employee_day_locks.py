@@ -0,0 +1,213 @@
+"""
+Employee-Day Lock Stress Benchmark
+
+Runs many concurrent writers and reports throughput per number of
+workers, for two locking schemes:
+- employee_day: each write locks only its own employee-day
+- global: every write also takes one shared lock, i.e. all writers are
+  serialized
+
+With employee-day locks, throughput should grow with the number of
+workers as long as they write different employee-days.
+
+Two modes are available:
+
+database (default) - the stress test: inserts real Attendance records on
+a site through the full validate, one connection per worker, with
+employee-day locks enabled, so every write takes the database named
+lock and runs the committed-records count. Created records are deleted
+at the end:
+
+    bench --site your-site.local execute \\
+        advanced_attendance.benchmarks.employee_day_locks.run \\
+        --kwargs "{'output': 'locks.json'}"
+
+memory - NOT a database benchmark. Runs without a site, with
+threading.Lock stand-ins held for a fixed sleep per write. It only
+shows the scaling shape each scheme allows, and says nothing about
+database lock or index contention:
+
+    python -m advanced_attendance.benchmarks.employee_day_locks --output locks.json
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import frappe
+
+from advanced_attendance import locks
+
+DEFAULT_WORKERS = (1, 2, 4, 8, 16)
+
+# Writes per worker
+DEFAULT_WRITES = 50
+
+# Time a write holds its lock in memory mode, in milliseconds
+DEFAULT_HOLD_MS = 5
+
+SCHEMES = ("employee_day", "global")
+
+GLOBAL_KEY = ("__all__", date(2000, 1, 1))
+BENCH_DATE = date(2025, 6, 1)
+
+
+def _run_threads(workers, target):
+    errors = []
+
+    def wrapper(worker):
+        try:
+            target(worker)
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=wrapper, args=(worker,)) for worker in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - start, errors
+
+
+def _memory_writer(scheme, writes, hold_ms):
+    registry = locks.LocalLockRegistry()
+
+    def write(worker):
+        for write_no in range(writes):
+            names = [f"EMP-{worker}|{BENCH_DATE + timedelta(days=write_no)}"]
+            if scheme == "global":
+                names.insert(0, "{0}|{1}".format(*GLOBAL_KEY))
+
+            for lock_name in names:
+                registry.acquire(lock_name, timeout=60)
+            try:
+                time.sleep(hold_ms / 1000)
+            finally:
+                for lock_name in names:
+                    registry.release(lock_name)
+
+    return write
+
+
+def _database_writer(site, scheme, writes, employees, created):
+    def write(worker):
+        frappe.init(site=site)
+        frappe.connect()
+        frappe.local.conf.advanced_attendance_employee_day_locks = 1
+        # Records are removed with a plain delete, keep the counters out of it
+        frappe.local.conf.advanced_attendance_occupancy_cache = 0
+        try:
+            employee = employees[worker % len(employees)]
+            for write_no in range(writes):
+                attendance_date = BENCH_DATE + timedelta(days=worker // len(employees) * writes + write_no)
+                if scheme == "global":
+                    locks.lock_employee_days([GLOBAL_KEY])
+
+                doc = frappe.get_doc({
+                    "doctype": "Attendance",
+                    "employee": employee,
+                    "attendance_date": attendance_date,
+                    "status": "Present"
+                })
+                doc.insert(ignore_permissions=True)
+                frappe.db.commit()
+                created.append(doc.name)
+        finally:
+            frappe.db.rollback()
+            frappe.destroy()
+
+    return write
+
+
+def run(mode="database", workers=DEFAULT_WORKERS, writes=DEFAULT_WRITES, hold_ms=DEFAULT_HOLD_MS, output=None):
+    """
+    Run the lock stress benchmark.
+
+    Args:
+        mode: "database" for the current site, "memory" for the in-process
+            stand-in, which only models the locking scheme
+        workers: Worker counts to measure
+        writes: Writes per worker
+        hold_ms: Lock hold time per write in memory mode
+        output: Path of the JSON results file (optional)
+
+    Returns:
+        dict: Throughput per scheme and worker count
+    """
+    results = {
+        "mode": mode,
+        "measures": "database locks and inserts" if mode == "database" else "lock scheme model only",
+        "writes_per_worker": writes,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "schemes": {}
+    }
+
+    site = frappe.local.site if mode == "database" else None
+    employees = []
+    if mode == "database":
+        employees = frappe.get_all(
+            "Employee",
+            filters={"status": "Active", "date_of_joining": ["<", BENCH_DATE]},
+            pluck="name",
+            limit=max(workers)
+        )
+        if not employees:
+            frappe.throw("The database mode needs active employees who joined before {0}".format(BENCH_DATE))
+
+    created = []
+    try:
+        for scheme in SCHEMES:
+            results["schemes"][scheme] = {}
+            for worker_count in workers:
+                if mode == "memory":
+                    target = _memory_writer(scheme, writes, hold_ms)
+                else:
+                    target = _database_writer(site, scheme, writes, employees, created)
+
+                elapsed, errors = _run_threads(worker_count, target)
+                results["schemes"][scheme][worker_count] = {
+                    "seconds": round(elapsed, 4),
+                    "writes_per_second": round(worker_count * writes / elapsed, 1),
+                    "errors": len(errors)
+                }
+                if mode == "database":
+                    # Every run starts from empty employee-days
+                    _delete_created(created)
+    finally:
+        if mode == "database":
+            _delete_created(created)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return results
+
+
+def _delete_created(created):
+    if created:
+        frappe.db.delete("Attendance", {"name": ["in", created]})
+        frappe.db.commit()
+        created.clear()
+
+
+if __name__ == "__main__":
+    # Without a site only the in-process model can run
+    parser = argparse.ArgumentParser(description="Employee-day lock scheme model (no database)")
+    parser.add_argument("--workers", default=",".join(str(count) for count in DEFAULT_WORKERS))
+    parser.add_argument("--writes", type=int, default=DEFAULT_WRITES)
+    parser.add_argument("--hold-ms", type=float, default=DEFAULT_HOLD_MS)
+    parser.add_argument("--output", default="advanced_attendance_locks.json")
+    args = parser.parse_args()
+
+    print(json.dumps(run(
+        mode="memory",
+        workers=[int(count) for count in args.workers.split(",")],
+        writes=args.writes,
+        hold_ms=args.hold_ms,
+        output=args.output
+    ), indent=2))
@@ -0,0 +1,515 @@
+"""
+Hot Path Benchmarks
+
+Measures latency and query count of the attendance and salary-base hot
+paths, at several sizes of existing data, and writes the results to a
+JSON file so regressions can be caught by comparing runs.
+
+Attendance paths (CustomAttendance validation):
+- first_record: no existing record for employee+date
+- second_record_with_flag: one existing record, Overlap selected
+- rejected_duplicate: one existing record, no option selected
+- workflow_transition: existing record, only the workflow state changed
+
+Salary base path:
+- calculate_base: calculate_base_from_settings throughput (rows/second)
+
+Memory is measured with tracemalloc: each path reports the peak Python
+allocation of a separate, untimed validation pass, the memory mode
+reports the traced size of the seeded rows, and the run reports the
+peak RSS of the process.
+
+Two modes are available:
+
+memory (default) - runs without a site against an in-memory frappe.db
+stand-in. Only this app's own validation stages run, the parent hrms
+methods need a real database:
+
+    python -m advanced_attendance.benchmarks.hot_paths --output bench.json
+
+database - runs the full validate against a site. Seeded rows are
+written inside a transaction that is rolled back at the end:
+
+    bench --site your-site.local execute \
+        advanced_attendance.benchmarks.hot_paths.run \
+        --kwargs "{'mode': 'database', 'output': 'bench.json'}"
+"""
+
+import argparse
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import frappe
+
+from advanced_attendance.metrics import get_query_count
+from advanced_attendance.overrides import salary_structure_assignment
+from advanced_attendance.overrides.attendance import CustomAttendance
+
+# Existing row counts each path is measured at
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Validations timed per path and size
+DEFAULT_ITERATIONS = 200
+
+ATTENDANCE_PATHS = (
+    "first_record",
+    "second_record_with_flag",
+    "rejected_duplicate",
+    "workflow_transition"
+)
+
+BENCH_EMPLOYEE = "HR-EMP-BENCH-00000"
+BENCH_DATE = date(2025, 6, 1)
+
+
+class QueryCounter:
+    """Count queries run on frappe.db while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.start = 0
+
+    def __enter__(self):
+        self.start = get_query_count()
+        return self
+
+    def __exit__(self, *exc):
+        self.count = get_query_count() - self.start
+
+
+class InMemoryDB:
+    """
+    Minimal frappe.db stand-in holding Attendance rows in memory.
+
+    Rows are indexed by (employee, attendance_date), like the composite
+    index on a real site. Every lookup goes through sql() so it is counted
+    as one query.
+    """
+
+    def __init__(self):
+        self.attendance = {}
+        self.by_key = {}
+        self.after_commit = _CallbackList()
+
+    def sql(self, query, *args, **kwargs):
+        return []
+
+    def add_attendance(self, name, employee, attendance_date, docstatus=1, **fields):
+        row = frappe._dict(
+            name=name,
+            employee=employee,
+            attendance_date=attendance_date,
+            docstatus=docstatus,
+            **fields
+        )
+        self.attendance[name] = row
+        self.by_key.setdefault((employee, str(attendance_date)), []).append(row)
+
+    def count(self, doctype, filters=None, **kwargs):
+        self.sql("count")
+        filters = filters or {}
+        rows = self.by_key.get((filters.get("employee"), str(filters.get("attendance_date"))), [])
+        excluded = filters.get("name", [None, None])[1]
+        return sum(1 for row in rows if row.docstatus != 2 and row.name != excluded)
+
+    def get_value(self, doctype, name, fieldname=None, as_dict=False, **kwargs):
+        self.sql("get_value")
+        row = self.attendance.get(name)
+        if not row:
+            return None
+
+        if isinstance(fieldname, (list, tuple)):
+            values = frappe._dict({field: row.get(field) for field in fieldname})
+            return values if as_dict else tuple(values.values())
+
+        return row.get(fieldname)
+
+    def get_default(self, key, parent="__default"):
+        return None
+
+    def get_single_value(self, doctype, fieldname, cache=True):
+        return None
+
+
+class _CallbackList(list):
+    def add(self, callback):
+        self.append(callback)
+
+
+class _BenchmarkMeta:
+    def __init__(self, workflow=None):
+        self.workflow = workflow
+
+    def get_workflow(self):
+        return self.workflow
+
+
+def _make_memory_attendance(values, workflow=None, is_new=True, before_save=None):
+    """Build a CustomAttendance without touching meta or the database."""
+    doc = object.__new__(CustomAttendance)
+    doc.__dict__.update(values)
+    doc.__dict__.update(
+        doctype="Attendance",
+        flags=frappe._dict(),
+        meta=_BenchmarkMeta(workflow),
+        _doc_before_save=before_save
+    )
+    doc.__dict__["__islocal"] = 1 if is_new else None
+    return doc
+
+
+def _validate_app_stages(doc):
+    """The app's own validation stages, without the parent hrms methods."""
+    doc.reset_validation_context()
+    doc.validate_overlap_additional_attendance()
+    doc.validate_duplicate_record()
+
+
+def init_memory_site():
+    """Set up just enough of frappe.local to run without a site."""
+    frappe.local.site = "benchmark.local"
+    frappe.local.conf = frappe._dict(advanced_attendance_occupancy_cache=0)
+    frappe.local.flags = frappe._dict(mute_messages=True)
+    frappe.local.lang = "en"
+    frappe.local.message_log = []
+    frappe.local.db = InMemoryDB()
+
+
+def run(mode="memory", sizes=DEFAULT_SIZES, iterations=DEFAULT_ITERATIONS, output=None):
+    """
+    Run all hot path benchmarks.
+
+    Args:
+        mode: "memory" for the frappe.db stand-in, "database" for the current site
+        sizes: Existing row counts to measure at
+        iterations: Validations timed per path and size
+        output: Path of the JSON results file (optional)
+
+    Returns:
+        dict: Results per path and size
+    """
+    if mode == "memory" and not isinstance(getattr(frappe.local, "db", None), InMemoryDB):
+        init_memory_site()
+
+    results = {
+        "mode": mode,
+        "iterations": iterations,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "attendance": {},
+        "calculate_base": {},
+        "seeded_kb": {}
+    }
+
+    for size in sizes:
+        if mode == "memory":
+            attendance, seeded_kb = _run_memory_attendance(size, iterations)
+            results["seeded_kb"][str(size)] = seeded_kb
+        else:
+            attendance = _run_database_attendance(size, iterations)
+
+        for path, stats in attendance.items():
+            results["attendance"].setdefault(path, {})[str(size)] = stats
+
+        results["calculate_base"][str(size)] = _run_calculate_base(size)
+
+    results["max_rss_kb"] = get_max_rss_kb()
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+def get_max_rss_kb():
+    """Peak resident set size of this process, in KB."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def _traced_kb(callback):
+    """
+    Run callback under tracemalloc.
+
+    Returns:
+        tuple: (callback result, net allocation KB, peak allocation KB)
+    """
+    tracemalloc.start()
+    try:
+        result = callback()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, round(current / 1024, 1), round(peak / 1024, 1)
+
+
+def _run_memory_attendance(size, iterations):
+    """
+    Returns:
+        tuple: (results per path, traced KB held by the seeded rows)
+    """
+    db = InMemoryDB()
+    frappe.local.db = db
+    _result, seeded_kb, _peak = _traced_kb(lambda: _seed_memory_attendance(db, size))
+
+    existing = frappe._dict(
+        name="HR-ATT-BENCH-EXISTING",
+        employee=BENCH_EMPLOYEE,
+        attendance_date=str(BENCH_DATE),
+        custom_overlap=0,
+        custom_additional_attendance=0,
+        docstatus=0
+    )
+    db.add_attendance(**existing)
+
+    second_date = str(BENCH_DATE + timedelta(days=1))
+    db.add_attendance("HR-ATT-BENCH-SECOND", BENCH_EMPLOYEE, second_date)
+
+    def first_record():
+        return _make_memory_attendance({
+            "name": None,
+            "employee": BENCH_EMPLOYEE,
+            "attendance_date": str(BENCH_DATE - timedelta(days=1)),
+            "custom_overlap": 0,
+            "custom_additional_attendance": 0,
+            "docstatus": 0
+        })
+
+    def second_record_with_flag():
+        return _make_memory_attendance({
+            "name": None,
+            "employee": BENCH_EMPLOYEE,
+            "attendance_date": second_date,
+            "custom_overlap": 1,
+            "custom_additional_attendance": 0,
+            "docstatus": 0
+        })
+
+    def rejected_duplicate():
+        return _make_memory_attendance({
+            "name": None,
+            "employee": BENCH_EMPLOYEE,
+            "attendance_date": second_date,
+            "custom_overlap": 0,
+            "custom_additional_attendance": 0,
+            "docstatus": 0
+        })
+
+    def workflow_transition():
+        doc = _make_memory_attendance(
+            dict(existing, workflow_state="Approved"),
+            workflow="Attendance Approval",
+            is_new=False,
+            before_save=existing
+        )
+        return doc
+
+    builders = {
+        "first_record": first_record,
+        "second_record_with_flag": second_record_with_flag,
+        "rejected_duplicate": rejected_duplicate,
+        "workflow_transition": workflow_transition
+    }
+
+    results = {
+        path: _time_validations(builders[path], _validate_app_stages, iterations)
+        for path in ATTENDANCE_PATHS
+    }
+    return results, seeded_kb
+
+
+def _seed_memory_attendance(db, size):
+    for i in range(size):
+        db.add_attendance(
+            f"HR-ATT-SEED-{i:09d}",
+            f"HR-EMP-SEED-{i % 1000:05d}",
+            str(BENCH_DATE - timedelta(days=1 + i // 1000))
+        )
+
+
+def _run_database_attendance(size, iterations):
+    employee = frappe.db.get_value("Employee", {"status": "Active"}, "name")
+    if not employee:
+        frappe.throw("An active Employee is required for the database benchmark")
+
+    # Seeded rows are rolled back, they must not be seeded into the
+    # shared occupancy counters
+    occupancy_setting = frappe.local.conf.get("advanced_attendance_occupancy_cache")
+    frappe.local.conf.advanced_attendance_occupancy_cache = 0
+
+    try:
+        _seed_database_attendance(size)
+
+        existing = frappe.get_doc({
+            "doctype": "Attendance",
+            "employee": employee,
+            "attendance_date": BENCH_DATE,
+            "status": "Present"
+        }).insert(ignore_permissions=True)
+
+        def build(days, **values):
+            return frappe.get_doc(dict({
+                "doctype": "Attendance",
+                "employee": employee,
+                "attendance_date": BENCH_DATE + timedelta(days=days),
+                "status": "Present"
+            }, **values))
+
+        def workflow_transition():
+            doc = frappe.get_doc("Attendance", existing.name)
+            doc.load_doc_before_save()
+            return doc
+
+        builders = {
+            "first_record": lambda: build(-1),
+            "second_record_with_flag": lambda: build(0, custom_overlap=1),
+            "rejected_duplicate": lambda: build(0),
+            "workflow_transition": workflow_transition
+        }
+
+        results = {}
+        for path in ATTENDANCE_PATHS:
+            if path == "workflow_transition":
+                results[path] = _with_workflow(
+                    existing.meta,
+                    lambda: _time_validations(builders[path], lambda doc: doc.validate(), iterations)
+                )
+            else:
+                results[path] = _time_validations(builders[path], lambda doc: doc.validate(), iterations)
+
+        return results
+    finally:
+        frappe.db.rollback()
+        frappe.local.conf.advanced_attendance_occupancy_cache = occupancy_setting
+
+
+def _with_workflow(meta, callback):
+    """Run callback as if Attendance had an active workflow."""
+    meta.get_workflow = lambda: "Benchmark Workflow"
+    try:
+        return callback()
+    finally:
+        del meta.get_workflow
+
+
+def _seed_database_attendance(size, batch_size=10_000):
+    fields = ["name", "employee", "attendance_date", "docstatus", "status"]
+    values = [
+        (
+            f"HR-ATT-SEED-{i:09d}",
+            f"HR-EMP-SEED-{i % 1000:05d}",
+            BENCH_DATE - timedelta(days=1 + i // 1000),
+            1,
+            "Present"
+        )
+        for i in range(size)
+    ]
+    frappe.db.bulk_insert("Attendance", fields, values, chunk_size=batch_size)
+
+
+def _time_validations(build, validate, iterations):
+    """
+    Time validate over fresh documents, counting queries and rejections.
+
+    The peak allocation is measured in a second pass, since tracing
+    allocations slows down the timed one.
+    """
+    timings = []
+    queries = 0
+    rejected = 0
+
+    for _i in range(iterations):
+        doc = build()
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            try:
+                validate(doc)
+            except frappe.ValidationError:
+                rejected += 1
+            timings.append((time.perf_counter() - start) * 1000)
+        queries += counter.count
+        frappe.local.message_log = []
+
+    def validate_all():
+        for _i in range(iterations):
+            try:
+                validate(build())
+            except frappe.ValidationError:
+                pass
+            frappe.local.message_log = []
+
+    _result, _current, peak_kb = _traced_kb(validate_all)
+
+    return dict(_summarize(timings, queries, rejected), peak_alloc_kb=peak_kb)
+
+
+def _run_calculate_base(size):
+    """Throughput of calculate_base_from_settings over size assignments."""
+    site = frappe.local.site
+    version = "benchmark"
+    frappe.local.base_settings_version = version
+    salary_structure_assignment._settings_cache[site] = (
+        version,
+        frappe._dict(enabled=True, gross_divider=1.3, default_min_base=1000, default_max_base=50000)
+    )
+
+    docs = [
+        frappe._dict(
+            custom_gross_pay=500 + (i * 37) % 90000,
+            custom_minimum_base_amount=0,
+            custom_maximum_base_amount=0 if i % 3 else 40000
+        )
+        for i in range(size)
+    ]
+
+    try:
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            for doc in docs:
+                salary_structure_assignment.calculate_base_from_settings(doc)
+            elapsed = time.perf_counter() - start
+    finally:
+        salary_structure_assignment._settings_cache.pop(site, None)
+        frappe.local.base_settings_version = None
+
+    return {
+        "rows": size,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(size / elapsed) if elapsed else None,
+        "queries": counter.count
+    }
+
+
+def _summarize(timings, queries, rejected):
+    timings.sort()
+    count = len(timings)
+    return {
+        "samples": count,
+        "mean_ms": round(sum(timings) / count, 4) if count else 0,
+        "p50_ms": round(timings[count // 2], 4) if count else 0,
+        "p95_ms": round(timings[max(int(count * 0.95) - 1, 0)], 4) if count else 0,
+        "queries_per_validate": round(queries / count, 2) if count else 0,
+        "rejected": rejected
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--output", default="advanced_attendance_benchmark.json")
+    args = parser.parse_args()
+
+    run(
+        mode="memory",
+        sizes=[int(size) for size in args.sizes.split(",")],
+        iterations=args.iterations,
+        output=args.output
+    )
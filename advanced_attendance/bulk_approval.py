@@ -0,0 +1,209 @@
+"""
+Bulk Attendance Workflow Approval
+
+Applies one workflow action to many Attendance records at once.
+
+Per record, the standard bulk workflow action reloads the document,
+compares the validation-relevant fields in is_workflow_transition_only
+and then runs the duplicate-count queries. This path instead:
+1. Fetches the stored state of all selected records in ONE query
+2. Builds the documents from those rows, and passes the same rows as the
+   document before save, so saving does not load each record again
+3. Classifies each record: a record whose transition only changes
+   workflow fields is a pure workflow transition
+4. Marks pure transitions so CustomAttendance skips the overlap and
+   duplicate validation work for them
+5. Applies the transitions like apply_workflow, including the
+   before_transition and after_transition hooks, and saves/submits the
+   records in batches, committing after each batch
+"""
+
+import frappe
+from frappe import _
+from frappe.model.workflow import (
+    get_transitions,
+    get_workflow,
+    get_workflow_name,
+    has_approval_access
+)
+from frappe.utils import cint, strip_html
+
+from advanced_attendance.batch_cache import batch_cache
+from advanced_attendance.overrides.attendance import VALIDATION_RELEVANT_FIELDS
+
+# Records saved per committed batch
+APPROVAL_BATCH_SIZE = 100
+
+# Approvals larger than this are moved to a background job
+ENQUEUE_THRESHOLD = 500
+
+
+def get_attendance_rows(names):
+    """Fetch the stored state of all selected records in one query."""
+    rows = frappe.get_all(
+        'Attendance',
+        filters={'name': ['in', list(names)]},
+        fields=['*']
+    )
+    return {row.name: row for row in rows}
+
+
+def classify_transition(doc, workflow, action):
+    """
+    Find the transition for action and whether it is a pure workflow transition.
+
+    Returns:
+        tuple: (transition, next_state, error) - error is set if the action
+            cannot be applied to this record
+    """
+    if doc.docstatus == 2:
+        return None, None, _('Record is cancelled')
+
+    transition = next(
+        (t for t in get_transitions(doc, workflow) if t.action == action),
+        None
+    )
+    if not transition:
+        return None, None, _('Action {0} is not allowed in state {1}').format(
+            _(action), _(doc.get(workflow.workflow_state_field))
+        )
+
+    if not has_approval_access(frappe.session.user, doc, transition):
+        return None, None, _('Self approval is not allowed')
+
+    next_state = next(s for s in workflow.states if s.state == transition.next_state)
+
+    # Pure transition: nothing but the workflow fields change, so the
+    # overlap and duplicate rules cannot give a different answer
+    if next_state.update_field not in VALIDATION_RELEVANT_FIELDS:
+        doc.flags.workflow_transition_only = True
+
+    return transition, next_state, None
+
+
+def apply_transition(doc, workflow, transition, next_state):
+    """Apply a classified transition, like frappe.model.workflow.apply_workflow."""
+    doc.run_method('before_transition', transition)
+
+    doc.set(workflow.workflow_state_field, next_state.state)
+    if next_state.update_field:
+        doc.set(next_state.update_field, next_state.update_value)
+
+    new_docstatus = cint(next_state.doc_status)
+    if doc.docstatus == 0 and new_docstatus == 1:
+        doc.submit()
+    elif doc.docstatus == 1 and new_docstatus == 2:
+        doc.cancel()
+    else:
+        doc.save()
+
+    doc.add_comment('Workflow', _(next_state.state))
+    doc.run_method('after_transition', transition)
+
+
+def approve_attendance_records(names, action, batch_size=APPROVAL_BATCH_SIZE):
+    """
+    Apply a workflow action to many Attendance records.
+
+    Args:
+        names: Attendance names
+        action: Workflow action, e.g. "Approve"
+        batch_size: Records saved per committed batch
+
+    Returns:
+        list: One result per name with name, status ("done", "failed") and error
+    """
+    workflow = get_workflow('Attendance')
+    rows = get_attendance_rows(names)
+    batch_size = cint(batch_size) or APPROVAL_BATCH_SIZE
+
+    results = []
+    for start in range(0, len(names), batch_size):
+        batch = [rows[name] for name in names[start:start + batch_size] if name in rows]
+        dates = [row.attendance_date for row in batch]
+
+        with batch_cache([row.employee for row in batch], min(dates, default=None), max(dates, default=None)):
+            for name in names[start:start + batch_size]:
+                results.append(_approve_one(name, rows.get(name), workflow, action))
+        frappe.db.commit()
+
+    return results
+
+
+def _approve_one(name, row, workflow, action):
+    result = frappe._dict(name=name, status='failed', error=None)
+
+    if not row:
+        result.error = _('Attendance {0} not found').format(name)
+        return result
+
+    savepoint = 'attendance_bulk_approval'
+    frappe.db.savepoint(savepoint)
+    try:
+        doc = frappe.get_doc(dict(row, doctype='Attendance'))
+        # The stored state was fetched for the whole batch, see load_doc_before_save
+        doc.flags.preloaded_doc_before_save = frappe.get_doc(dict(row, doctype='Attendance'))
+
+        transition, next_state, result.error = classify_transition(doc, workflow, action)
+        if result.error:
+            return result
+
+        apply_transition(doc, workflow, transition, next_state)
+    except Exception as e:
+        frappe.db.rollback(save_point=savepoint)
+        frappe.clear_messages()
+        result.error = strip_html(str(e)) or _('Could not apply workflow action')
+        return result
+
+    result.status = 'done'
+    return result
+
+
+@frappe.whitelist()
+def approve_attendance_bulk(names, action):
+    """
+    Apply a workflow action to many Attendance records.
+
+    Small selections are processed immediately and return per-record
+    results. Large selections run in a background job which publishes the
+    results to the user when done.
+
+    Args:
+        names: JSON list of Attendance names
+        action: Workflow action, e.g. "Approve"
+    """
+    names = frappe.parse_json(names) or []
+    if not isinstance(names, list):
+        frappe.throw(_('Names must be a list of Attendance records'))
+
+    if not get_workflow_name('Attendance'):
+        frappe.throw(_('No active workflow for Attendance'))
+
+    if len(names) <= ENQUEUE_THRESHOLD:
+        return approve_attendance_records(names, action)
+
+    frappe.enqueue(
+        'advanced_attendance.bulk_approval.approve_attendance_job',
+        queue='long',
+        timeout=3600,
+        names=names,
+        action=action,
+        user=frappe.session.user
+    )
+
+    return {'queued': True, 'records': len(names)}
+
+
+def approve_attendance_job(names, action, user=None):
+    """Background job for large approvals."""
+    results = approve_attendance_records(names, action)
+
+    frappe.publish_realtime(
+        'advanced_attendance_approval_complete',
+        {
+            'total': len(results),
+            'done': sum(1 for result in results if result.status == 'done'),
+            'errors': [result for result in results if result.status != 'done']
+        },
+        user=user
+    )
@@ -0,0 +1,710 @@
+"""
+Bulk Attendance Import
+
+Batched pre-validation for importing many attendance records at once.
+
+Instead of letting CustomAttendance count existing records for every row,
+each chunk of rows is validated together:
+1. Existing counts for every (employee, attendance_date) pair in the chunk
+   are resolved with ONE grouped query
+2. Rows inside the chunk are counted in memory, in row order
+3. The same first-record/second-record rules are applied per row
+4. Rows that pass are inserted with their count preloaded, so
+   CustomAttendance.validate does not query the count again
+
+Errors are reported per row instead of aborting the whole import.
+
+The bulk marking API goes one step further for high-volume integrations:
+rows are validated together against one employee, shift and leave lookup
+and one occupancy lookup, and the rows that pass are written with a single
+batched insert instead of one document save each. Permissions, including
+User Permissions, are still checked per row. When a workflow is active on
+Attendance, rows can only be marked as drafts in its initial state.
+"""
+
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.model.naming import parse_naming_series
+from frappe.utils import add_days, cint, flt, get_datetime, getdate, now, nowdate, strip_html, time_diff_in_hours
+
+from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+    refresh_day_summaries
+)
+from advanced_attendance.archive import get_archived_through
+from advanced_attendance.batch_cache import batch_cache
+from advanced_attendance.locks import (
+    count_locked_attendance,
+    is_employee_day_locking_enabled,
+    lock_employee_days
+)
+from advanced_attendance.occupancy import is_occupancy_cache_enabled, queue_occupancy_deltas
+from advanced_attendance.overrides.attendance import clear_attendance_preview, get_overlap_rule_error
+
+# Rows validated and inserted per grouped count query
+DEFAULT_CHUNK_SIZE = 500
+
+# Imports larger than this are moved to a background job
+ENQUEUE_THRESHOLD = 1000
+
+# Fields accepted by the bulk marking API
+BULK_MARK_FIELDS = (
+    'employee',
+    'attendance_date',
+    'status',
+    'shift',
+    'in_time',
+    'out_time',
+    'custom_overlap',
+    'custom_additional_attendance'
+)
+
+# Rows per INSERT statement when bulk marking
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def get_attendance_key(employee, attendance_date):
+    """Build the (employee, date) key used for occupancy lookups."""
+    return (employee, str(getdate(attendance_date)))
+
+
+def get_existing_attendance_counts(keys):
+    """
+    Count existing non-cancelled attendance for many employee+date pairs.
+
+    Uses a single grouped query over the employees and date range of the
+    batch, then keeps only the requested pairs. With employee-day locks
+    enabled, all pairs are locked first and counted at READ COMMITTED.
+
+    Args:
+        keys: Iterable of (employee, attendance_date) keys
+
+    Returns:
+        dict: (employee, date string) -> count, for every requested key
+    """
+    keys = {get_attendance_key(employee, date) for employee, date in keys}
+    counts = dict.fromkeys(keys, 0)
+
+    if not keys:
+        return counts
+
+    if is_employee_day_locking_enabled():
+        lock_employee_days(keys)
+        return count_locked_attendance(keys)
+
+    employees = sorted({employee for employee, _date in keys})
+    dates = sorted({date for _employee, date in keys})
+
+    rows = frappe.get_all(
+        'Attendance',
+        filters={
+            'employee': ['in', employees],
+            'attendance_date': ['between', [dates[0], dates[-1]]],
+            'docstatus': ['!=', 2]  # Exclude cancelled records
+        },
+        fields=['employee', 'attendance_date', 'count(name) as attendance_count'],
+        group_by='employee, attendance_date'
+    )
+
+    for row in rows:
+        key = get_attendance_key(row.employee, row.attendance_date)
+        if key in counts:
+            counts[key] = cint(row.attendance_count)
+
+    return counts
+
+
+def check_attendance_row(row, occupancy):
+    """
+    Apply the overlap rules to one row against in-memory occupancy.
+
+    Args:
+        row: Attendance row (dict)
+        occupancy: dict of (employee, date) -> records already present,
+            including accepted rows earlier in the batch
+
+    Returns:
+        frappe._dict: key, existing_count and error (None if the row passes)
+    """
+    if not row.get('employee') or not row.get('attendance_date'):
+        return frappe._dict(
+            key=None,
+            existing_count=0,
+            error=_('Employee and Attendance Date are required')
+        )
+
+    if not parse_attendance_date(row.get('attendance_date')):
+        return frappe._dict(
+            key=None,
+            existing_count=0,
+            error=_('Invalid attendance date {0}').format(row.get('attendance_date'))
+        )
+
+    key = get_attendance_key(row.get('employee'), row.get('attendance_date'))
+    existing_count = occupancy.get(key, 0)
+
+    error = get_overlap_rule_error(
+        existing_count,
+        row.get('custom_overlap'),
+        row.get('custom_additional_attendance'),
+        row.get('attendance_date')
+    )
+
+    return frappe._dict(
+        key=key,
+        existing_count=existing_count,
+        error=strip_html(error.message) if error else None
+    )
+
+
+def validate_attendance_rows(rows, row_offset=0):
+    """
+    Validate a batch of attendance rows without inserting them.
+
+    Rows that pass are counted as occupying their employee+date, so a
+    later row for the same pair in the batch is treated as a second record.
+
+    Args:
+        rows: List of attendance rows (dicts)
+        row_offset: Index of the first row, for error reporting
+
+    Returns:
+        list: One result per row with idx, valid, existing_count and error
+    """
+    occupancy = get_existing_attendance_counts(
+        (row.get('employee'), row.get('attendance_date'))
+        for row in rows
+        if row.get('employee') and parse_attendance_date(row.get('attendance_date'))
+    )
+
+    results = []
+    for idx, row in enumerate(rows, start=row_offset + 1):
+        checked = check_attendance_row(row, occupancy)
+        if not checked.error:
+            occupancy[checked.key] += 1
+
+        results.append(frappe._dict(
+            idx=idx,
+            valid=not checked.error,
+            existing_count=checked.existing_count,
+            error=checked.error
+        ))
+
+    return results
+
+
+def import_attendance_rows(rows, submit=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import attendance rows in chunks with one count query per chunk.
+
+    Each row is inserted inside its own savepoint so one failing row does
+    not roll back the rest of the chunk. Each chunk is committed on its own.
+
+    Args:
+        rows: List of attendance rows (dicts)
+        submit: Submit each record after insert
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        list: One result per row with idx, valid, name and error
+    """
+    chunk_size = cint(chunk_size) or DEFAULT_CHUNK_SIZE
+    results = []
+
+    in_import = frappe.flags.in_import
+    frappe.flags.in_import = True
+    try:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            results.extend(_import_chunk(chunk, start, submit))
+            frappe.db.commit()
+    finally:
+        frappe.flags.in_import = in_import
+
+    return results
+
+
+def _import_chunk(chunk, row_offset, submit):
+    """Validate and insert one chunk against a single grouped count query."""
+    dates = [parse_attendance_date(row.get('attendance_date')) for row in chunk]
+    dates = [date for date in dates if date]
+    employees = [row.get('employee') for row in chunk]
+
+    with batch_cache(employees, min(dates, default=None), max(dates, default=None)):
+        return _import_rows(chunk, row_offset, submit)
+
+
+def _import_rows(chunk, row_offset, submit):
+    occupancy = get_existing_attendance_counts(
+        (row.get('employee'), row.get('attendance_date'))
+        for row in chunk
+        if row.get('employee') and parse_attendance_date(row.get('attendance_date'))
+    )
+
+    results = []
+    for idx, row in enumerate(chunk, start=row_offset + 1):
+        checked = check_attendance_row(row, occupancy)
+        result = frappe._dict(idx=idx, valid=False, name=None, error=checked.error)
+        results.append(result)
+
+        if checked.error:
+            continue
+
+        savepoint = f'attendance_import_{idx}'
+        frappe.db.savepoint(savepoint)
+        try:
+            doc = frappe.get_doc(dict(row, doctype='Attendance'))
+            doc.flags.preloaded_attendance_count = checked.existing_count
+            doc.insert()
+            if submit:
+                # Submit validates again: reuse the count of the other records
+                doc.flags.preloaded_attendance_count = checked.existing_count
+                doc.submit()
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.clear_messages()
+            result.error = strip_html(str(e)) or _('Could not import row')
+            continue
+
+        # Only rows that were actually saved occupy their employee+date
+        occupancy[checked.key] += 1
+        result.update(valid=True, name=doc.name)
+
+    return results
+
+
+def _parse_rows(rows):
+    rows = frappe.parse_json(rows) or []
+    if not isinstance(rows, list):
+        frappe.throw(_('Rows must be a list of attendance records'))
+
+    return [frappe._dict(row) for row in rows]
+
+
+@frappe.whitelist()
+def validate_attendance_import(rows):
+    """
+    Dry run of an attendance import: report per-row errors without saving.
+
+    Args:
+        rows: JSON list of attendance rows
+    """
+    frappe.has_permission('Attendance', 'create', throw=True)
+    rows = _parse_rows(rows)
+
+    results = []
+    for start in range(0, len(rows), DEFAULT_CHUNK_SIZE):
+        results.extend(validate_attendance_rows(rows[start:start + DEFAULT_CHUNK_SIZE], start))
+
+    return results
+
+
+@frappe.whitelist()
+def import_attendance(rows, submit=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import attendance rows in bulk import mode.
+
+    Small imports run immediately and return per-row results. Large imports
+    run in a background job which publishes the results to the user when done.
+
+    Args:
+        rows: JSON list of attendance rows
+        submit: Submit each record after insert
+        chunk_size: Number of rows per chunk
+    """
+    frappe.has_permission('Attendance', 'create', throw=True)
+    rows = _parse_rows(rows)
+
+    if len(rows) <= ENQUEUE_THRESHOLD:
+        return import_attendance_rows(rows, submit=cint(submit), chunk_size=chunk_size)
+
+    frappe.enqueue(
+        'advanced_attendance.bulk_attendance.import_attendance_job',
+        queue='long',
+        timeout=3600,
+        rows=rows,
+        submit=cint(submit),
+        chunk_size=chunk_size,
+        user=frappe.session.user
+    )
+
+    return {'queued': True, 'rows': len(rows)}
+
+
+def import_attendance_job(rows, submit=0, chunk_size=DEFAULT_CHUNK_SIZE, user=None):
+    """Background job for large imports."""
+    results = import_attendance_rows(rows, submit=submit, chunk_size=chunk_size)
+
+    frappe.publish_realtime(
+        'advanced_attendance_import_complete',
+        {
+            'total': len(results),
+            'imported': sum(1 for result in results if result.valid),
+            'errors': [result for result in results if not result.valid]
+        },
+        user=user
+    )
+
+
+def mark_attendance_rows(rows, submit=False):
+    """
+    Validate attendance marks together and bulk insert the ones that pass.
+
+    Checks done for the whole batch:
+    - employee exists, is not Inactive and was employed on the attendance date
+      (one Employee query)
+    - the user may create (and submit) attendance for the employee,
+      including User Permissions on Employee, Company and Department
+    - attendance date is not in the future and status is valid
+    - first-record/second-record overlap rules (one occupancy query)
+
+    As in Attendance.validate, approved leave sets the status to On Leave
+    or Half Day (one Leave Application query), and rows without a shift get
+    the shift of the employee's active assignment or default shift.
+
+    Rows are written with a batched insert and do not run document
+    controller methods. Occupancy counters are updated after commit.
+
+    Args:
+        rows: List of attendance rows (dicts)
+        submit: Insert the records as submitted
+
+    Returns:
+        list: One result per row with idx, valid, name and error
+    """
+    meta = frappe.get_meta('Attendance')
+    workflow = get_attendance_workflow()
+    if submit and workflow:
+        frappe.throw(
+            _('Attendance follows the workflow {0}, records can only be marked as drafts').format(workflow.name)
+        )
+
+    valid_statuses = set((meta.get_field('status').options or '').split('\n'))
+    dates = [parse_attendance_date(row.get('attendance_date')) for row in rows]
+    known_dates = [date for date in dates if date]
+
+    with batch_cache(
+        [row.get('employee') for row in rows],
+        min(known_dates, default=None),
+        max(known_dates, default=None)
+    ) as cache:
+        employees = {
+            row.get('employee'): cache.get_employee(row.get('employee'))
+            for row in rows
+            if row.get('employee')
+        }
+        occupancy = get_existing_attendance_counts(
+            (row.get('employee'), date)
+            for row, date in zip(rows, dates)
+            if employees.get(row.get('employee')) and date
+        )
+        leaves = _get_approved_leaves(
+            [name for name, employee in employees.items() if employee],
+            min(known_dates, default=None),
+            max(known_dates, default=None)
+        )
+        today = getdate(nowdate())
+        archived_through = get_archived_through()
+
+        results = []
+        accepted = []
+        for idx, (row, attendance_date) in enumerate(zip(rows, dates), start=1):
+            result = frappe._dict(idx=idx, valid=False, name=None, error=None)
+            results.append(result)
+
+            employee = employees.get(row.get('employee'))
+            result.error = _check_mark_row(
+                row, attendance_date, employee, valid_statuses, today, archived_through
+            ) or _check_mark_permission(row, attendance_date, employee, submit)
+            if result.error:
+                continue
+
+            checked = check_attendance_row(row, occupancy)
+            if checked.error:
+                result.error = checked.error
+                continue
+
+            _apply_leave(row, leaves.get(checked.key))
+            if not row.get('shift'):
+                row.shift = cache.get_shift(employee.name, attendance_date)
+
+            occupancy[checked.key] += 1
+            result.valid = True
+            accepted.append((row, employee, checked.key, result))
+
+    if accepted:
+        _insert_marked_rows(meta, accepted, submit, workflow)
+
+    return results
+
+
+def parse_attendance_date(value):
+    """Attendance date of a row, or None if it is missing or not a date."""
+    if not value:
+        return None
+
+    try:
+        return getdate(value)
+    except Exception:
+        return None
+
+
+def get_attendance_workflow():
+    """The active Workflow of Attendance, or None."""
+    from frappe.model.workflow import get_workflow_name
+
+    workflow_name = get_workflow_name('Attendance')
+    return frappe.get_cached_doc('Workflow', workflow_name) if workflow_name else None
+
+
+def _get_approved_leaves(employees, from_date, to_date):
+    """
+    Approved leave applications of the employees over the date range.
+
+    Returns:
+        dict: (employee, date string) -> leave application
+    """
+    if not employees or not from_date or not to_date:
+        return {}
+
+    applications = frappe.get_all(
+        'Leave Application',
+        filters={
+            'employee': ['in', employees],
+            'from_date': ['<=', to_date],
+            'to_date': ['>=', from_date],
+            'status': 'Approved',
+            'docstatus': 1
+        },
+        fields=['name', 'employee', 'leave_type', 'from_date', 'to_date', 'half_day_date']
+    )
+
+    leaves = {}
+    for application in applications:
+        day = max(getdate(application.from_date), getdate(from_date))
+        while day <= min(getdate(application.to_date), getdate(to_date)):
+            leaves[get_attendance_key(application.employee, day)] = application
+            day = add_days(day, 1)
+
+    return leaves
+
+
+def _apply_leave(row, leave):
+    """Set the leave details and status of a row as Attendance.check_leave_record does."""
+    if leave:
+        row.leave_type = leave.leave_type
+        row.leave_application = leave.name
+        if leave.half_day_date and getdate(leave.half_day_date) == getdate(row.get('attendance_date')):
+            row.status = 'Half Day'
+        else:
+            row.status = 'On Leave'
+    else:
+        row.leave_type = None
+        row.leave_application = None
+
+
+def _check_mark_row(row, attendance_date, employee, valid_statuses, today, archived_through=None):
+    """Row checks that do not depend on other rows of the batch."""
+    if not row.get('employee') or not row.get('attendance_date'):
+        return _('Employee and Attendance Date are required')
+
+    if not attendance_date:
+        return _('Invalid attendance date {0}').format(row.get('attendance_date'))
+
+    if not employee:
+        return _('Employee {0} does not exist').format(row.get('employee'))
+
+    if employee.status == 'Inactive':
+        return _('Cannot mark attendance for an Inactive employee {0}').format(row.get('employee'))
+
+    if row.get('status') not in valid_statuses:
+        return _('Invalid status {0}').format(row.get('status'))
+
+    if attendance_date > today:
+        return _('Attendance can not be marked for future dates')
+
+    if archived_through and attendance_date <= archived_through:
+        return _('Attendance up to {0} is archived').format(archived_through)
+
+    if employee.date_of_joining and attendance_date < getdate(employee.date_of_joining):
+        return _('Attendance date can not be less than employee\'s joining date')
+
+    if employee.relieving_date and attendance_date > getdate(employee.relieving_date):
+        return _('Attendance date can not be after employee\'s relieving date')
+
+    if bool(row.get('in_time')) != bool(row.get('out_time')):
+        return _('In Time and Out Time must be set together')
+
+    if row.get('in_time') and get_datetime(row.get('out_time')) <= get_datetime(row.get('in_time')):
+        return _('Out Time must be after In Time')
+
+    return None
+
+
+def _check_mark_permission(row, attendance_date, employee, submit):
+    """
+    Document-level permission check of one row.
+
+    Runs against an unsaved Attendance carrying the employee's company and
+    department, so User Permissions on Employee, Company and Department
+    apply as they do for a record saved from the form.
+    """
+    doc = frappe.get_doc({
+        'doctype': 'Attendance',
+        'employee': employee.name,
+        'company': employee.company,
+        'department': employee.department,
+        'attendance_date': attendance_date,
+        'status': row.get('status')
+    })
+
+    for ptype in ('create', 'submit') if submit else ('create',):
+        if not frappe.has_permission('Attendance', ptype, doc=doc):
+            return _('Not permitted to mark attendance for employee {0}').format(employee.name)
+
+    return None
+
+
+def _insert_marked_rows(meta, accepted, submit, workflow=None):
+    """Write accepted rows with batched inserts and queue counter updates."""
+    names = reserve_attendance_names(meta, len(accepted))
+    timestamp = now()
+    user = frappe.session.user
+    docstatus = 1 if submit else 0
+    naming_series = _get_naming_series(meta)
+
+    fields = [
+        'name',
+        'creation',
+        'modified',
+        'owner',
+        'modified_by',
+        'docstatus',
+        'naming_series',
+        'employee',
+        'employee_name',
+        'company',
+        'department',
+        'attendance_date',
+        'status',
+        'custom_overlap',
+        'custom_additional_attendance',
+        'shift',
+        'in_time',
+        'out_time',
+        'working_hours',
+        'leave_type',
+        'leave_application'
+    ]
+    if workflow:
+        # Drafts enter the workflow in its initial state, as on a form save
+        fields.append(workflow.workflow_state_field)
+
+    values = []
+    for name, (row, employee, key, result) in zip(names, accepted):
+        result.name = name
+        values.append((
+            name,
+            timestamp,
+            timestamp,
+            user,
+            user,
+            docstatus,
+            naming_series,
+            employee.name,
+            employee.employee_name,
+            employee.company,
+            employee.department,
+            key[1],
+            row.get('status'),
+            cint(row.get('custom_overlap')),
+            cint(row.get('custom_additional_attendance')),
+            row.get('shift'),
+            row.get('in_time'),
+            row.get('out_time'),
+            _get_working_hours(row),
+            row.get('leave_type'),
+            row.get('leave_application')
+        ) + ((workflow.states[0].state,) if workflow else ()))
+
+    frappe.db.bulk_insert('Attendance', fields, values, chunk_size=BULK_INSERT_CHUNK_SIZE)
+
+    # bulk_insert skips doc events, so submitted rows refresh their day summaries here
+    if submit:
+        refresh_day_summaries([key for _row, _employee, key, _result in accepted])
+
+    if is_occupancy_cache_enabled():
+        queue_occupancy_deltas([(key, 1) for _row, _employee, key, _result in accepted])
+
+    employees = [employee.name for _row, employee, _key, _result in accepted]
+    frappe.db.after_commit.add(partial(clear_attendance_preview, employees))
+
+
+def _get_working_hours(row):
+    if row.get('working_hours') is None and row.get('in_time') and row.get('out_time'):
+        return flt(time_diff_in_hours(row.get('out_time'), row.get('in_time')), 2)
+
+    return flt(row.get('working_hours'))
+
+
+def _get_naming_series(meta):
+    options = (meta.get_field('naming_series').options or '').split('\n')
+    return options[0] if options and options[0] else 'HR-ATT-.YYYY.-'
+
+
+def reserve_attendance_names(meta, count):
+    """
+    Reserve a block of Attendance names from the naming series in one update.
+
+    Args:
+        meta: Attendance meta
+        count: Number of names to reserve
+
+    Returns:
+        list: Reserved document names
+    """
+    series = _get_naming_series(meta)
+    if '#' not in series:
+        series = series + '.#####'
+
+    prefix, hashes = series.rsplit('.', 1)
+    prefix = parse_naming_series(prefix)
+    digits = len(hashes)
+
+    current = frappe.db.sql('select `current` from `tabSeries` where `name`=%s for update', prefix)
+    if current and current[0][0] is not None:
+        start = cint(current[0][0])
+        frappe.db.sql('update `tabSeries` set `current` = %s where `name` = %s', (start + count, prefix))
+    else:
+        start = 0
+        frappe.db.sql('insert into `tabSeries` (`name`, `current`) values (%s, %s)', (prefix, count))
+
+    return [f'{prefix}{str(start + i).zfill(digits)}' for i in range(1, count + 1)]
+
+
+@frappe.whitelist()
+def mark_attendance_bulk(rows, submit=0):
+    """
+    Mark attendance for many employees in one call.
+
+    Args:
+        rows: JSON list of rows with employee, attendance_date, status,
+            shift, in_time, out_time, custom_overlap and
+            custom_additional_attendance
+        submit: Insert the records as submitted, refused while a workflow
+            is active on Attendance
+
+    Returns:
+        list: One result per row with idx, valid, name and error
+    """
+    frappe.has_permission('Attendance', 'create', throw=True)
+    if cint(submit):
+        frappe.has_permission('Attendance', 'submit', throw=True)
+
+    rows = [
+        frappe._dict({field: row.get(field) for field in BULK_MARK_FIELDS})
+        for row in _parse_rows(rows)
+    ]
+
+    return mark_attendance_rows(rows, submit=cint(submit))
@@ -0,0 +1,373 @@
+"""
+Attendance from Employee Checkin
+
+Builds attendance records from unlinked Employee Checkins, following the
+multi-record-per-day model of this app:
+- Checkins of an employee are paired into IN/OUT sessions, each session
+  becomes one attendance record on the date it started
+- The first record of a day has no option; every further record gets
+  Overlap when its working time overlaps an existing or new record of the
+  day, and Additional Attendance otherwise
+- Records are validated and written per chunk of employees with the bulk
+  marking path, and the checkins are linked to their records
+
+Employees are split into shards processed by parallel background jobs.
+Shards never share an employee, so they never compete for the same
+employee-day. Shard jobs have fixed job ids, and a new run is refused
+while any shard of an earlier run is queued or running, so two runs never
+read the same unlinked checkins.
+"""
+
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, flt, get_datetime, getdate, now
+
+from advanced_attendance.archive import get_archived_through
+from advanced_attendance.bulk_attendance import get_attendance_workflow, mark_attendance_rows
+from advanced_attendance.intervals import intervals_overlap
+
+# Employees handled per committed chunk inside a shard
+EMPLOYEES_PER_CHUNK = 200
+
+# Default and largest number of parallel shard jobs
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 16
+
+# Job id of a shard, see get_shard_job_id
+SHARD_JOB_ID = "advanced_attendance:attendance_from_checkins:{0}"
+
+# An IN without an OUT within this many hours does not form a session
+MAX_SESSION_HOURS = 16
+
+
+def build_sessions(logs, max_session_hours=MAX_SESSION_HOURS):
+    """
+    Pair the time-ordered logs of one employee into IN/OUT sessions.
+
+    Logs without a log type alternate between IN and OUT. Repeated INs
+    within an open session are merged into it, and an OUT without an open
+    session is ignored. A session not closed within max_session_hours is
+    dropped, so its logs stay unlinked.
+
+    Args:
+        logs: Logs of one employee sorted by time, dicts with name, time and log_type
+        max_session_hours: Longest allowed session
+
+    Returns:
+        list: Sessions as dicts with in_time, out_time and logs (names)
+    """
+    max_gap = timedelta(hours=max_session_hours)
+    sessions = []
+    current = None
+
+    for log in logs:
+        log_time = get_datetime(log["time"])
+        log_type = log.get("log_type") or ("OUT" if current else "IN")
+
+        if current and log_time - current["in_time"] > max_gap:
+            current = None  # Never closed, drop it
+
+        if log_type == "IN":
+            if current:
+                current["logs"].append(log["name"])
+            else:
+                current = {"in_time": log_time, "out_time": None, "logs": [log["name"]]}
+            continue
+
+        if not current:
+            continue  # OUT without an open session
+
+        current["out_time"] = log_time
+        current["logs"].append(log["name"])
+        sessions.append(current)
+        current = None
+
+    return sessions
+
+
+def plan_day_records(sessions, existing):
+    """
+    Turn the sessions of one employee-day into attendance rows with flags.
+
+    Args:
+        sessions: Sessions starting on the day, sorted by in_time
+        existing: Non-cancelled attendance of the day, dicts with in_time and out_time
+
+    Returns:
+        list: (row, session) pairs
+    """
+    intervals = [
+        (get_datetime(record["in_time"]), get_datetime(record["out_time"]))
+        for record in existing
+        if record.get("in_time") and record.get("out_time")
+    ]
+    count = len(existing)
+    planned = []
+
+    for session in sessions:
+        overlaps = any(
+            intervals_overlap(session["in_time"], session["out_time"], start, end)
+            for start, end in intervals
+        )
+
+        planned.append((frappe._dict(
+            attendance_date=str(session["in_time"].date()),
+            status="Present",
+            in_time=session["in_time"],
+            out_time=session["out_time"],
+            working_hours=flt((session["out_time"] - session["in_time"]).total_seconds() / 3600, 2),
+            custom_overlap=1 if count and overlaps else 0,
+            custom_additional_attendance=1 if count and not overlaps else 0
+        ), session))
+
+        intervals.append((session["in_time"], session["out_time"]))
+        count += 1
+
+    return planned
+
+
+def get_unlinked_checkins(employees, from_date, to_date):
+    """
+    Checkins of the employees not linked to any attendance yet.
+
+    Reads past the end of the range by MAX_SESSION_HOURS, so a session
+    starting on the last day can still be closed.
+    """
+    return frappe.db.sql(
+        """
+        select name, employee, time, log_type, shift
+        from `tabEmployee Checkin`
+        where employee in %(employees)s
+            and time >= %(from_time)s and time < %(to_time)s
+            and coalesce(attendance, '') = ''
+            and coalesce(skip_auto_attendance, 0) = 0
+        order by employee, time
+        """,
+        {
+            "employees": employees,
+            "from_time": get_datetime(from_date),
+            "to_time": get_datetime(add_days(to_date, 1)) + timedelta(hours=MAX_SESSION_HOURS)
+        },
+        as_dict=True
+    )
+
+
+def get_existing_attendance(employees, from_date, to_date):
+    """Non-cancelled attendance of the employees in the range, keyed by (employee, date)."""
+    records = frappe.get_all(
+        "Attendance",
+        filters={
+            "employee": ["in", employees],
+            "attendance_date": ["between", [from_date, to_date]],
+            "docstatus": ["!=", 2]  # Exclude cancelled records
+        },
+        fields=["employee", "attendance_date", "in_time", "out_time"]
+    )
+
+    existing = {}
+    for record in records:
+        existing.setdefault((record.employee, str(getdate(record.attendance_date))), []).append(record)
+
+    return existing
+
+
+def link_checkins(links):
+    """
+    Link many checkins to their attendance with a single UPDATE statement.
+
+    Args:
+        links: dict of checkin name -> attendance name
+    """
+    if not links:
+        return
+
+    names = list(links)
+    cases = " ".join(["when %s then %s"] * len(names))
+    values = [value for name in names for value in (name, links[name])]
+
+    frappe.db.sql(
+        f"""
+        update `tabEmployee Checkin`
+        set attendance = case name {cases} end,
+            modified = %s,
+            modified_by = %s
+        where name in %s
+        """,
+        values + [now(), frappe.session.user, names]
+    )
+
+
+def plan_employee_records(employee, logs, existing, from_date, to_date):
+    """Build attendance rows for one employee's logs in the date range."""
+    sessions_by_date = {}
+    for session in build_sessions(logs):
+        session_date = session["in_time"].date()
+        if from_date <= session_date <= to_date:
+            sessions_by_date.setdefault(str(session_date), []).append(session)
+
+    # Each record takes the shift of its own session's checkins
+    shifts = {log["name"]: log.get("shift") for log in logs}
+
+    planned = []
+    for attendance_date, sessions in sorted(sessions_by_date.items()):
+        for row, session in plan_day_records(sessions, existing.get((employee, attendance_date), [])):
+            row.employee = employee
+            row.shift = next((shifts[name] for name in session["logs"] if shifts.get(name)), None)
+            planned.append((row, session))
+
+    return planned
+
+
+def generate_for_employees(employees, from_date, to_date, submit=True):
+    """
+    Generate attendance from checkins for a chunk of employees.
+
+    Returns:
+        dict: Number of created records and per-row errors
+    """
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    checkins = get_unlinked_checkins(employees, from_date, to_date)
+    if not checkins:
+        return {"created": 0, "errors": []}
+
+    logs_by_employee = {}
+    for checkin in checkins:
+        logs_by_employee.setdefault(checkin.employee, []).append(checkin)
+
+    existing = get_existing_attendance(list(logs_by_employee), from_date, to_date)
+
+    planned = []
+    for employee, logs in logs_by_employee.items():
+        planned.extend(plan_employee_records(employee, logs, existing, from_date, to_date))
+
+    if not planned:
+        return {"created": 0, "errors": []}
+
+    results = mark_attendance_rows([row for row, _session in planned], submit=submit)
+
+    links = {}
+    errors = []
+    for (row, session), result in zip(planned, results):
+        if result.valid:
+            links.update((log, result.name) for log in session["logs"])
+        else:
+            errors.append({"employee": row.employee, "attendance_date": row.attendance_date, "error": result.error})
+
+    link_checkins(links)
+
+    return {"created": sum(1 for result in results if result.valid), "errors": errors}
+
+
+def generate_attendance_shard(employees, from_date, to_date, submit=1, shard=0):
+    """Background job: generate attendance for one shard of employees, committing per chunk."""
+    created = 0
+    errors = []
+
+    for start in range(0, len(employees), EMPLOYEES_PER_CHUNK):
+        chunk = employees[start:start + EMPLOYEES_PER_CHUNK]
+        try:
+            result = generate_for_employees(chunk, from_date, to_date, submit=cint(submit))
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(title=f"Attendance from checkins failed (shard {shard})")
+            continue
+
+        created += result["created"]
+        errors.extend(result["errors"])
+
+    if errors:
+        frappe.log_error(
+            title=f"Attendance from checkins: {len(errors)} row(s) skipped (shard {shard})",
+            message=frappe.as_json(errors)
+        )
+
+    return {"created": created, "errors": len(errors)}
+
+
+def get_shard_job_id(shard):
+    return SHARD_JOB_ID.format(shard)
+
+
+def is_generation_running():
+    """Check if a shard of an earlier run is still queued or running."""
+    from frappe.utils.background_jobs import is_job_enqueued
+
+    return any(is_job_enqueued(get_shard_job_id(shard)) for shard in range(MAX_WORKERS))
+
+
+def get_checkin_employees(from_date, to_date):
+    """Employees with unlinked checkins in the date range."""
+    return frappe.db.sql_list(
+        """
+        select distinct employee
+        from `tabEmployee Checkin`
+        where time >= %(from_time)s and time < %(to_time)s
+            and coalesce(attendance, '') = ''
+            and coalesce(skip_auto_attendance, 0) = 0
+        order by employee
+        """,
+        {
+            "from_time": get_datetime(from_date),
+            "to_time": get_datetime(add_days(to_date, 1))
+        }
+    )
+
+
+@frappe.whitelist()
+def generate_attendance_from_checkins(from_date, to_date, workers=DEFAULT_WORKERS, submit=1):
+    """
+    Queue attendance generation from checkins, sharded by employee.
+
+    Args:
+        from_date: First attendance date
+        to_date: Last attendance date
+        workers: Number of parallel shard jobs, at most MAX_WORKERS
+        submit: Create the records as submitted, refused while a workflow
+            is active on Attendance
+
+    Returns:
+        dict: Number of employees and queued shards
+    """
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    if getdate(from_date) > getdate(to_date):
+        frappe.throw(_("From Date cannot be after To Date"))
+
+    archived_through = get_archived_through()
+    if archived_through and getdate(from_date) <= archived_through:
+        # Checkins of archived days were unlinked when their attendance moved
+        frappe.throw(_("Attendance up to {0} is archived").format(frappe.format(archived_through, {"fieldtype": "Date"})))
+
+    workflow = get_attendance_workflow()
+    if cint(submit) and workflow:
+        frappe.throw(_("Attendance follows the workflow {0}, records can only be created as drafts").format(workflow.name))
+
+    if is_generation_running():
+        frappe.throw(_("Attendance is already being generated from checkins, please wait for it to finish"))
+
+    employees = get_checkin_employees(from_date, to_date)
+    workers = max(1, min(cint(workers) or DEFAULT_WORKERS, MAX_WORKERS, len(employees) or 1))
+
+    for shard in range(workers):
+        shard_employees = employees[shard::workers]
+        if not shard_employees:
+            continue
+
+        frappe.enqueue(
+            "advanced_attendance.checkin_attendance.generate_attendance_shard",
+            queue="long",
+            timeout=3600 * 4,
+            # A concurrent request queuing the same shard is dropped
+            job_id=get_shard_job_id(shard),
+            deduplicate=True,
+            employees=shard_employees,
+            from_date=from_date,
+            to_date=to_date,
+            submit=cint(submit),
+            shard=shard
+        )
+
+    return {"employees": len(employees), "shards": workers if employees else 0}
@@ -0,0 +1,155 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+def connect(context):
+    frappe.init(site=get_site(context))
+    frappe.connect()
+
+
+@click.command("audit-attendance-overlaps")
+@click.option("--from-date", required=True, help="First attendance date (YYYY-MM-DD)")
+@click.option("--to-date", required=True, help="Last attendance date (YYYY-MM-DD)")
+@pass_context
+def audit_attendance_overlaps(context, from_date, to_date):
+    """Report records whose working time overlaps without Overlap, and Overlap records that overlap nothing"""
+    from advanced_attendance.intervals import audit_time_overlaps
+
+    connect(context)
+    try:
+        findings = 0
+        for finding in audit_time_overlaps(from_date, to_date):
+            findings += 1
+            click.echo(frappe.as_json(finding, indent=None))
+
+        click.secho(f"{findings} finding(s)", fg="yellow" if findings else "green", err=True)
+    finally:
+        frappe.destroy()
+
+
+@click.command("rebuild-attendance-day-summary")
+@click.option("--from-date", required=True, help="First attendance date (YYYY-MM-DD)")
+@click.option("--to-date", required=True, help="Last attendance date (YYYY-MM-DD)")
+@click.option("--chunk-days", default=7, type=int, help="Days rebuilt per committed chunk")
+@pass_context
+def rebuild_attendance_day_summary(context, from_date, to_date, chunk_days):
+    """Rebuild the Attendance Day Summary for a date range from submitted attendance"""
+    from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+        rebuild_day_summaries
+    )
+
+    connect(context)
+    try:
+        written = rebuild_day_summaries(from_date, to_date, chunk_days=chunk_days)
+        click.secho(f"{written} summary row(s) written", fg="green", err=True)
+    finally:
+        frappe.destroy()
+
+
+@click.command("export-attendance")
+@click.option("--from-date", required=True, help="First attendance date (YYYY-MM-DD)")
+@click.option("--to-date", required=True, help="Last attendance date (YYYY-MM-DD)")
+@click.option("--employee", multiple=True, help="Employee to export, can be repeated")
+@click.option("--flag-type", default="all", type=click.Choice(["all", "overlap", "additional", "flagged", "unflagged"]))
+@click.option("--format", "export_format", default="csv", type=click.Choice(["csv", "jsonl"]))
+@click.option("--include-cancelled", is_flag=True, default=False, help="Also export cancelled records")
+@click.option("--output", type=click.Path(dir_okay=False, writable=True), help="Output file, defaults to stdout")
+@pass_context
+def export_attendance(context, from_date, to_date, employee, flag_type, export_format, include_cancelled, output):
+    """Stream attendance with overlap flags as CSV or JSON Lines"""
+    import sys
+
+    from advanced_attendance.export import write_export
+
+    connect(context)
+    try:
+        stream = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+        try:
+            count = write_export(
+                stream,
+                export_format,
+                from_date=from_date,
+                to_date=to_date,
+                employee=list(employee) or None,
+                flag_type=flag_type,
+                include_cancelled=include_cancelled
+            )
+        finally:
+            if output:
+                stream.close()
+
+        click.secho(f"{count} record(s) exported", fg="green", err=True)
+    finally:
+        frappe.destroy()
+
+
+@click.command("sync-advanced-attendance")
+@pass_context
+def sync_advanced_attendance(context):
+    """Sync the settings DocType and attendance index of Advanced Attendance"""
+    from advanced_attendance.install import sync_app_setup
+
+    connect(context)
+    try:
+        if sync_app_setup():
+            click.secho("Advanced Attendance setup synced", fg="green")
+        else:
+            click.secho("Advanced Attendance setup could not be synced, see the errors above", fg="red")
+    finally:
+        frappe.destroy()
+
+
+@click.command("find-duplicate-attendance")
+@click.option("--from-date", help="First attendance date (YYYY-MM-DD)")
+@click.option("--to-date", help="Last attendance date (YYYY-MM-DD)")
+@click.option("--employee", help="Only this employee")
+@pass_context
+def find_duplicate_attendance(context, from_date, to_date, employee):
+    """List every record of employee-days with unflagged duplicate attendance, with the proposed action"""
+    from advanced_attendance.duplicates import find_duplicates
+
+    connect(context)
+    try:
+        extra = 0
+        for row in find_duplicates(from_date, to_date, employee):
+            extra += row["proposal"] == "resolve"
+            click.echo(frappe.as_json(row, indent=None))
+
+        click.secho(f"{extra} record(s) proposed for resolution", fg="yellow" if extra else "green", err=True)
+    finally:
+        frappe.destroy()
+
+
+@click.command("resolve-duplicate-attendance")
+@click.option("--action", required=True, type=click.Choice(["cancel", "flag"]), help="Cancel the extra records or flag them")
+@click.option("--from-date", help="First attendance date (YYYY-MM-DD)")
+@click.option("--to-date", help="Last attendance date (YYYY-MM-DD)")
+@click.option("--employee", help="Only this employee")
+@click.option("--chunk-size", default=200, type=int, help="Records resolved per committed chunk")
+@pass_context
+def resolve_duplicate_attendance(context, action, from_date, to_date, employee, chunk_size):
+    """Resolve duplicate attendance, keeping the first record of each employee-day"""
+    from advanced_attendance.duplicates import resolve_duplicates
+
+    connect(context)
+    try:
+        result = resolve_duplicates(action, from_date, to_date, employee, chunk_size=chunk_size)
+        click.secho(f"{result['resolved']} record(s) resolved", fg="green", err=True)
+        if result["failed"]:
+            click.secho(f"{len(result['failed'])} record(s) not resolved, see Error Log", fg="red", err=True)
+    finally:
+        frappe.destroy()
+
+
+commands = [
+    audit_attendance_overlaps,
+    rebuild_attendance_day_summary,
+    export_attendance,
+    sync_advanced_attendance,
+    find_duplicate_attendance,
+    resolve_duplicate_attendance
+]
@@ -0,0 +1,359 @@
+"""
+Duplicate Attendance
+
+Finds and resolves accidental duplicates: employee-days with more than
+one non-cancelled record where neither Overlap nor Additional Attendance
+is set, e.g. from before this app's rules existed or from past races.
+
+Detection is one window-function query over the date range. Within each
+employee-day the record to keep is proposed by ROW_NUMBER(): submitted
+before draft, then the earliest created.
+
+Resolution works on the other records, in committed chunks:
+- cancel: submitted records are cancelled, drafts are deleted
+- flag: records are kept and marked Overlap when their working time
+  overlaps the kept record, a record of the day already flagged, or an
+  extra record flagged before it, Additional Attendance otherwise (as
+  checkin_attendance.plan_day_records does). Each flagged record gets a
+  Version showing the change, and the job result lists them
+
+Resolved records no longer match the detection query, so an interrupted
+job simply continues with what is left when run again.
+"""
+
+from functools import partial
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, getdate, strip_html
+
+from advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary import (
+    refresh_day_summaries
+)
+from advanced_attendance.intervals import intervals_overlap
+from advanced_attendance.overrides.attendance import clear_attendance_preview
+from advanced_attendance.utils import stream_rows
+
+RESOLVE_ACTIONS = ("cancel", "flag")
+
+# Records resolved per committed chunk
+RESOLVE_CHUNK_SIZE = 200
+
+RESOLVE_JOB_ID = "advanced_attendance:resolve_duplicate_attendance"
+
+
+def get_duplicate_query(from_date=None, to_date=None, employee=None, records=None, exclude=None, limit=None):
+    """
+    Build the window-function query over unflagged non-cancelled attendance.
+
+    Args:
+        from_date: First attendance date (optional)
+        to_date: Last attendance date (optional)
+        employee: Only this employee, or list of employees (optional)
+        records: "kept" or "extra" for only the kept records or only the
+            records proposed for resolution, None for both
+        exclude: Names to leave out, e.g. records that failed to resolve
+        limit: Maximum number of rows
+
+    Returns:
+        tuple: (query, values)
+    """
+    conditions = [
+        "docstatus != 2",
+        "coalesce(custom_overlap, 0) = 0",
+        "coalesce(custom_additional_attendance, 0) = 0"
+    ]
+    values = {}
+
+    if from_date:
+        conditions.append("attendance_date >= %(from_date)s")
+        values["from_date"] = getdate(from_date)
+    if to_date:
+        conditions.append("attendance_date <= %(to_date)s")
+        values["to_date"] = getdate(to_date)
+    if employee:
+        conditions.append("employee in %(employees)s")
+        values["employees"] = [employee] if isinstance(employee, str) else list(employee)
+    if exclude:
+        conditions.append("name not in %(exclude)s")
+        values["exclude"] = list(exclude)
+
+    outer_conditions = ["day_records > 1"]
+    if records == "kept":
+        outer_conditions.append("rank_in_day = 1")
+    elif records == "extra":
+        outer_conditions.append("rank_in_day > 1")
+
+    query = f"""
+        select name, employee, employee_name, attendance_date, docstatus, status,
+            in_time, out_time, creation, rank_in_day, day_records
+        from (
+            select name, employee, employee_name, attendance_date, docstatus, status,
+                in_time, out_time, creation,
+                row_number() over (
+                    partition by employee, attendance_date
+                    order by docstatus desc, creation asc, name asc
+                ) as rank_in_day,
+                count(*) over (partition by employee, attendance_date) as day_records
+            from `tabAttendance`
+            where {" and ".join(conditions)}
+        ) ranked
+        where {" and ".join(outer_conditions)}
+        order by employee, attendance_date, rank_in_day
+    """
+
+    if limit:
+        query += " limit %(limit)s"
+        values["limit"] = cint(limit)
+
+    return query, values
+
+
+def count_duplicates(from_date=None, to_date=None, employee=None):
+    """
+    Count duplicate employee-days and the records proposed for resolution.
+
+    Returns:
+        frappe._dict: days and extra_records
+    """
+    query, values = get_duplicate_query(from_date, to_date, employee)
+    counts = frappe.db.sql(
+        f"""
+        select
+            coalesce(sum(case when rank_in_day = 1 then 1 else 0 end), 0) as days,
+            coalesce(sum(case when rank_in_day > 1 then 1 else 0 end), 0) as extra_records
+        from ({query}) duplicates
+        """,
+        values,
+        as_dict=True
+    )[0]
+
+    return frappe._dict(days=cint(counts.days), extra_records=cint(counts.extra_records))
+
+
+def find_duplicates(from_date=None, to_date=None, employee=None):
+    """
+    Stream every record of every duplicate employee-day.
+
+    Yields:
+        dict: Record with rank_in_day, day_records and the proposed action
+            ("keep" for the first record of the day, "resolve" otherwise)
+    """
+    query, values = get_duplicate_query(from_date, to_date, employee)
+    for row in stream_rows(query, values):
+        row["proposal"] = "keep" if row["rank_in_day"] == 1 else "resolve"
+        yield row
+
+
+def get_kept_records(rows):
+    """Kept record of each employee-day of rows, in one query."""
+    employees = sorted({row.employee for row in rows})
+    dates = sorted({getdate(row.attendance_date) for row in rows})
+
+    query, values = get_duplicate_query(dates[0], dates[-1], employees, records="kept")
+
+    return {
+        (row.employee, getdate(row.attendance_date)): row
+        for row in frappe.db.sql(query, values, as_dict=True)
+    }
+
+
+def get_flagged_intervals(rows):
+    """
+    Working time of the records of the employee-days of rows that are
+    already flagged, e.g. extra records resolved by an earlier chunk.
+
+    Returns:
+        dict: (employee, date) -> list of (in_time, out_time)
+    """
+    employees = sorted({row.employee for row in rows})
+    dates = sorted({getdate(row.attendance_date) for row in rows})
+
+    records = frappe.get_all(
+        "Attendance",
+        filters={
+            "employee": ["in", employees],
+            "attendance_date": ["between", [dates[0], dates[-1]]],
+            "docstatus": ["!=", 2],  # Exclude cancelled records
+            "in_time": ["is", "set"],
+            "out_time": ["is", "set"]
+        },
+        or_filters={"custom_overlap": 1, "custom_additional_attendance": 1},
+        fields=["employee", "attendance_date", "in_time", "out_time"]
+    )
+
+    intervals = {}
+    for record in records:
+        intervals.setdefault((record.employee, getdate(record.attendance_date)), []).append(
+            (get_datetime(record.in_time), get_datetime(record.out_time))
+        )
+
+    return intervals
+
+
+def get_flag_field(row, intervals):
+    """Overlap if the row's working time overlaps one of intervals, else Additional Attendance."""
+    overlaps = row.in_time and row.out_time and any(
+        intervals_overlap(get_datetime(row.in_time), get_datetime(row.out_time), start, end)
+        for start, end in intervals
+    )
+    return "custom_overlap" if overlaps else "custom_additional_attendance"
+
+
+def resolve_chunk(rows, action):
+    """
+    Resolve one chunk of extra records.
+
+    Each record is resolved in its own savepoint, so one failing record
+    is reported and skipped without losing the rest of the chunk.
+
+    Returns:
+        tuple: (resolved names, names that could not be resolved with their error)
+    """
+    resolved = []
+    failed = []
+
+    if action == "flag":
+        intervals = get_flagged_intervals(rows)
+        for key, keep in get_kept_records(rows).items():
+            if keep.in_time and keep.out_time:
+                intervals.setdefault(key, []).append((get_datetime(keep.in_time), get_datetime(keep.out_time)))
+
+    for row in rows:
+        savepoint = "resolve_duplicate_attendance"
+        frappe.db.savepoint(savepoint)
+        try:
+            if action == "flag":
+                day_intervals = intervals.setdefault((row.employee, getdate(row.attendance_date)), [])
+                field = get_flag_field(row, day_intervals)
+                # Submitted records: set the flag in place, leaving a Version
+                frappe.db.set_value("Attendance", row.name, field, 1, update_modified=True)
+                record_flag_version(row.name, field)
+                if row.in_time and row.out_time:
+                    # Later extras of the day are checked against this one too
+                    day_intervals.append((get_datetime(row.in_time), get_datetime(row.out_time)))
+            elif row.docstatus == 1:
+                frappe.get_doc("Attendance", row.name).cancel()
+            else:
+                frappe.delete_doc("Attendance", row.name)
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.clear_messages()
+            failed.append({"name": row.name, "error": strip_html(str(e))})
+            continue
+
+        resolved.append(row.name)
+
+    if action == "flag":
+        # Flags of submitted records are part of their day summary
+        flagged = set(resolved)
+        refresh_day_summaries(
+            (row.employee, row.attendance_date) for row in rows if row.docstatus == 1 and row.name in flagged
+        )
+
+    employees = list({row.employee for row in rows})
+    frappe.db.after_commit.add(partial(clear_attendance_preview, employees))
+
+    return resolved, failed
+
+
+def record_flag_version(name, field):
+    """Version of a record flagged by duplicate resolution."""
+    frappe.get_doc({
+        "doctype": "Version",
+        "ref_doctype": "Attendance",
+        "docname": name,
+        "data": frappe.as_json({
+            "added": [],
+            "changed": [[field, 0, 1]],
+            "removed": [],
+            "row_changed": [],
+            "comment": _("Flagged by duplicate attendance resolution")
+        })
+    }).insert(ignore_permissions=True)
+
+
+def resolve_duplicates(action, from_date=None, to_date=None, employee=None, chunk_size=RESOLVE_CHUNK_SIZE):
+    """
+    Resolve all extra records of duplicate employee-days in committed chunks.
+
+    Args:
+        action: "cancel" or "flag"
+        from_date: First attendance date (optional)
+        to_date: Last attendance date (optional)
+        employee: Only this employee (optional)
+        chunk_size: Records resolved per chunk
+
+    Returns:
+        dict: Number of resolved records, their names and the records that failed
+    """
+    if action not in RESOLVE_ACTIONS:
+        frappe.throw(_("Action must be one of {0}").format(", ".join(RESOLVE_ACTIONS)))
+
+    chunk_size = cint(chunk_size) or RESOLVE_CHUNK_SIZE
+    resolved = []
+    failed = []
+
+    query, values = get_duplicate_query(from_date, to_date, employee, records="extra")
+    total = frappe.db.sql(f"select count(*) from ({query}) extra", values)[0][0]
+
+    while True:
+        query, values = get_duplicate_query(
+            from_date, to_date, employee,
+            records="extra",
+            exclude=[row["name"] for row in failed],
+            limit=chunk_size
+        )
+        rows = frappe.db.sql(query, values, as_dict=True)
+        if not rows:
+            break
+
+        chunk_resolved, chunk_failed = resolve_chunk(rows, action)
+        frappe.db.commit()
+
+        resolved.extend(chunk_resolved)
+        failed.extend(chunk_failed)
+
+        frappe.publish_progress(
+            min((len(resolved) + len(failed)) * 100 / (total or 1), 100),
+            title=_("Resolving duplicate attendance"),
+            description=_("{0} of {1} record(s) resolved").format(len(resolved), total)
+        )
+
+    if failed:
+        frappe.log_error(
+            title=f"Duplicate attendance: {len(failed)} record(s) not resolved",
+            message=frappe.as_json(failed)
+        )
+
+    frappe.logger("advanced_attendance").info(
+        f"Duplicate attendance ({action}): resolved {frappe.as_json(resolved, indent=None)}"
+    )
+
+    return {"resolved": len(resolved), "names": resolved, "failed": failed}
+
+
+@frappe.whitelist()
+def resolve_duplicate_attendance(action, from_date=None, to_date=None, employee=None):
+    """
+    Queue resolution of duplicate attendance.
+
+    Only one resolution job runs at a time; a new request while one is
+    queued or running is ignored.
+    """
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    if action not in RESOLVE_ACTIONS:
+        frappe.throw(_("Action must be one of {0}").format(", ".join(RESOLVE_ACTIONS)))
+
+    frappe.enqueue(
+        "advanced_attendance.duplicates.resolve_duplicates",
+        queue="long",
+        timeout=3600 * 4,
+        job_id=RESOLVE_JOB_ID,
+        deduplicate=True,
+        action=action,
+        from_date=from_date,
+        to_date=to_date,
+        employee=employee
+    )
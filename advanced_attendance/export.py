@@ -0,0 +1,261 @@
+"""
+Attendance Export
+
+Streams attendance records, including the overlap and additional
+attendance flags, as CSV or JSON Lines. Rows are read through a
+server-side cursor and written one at a time, so memory use does not
+grow with the number of exported records.
+
+Exports are run as background jobs writing a private File, or from the
+command line with `bench export-attendance`.
+"""
+
+import csv
+import hashlib
+import io
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate, now_datetime
+
+EXPORT_FIELDS = [
+    "name",
+    "employee",
+    "employee_name",
+    "company",
+    "department",
+    "attendance_date",
+    "status",
+    "docstatus",
+    "in_time",
+    "out_time",
+    "working_hours",
+    "custom_overlap",
+    "custom_additional_attendance"
+]
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# Flag filters: flag type -> SQL condition
+FLAG_CONDITIONS = {
+    "all": None,
+    "overlap": "custom_overlap = 1",
+    "additional": "custom_additional_attendance = 1",
+    "flagged": "(custom_overlap = 1 or custom_additional_attendance = 1)",
+    "unflagged": "(coalesce(custom_overlap, 0) = 0 and coalesce(custom_additional_attendance, 0) = 0)"
+}
+
+
+def get_export_query(from_date, to_date, employee=None, flag_type="all", include_cancelled=False):
+    """
+    Build the export query for a date range.
+
+    Args:
+        from_date: First attendance date
+        to_date: Last attendance date
+        employee: Optional employee, or list of employees
+        flag_type: One of FLAG_CONDITIONS
+        include_cancelled: Also export cancelled records
+
+    Returns:
+        tuple: (query, values)
+    """
+    flag_type = flag_type or "all"
+    if flag_type not in FLAG_CONDITIONS:
+        frappe.throw(_("Invalid flag type {0}").format(flag_type))
+
+    if getdate(from_date) > getdate(to_date):
+        frappe.throw(_("From Date cannot be after To Date"))
+
+    conditions = ["attendance_date between %(from_date)s and %(to_date)s"]
+    values = {"from_date": getdate(from_date), "to_date": getdate(to_date)}
+
+    if employee:
+        conditions.append("employee in %(employees)s")
+        values["employees"] = [employee] if isinstance(employee, str) else list(employee)
+
+    if not cint(include_cancelled):
+        conditions.append("docstatus != 2")
+
+    if FLAG_CONDITIONS[flag_type]:
+        conditions.append(FLAG_CONDITIONS[flag_type])
+
+    fields = ", ".join(f"`{field}`" for field in EXPORT_FIELDS)
+    query = f"""
+        select {fields}
+        from `tabAttendance`
+        where {" and ".join(conditions)}
+        order by attendance_date, employee, name
+    """
+
+    return query, values
+
+
+def iter_csv(rows):
+    """Yield CSV text for a header and each row, one line at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        yield flush()
+
+
+def iter_jsonl(rows):
+    """Yield one JSON object per row."""
+    for row in rows:
+        yield frappe.as_json(dict(zip(EXPORT_FIELDS, row)), indent=None) + "\n"
+
+
+def iter_export(export_format, **filters):
+    """
+    Stream an attendance export as text chunks.
+
+    Args:
+        export_format: "csv" or "jsonl"
+        filters: Arguments of get_export_query
+    """
+    from advanced_attendance.utils import stream_rows
+
+    if export_format not in EXPORT_FORMATS:
+        frappe.throw(_("Export format must be one of {0}").format(", ".join(EXPORT_FORMATS)))
+
+    query, values = get_export_query(**filters)
+    rows = stream_rows(query, values, as_dict=False)
+
+    if export_format == "csv":
+        yield from iter_csv(rows)
+    else:
+        yield from iter_jsonl(rows)
+
+
+def write_export(stream, export_format, **filters):
+    """
+    Write an attendance export to an open text stream.
+
+    Returns:
+        int: Number of exported records
+    """
+    count = -1 if export_format == "csv" else 0  # CSV starts with a header line
+    for chunk in iter_export(export_format, **filters):
+        stream.write(chunk)
+        count += 1
+
+    return count
+
+
+class HashingWriter:
+    """Text stream writing UTF-8 to a binary file while hashing and sizing it."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.digest = hashlib.md5()
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.stream.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+
+def export_attendance_job(export_format, user, **filters):
+    """Background job: write the export to a private File and notify the user."""
+    file_name = "attendance-export-{0}-{1}.{2}".format(
+        now_datetime().strftime("%Y%m%d-%H%M%S"),
+        frappe.generate_hash(length=6),
+        export_format
+    )
+    path = frappe.get_site_path("private", "files", file_name)
+
+    try:
+        with open(path, "wb") as stream:
+            writer = HashingWriter(stream)
+            count = write_export(writer, export_format, **filters)
+
+        file_doc = frappe.get_doc({
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "is_private": 1,
+            # Hash and size from the write, so the file is not read back
+            "content_hash": writer.digest.hexdigest(),
+            "file_size": writer.size
+        })
+        file_doc.flags.ignore_file_validate = True
+        file_doc.insert(ignore_permissions=True)
+        frappe.db.commit()
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+
+        frappe.db.rollback()
+        frappe.log_error(title="Attendance export failed")
+        frappe.publish_realtime(
+            "attendance_export",
+            {"status": "failed"},
+            user=user
+        )
+        raise
+
+    frappe.publish_realtime(
+        "attendance_export",
+        {"status": "completed", "file_url": file_doc.file_url, "count": count},
+        user=user
+    )
+
+
+@frappe.whitelist()
+def export_attendance(from_date, to_date, employee=None, flag_type="all", export_format="csv",
+                      include_cancelled=0):
+    """
+    Queue an attendance export.
+
+    The file is written in the background and the user is notified with
+    the `attendance_export` realtime event, carrying the file URL.
+
+    Args:
+        from_date: First attendance date
+        to_date: Last attendance date
+        employee: Optional employee, or JSON list of employees
+        flag_type: all, overlap, additional, flagged or unflagged
+        export_format: csv or jsonl
+        include_cancelled: Also export cancelled records
+    """
+    # The export reads tabAttendance directly, without user permission filters
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    if isinstance(employee, str) and employee.startswith("["):
+        employee = frappe.parse_json(employee)
+
+    filters = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "employee": employee,
+        "flag_type": flag_type,
+        "include_cancelled": cint(include_cancelled)
+    }
+
+    # Fail fast on invalid filters instead of inside the job
+    get_export_query(**filters)
+    if export_format not in EXPORT_FORMATS:
+        frappe.throw(_("Export format must be one of {0}").format(", ".join(EXPORT_FORMATS)))
+
+    frappe.enqueue(
+        "advanced_attendance.export.export_attendance_job",
+        queue="long",
+        timeout=3600 * 4,
+        export_format=export_format,
+        user=frappe.session.user,
+        **filters
+    )
@@ -123,6 +123,37 @@ override_doctype_class = {
 # Hook on document methods and events
 
 doc_events = {
+    "Attendance": {
+        "on_update": [
+            "advanced_attendance.occupancy.update_occupancy",
+            "advanced_attendance.overrides.attendance.clear_attendance_preview_cache"
+        ],
+        "on_submit": "advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary.update_day_summary",
+        "on_cancel": [
+            "advanced_attendance.occupancy.update_occupancy",
+            "advanced_attendance.overrides.attendance.clear_attendance_preview_cache",
+            "advanced_attendance.advanced_attendance.doctype.attendance_day_summary.attendance_day_summary.update_day_summary"
+        ],
+        "on_trash": [
+            "advanced_attendance.occupancy.update_occupancy",
+            "advanced_attendance.overrides.attendance.clear_attendance_preview_cache"
+        ]
+    },
+    "Employee": {
+        "on_update": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_trash": "advanced_attendance.batch_cache.invalidate_batch_cache"
+    },
+    "Shift Assignment": {
+        "on_update": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_cancel": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_trash": "advanced_attendance.batch_cache.invalidate_batch_cache"
+    },
+    "Leave Application": {
+        "on_update": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_submit": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_cancel": "advanced_attendance.batch_cache.invalidate_batch_cache",
+        "on_trash": "advanced_attendance.batch_cache.invalidate_batch_cache"
+    },
     "Salary Structure Assignment": {
         "validate": "advanced_attendance.overrides.salary_structure_assignment.calculate_base_from_settings"
     }
@@ -141,23 +172,17 @@ fixtures = [
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"advanced_attendance.tasks.all"
-# 	],
-# 	"daily": [
-# 		"advanced_attendance.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"advanced_attendance.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"advanced_attendance.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"advanced_attendance.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+    "all": [
+        "advanced_attendance.punches.enqueue_coalesce"
+    ],
+    "daily": [
+        "advanced_attendance.occupancy.reconcile_recent_occupancy"
+    ],
+    "weekly": [
+        "advanced_attendance.archive.archive_old_attendance"
+    ]
+}
 
 # Testing
 # -------
@@ -224,6 +249,6 @@ fixtures = [
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+    "Slow Save Log": 30  # days to retain logs
+}
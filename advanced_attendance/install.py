@@ -1,21 +1,46 @@
 # Copyright (c) 2026, eng.khalidselim and contributors
 # For license information, please see license.txt
 
+import os
+
 import frappe
 from frappe import _
 
+# Composite index used by every employee+date attendance count.
+# InnoDB secondary indexes also carry the primary key (name), so the
+# "name != self" condition is answered from the index as well.
+ATTENDANCE_LOOKUP_INDEX = "employee_attendance_date_docstatus_index"
+ATTENDANCE_LOOKUP_INDEX_FIELDS = ["employee", "attendance_date", "docstatus"]
+
 def after_install():
     """Run after app installation to ensure all DocTypes are synced"""
-    sync_salary_base_calculation_settings()
+    sync_app_setup()
 
 def after_migrate():
     """Run after bench migrate to ensure DocTypes are in sync"""
-    sync_salary_base_calculation_settings()
+    sync_app_setup()
+
+def sync_app_setup():
+    """
+    Sync the settings DocType and the attendance index.
+    
+    Both steps are a single metadata query when there is nothing to do.
+    Custom fields are imported by Frappe from fixtures.
+    
+    Returns:
+        bool: True if both steps succeeded
+    """
+    index_ok = ensure_attendance_lookup_index()
+    settings_ok = sync_salary_base_calculation_settings()
+    return index_ok and settings_ok
 
 def sync_salary_base_calculation_settings():
     """
     Ensure Salary Base Calculation Settings DocType exists in the database.
     This handles cases where the DocType was created but not properly synced.
+    
+    Returns:
+        bool: False if the DocType could not be synced
     """
     doctype_name = "Salary Base Calculation Settings"
     
@@ -24,7 +49,6 @@ def sync_salary_base_calculation_settings():
         # Force sync the DocType from JSON
         try:
             from frappe.modules.import_file import import_file_by_path
-            import os
             
             # Get the path to the DocType JSON
             app_path = frappe.get_app_path("advanced_attendance")
@@ -42,8 +66,10 @@ def sync_salary_base_calculation_settings():
                 print(f"✓ DocType '{doctype_name}' synced successfully")
             else:
                 print(f"✗ DocType JSON not found at: {json_path}")
+                return False
         except Exception as e:
             print(f"✗ Error syncing DocType: {e}")
+            return False
     else:
         # DocType exists, check if module is correct
         current_module = frappe.db.get_value("DocType", doctype_name, "module")
@@ -51,3 +77,33 @@ def sync_salary_base_calculation_settings():
             frappe.db.set_value("DocType", doctype_name, "module", "Advanced Attendance")
             frappe.db.commit()
             print(f"✓ Updated module for '{doctype_name}' to 'Advanced Attendance'")
+    
+    return True
+
+def has_attendance_lookup_index():
+    """Check whether the composite attendance lookup index exists."""
+    return bool(frappe.db.has_index("tabAttendance", ATTENDANCE_LOOKUP_INDEX))
+
+def ensure_attendance_lookup_index():
+    """
+    Create the composite (employee, attendance_date, docstatus) index on Attendance.
+    Safe to run repeatedly; the index is only added when missing.
+    
+    Returns:
+        bool: True if the index exists afterwards
+    """
+    if has_attendance_lookup_index():
+        return True
+    
+    try:
+        frappe.db.add_index("Attendance", ATTENDANCE_LOOKUP_INDEX_FIELDS, ATTENDANCE_LOOKUP_INDEX)
+    except Exception as e:
+        print(f"✗ Error adding index '{ATTENDANCE_LOOKUP_INDEX}' on Attendance: {e}")
+        return False
+    
+    if has_attendance_lookup_index():
+        print(f"✓ Index '{ATTENDANCE_LOOKUP_INDEX}' added on Attendance")
+        return True
+    
+    print(f"✗ Index '{ATTENDANCE_LOOKUP_INDEX}' could not be verified on Attendance")
+    return False
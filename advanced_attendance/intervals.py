@@ -0,0 +1,198 @@
+"""
+Attendance Time Intervals
+
+Real time-overlap checks for attendance records, based on in_time and
+out_time, next to the Overlap checkbox:
+- Validation: a record whose working time overlaps an earlier record of
+  the same employee and day must have Overlap selected
+- Audit: one streaming pass over a date range that sorts each employee's
+  intervals and sweeps them in O(n log n), reporting records that overlap
+  without Overlap and records flagged as Overlap that overlap nothing
+
+Records without both in_time and out_time are ignored.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, getdate
+
+from advanced_attendance.utils import stream_rows
+
+
+def intervals_overlap(start, end, other_start, other_end):
+    """Check if two time intervals overlap. Touching intervals do not overlap."""
+    return start < other_end and other_start < end
+
+
+def sweep_intervals(intervals):
+    """
+    Find overlapping pairs in a list of intervals with a sorted sweep.
+
+    Intervals are sorted by start. The interval reaching furthest so far is
+    kept; a later interval starting before its end overlaps it.
+
+    Args:
+        intervals: List of dicts with name, start and end
+
+    Returns:
+        tuple: (pairs, overlapping) - list of (earlier, later) overlapping
+            intervals, and the set of names that overlap any other interval
+    """
+    pairs = []
+    overlapping = set()
+    furthest = None
+
+    for interval in sorted(intervals, key=lambda i: (i["start"], i["end"])):
+        if furthest and interval["start"] < furthest["end"]:
+            pairs.append((furthest, interval))
+            overlapping.update((furthest["name"], interval["name"]))
+
+        if not furthest or interval["end"] > furthest["end"]:
+            furthest = interval
+
+    return pairs, overlapping
+
+
+def get_sibling_intervals(doc):
+    """Working time of the other non-cancelled records of the same employee and day."""
+    filters = {
+        "employee": doc.employee,
+        "attendance_date": doc.attendance_date,
+        "docstatus": ["!=", 2],  # Exclude cancelled records
+        "in_time": ["is", "set"],
+        "out_time": ["is", "set"]
+    }
+    if doc.name and not doc.is_new():
+        filters["name"] = ["!=", doc.name]
+
+    return frappe.get_all("Attendance", filters=filters, fields=["name", "in_time", "out_time", "creation"])
+
+
+def is_created_before(record, doc):
+    """Check if record was created before doc, the order the audit uses too."""
+    if doc.is_new() or not doc.get("creation"):
+        return True
+
+    return (get_datetime(record.creation), record.name) < (get_datetime(doc.creation), doc.name)
+
+
+def validate_time_overlap(doc):
+    """
+    Check the working time of an attendance record against its same-day siblings.
+
+    Throws if the record overlaps an earlier sibling without Overlap
+    selected: as in the audit, the record created last is the additional
+    one that needs the flag, so the first record stays editable after an
+    overlapping one is added. Shows a warning if Overlap is selected but
+    nothing overlaps.
+    """
+    if not doc.get("in_time") or not doc.get("out_time"):
+        return
+
+    start, end = get_datetime(doc.in_time), get_datetime(doc.out_time)
+    siblings = get_sibling_intervals(doc)
+    if not siblings:
+        return
+
+    overlaps = [
+        sibling for sibling in siblings
+        if intervals_overlap(start, end, get_datetime(sibling.in_time), get_datetime(sibling.out_time))
+    ]
+
+    earlier_overlaps = [sibling for sibling in overlaps if is_created_before(sibling, doc)]
+
+    if earlier_overlaps and not cint(doc.get("custom_overlap")):
+        frappe.throw(
+            _("The working time of this record overlaps attendance {0}. "
+              "Select <b>Overlap</b> for records with overlapping time periods.").format(
+                ", ".join(frappe.bold(sibling.name) for sibling in earlier_overlaps)
+            ),
+            title=_("Overlapping Attendance")
+        )
+
+    if not overlaps and cint(doc.get("custom_overlap")):
+        frappe.msgprint(
+            _("Overlap is selected, but the working time of this record does not overlap any other record on this day."),
+            indicator="orange",
+            alert=True
+        )
+
+
+def audit_time_overlaps(from_date, to_date):
+    """
+    Audit attendance working times for a date range in one streaming pass.
+
+    Rows are streamed ordered by employee, so only one employee's intervals
+    are held in memory at a time.
+
+    Args:
+        from_date: First attendance date
+        to_date: Last attendance date
+
+    Yields:
+        dict: Finding with issue ("unflagged_overlap" or "flag_without_overlap"),
+            employee, attendance and, for overlaps, the overlapped record
+    """
+    rows = stream_rows(
+        """
+        select name, employee, attendance_date, in_time, out_time, custom_overlap, creation
+        from `tabAttendance`
+        where attendance_date between %(from_date)s and %(to_date)s
+            and docstatus != 2
+            and in_time is not null
+            and out_time is not null
+        order by employee, in_time
+        """,
+        {"from_date": getdate(from_date), "to_date": getdate(to_date)}
+    )
+
+    employee = None
+    intervals = []
+
+    for row in rows:
+        if row.employee != employee:
+            yield from _audit_employee(intervals)
+            employee = row.employee
+            intervals = []
+
+        intervals.append({
+            "name": row.name,
+            "employee": row.employee,
+            "attendance_date": row.attendance_date,
+            "start": row.in_time,
+            "end": row.out_time,
+            "custom_overlap": cint(row.custom_overlap),
+            "creation": row.creation
+        })
+
+    yield from _audit_employee(intervals)
+
+
+def _audit_employee(intervals):
+    """Findings for the intervals of one employee."""
+    if not intervals:
+        return
+
+    pairs, overlapping = sweep_intervals(intervals)
+
+    for earlier, later in pairs:
+        # The record created last is the additional one that needs the flag
+        record, other = (later, earlier) if later["creation"] >= earlier["creation"] else (earlier, later)
+        if not record["custom_overlap"]:
+            yield {
+                "issue": "unflagged_overlap",
+                "employee": record["employee"],
+                "attendance": record["name"],
+                "attendance_date": str(record["attendance_date"]),
+                "overlaps": other["name"]
+            }
+
+    for interval in intervals:
+        if interval["custom_overlap"] and interval["name"] not in overlapping:
+            yield {
+                "issue": "flag_without_overlap",
+                "employee": interval["employee"],
+                "attendance": interval["name"],
+                "attendance_date": str(interval["attendance_date"]),
+                "overlaps": None
+            }
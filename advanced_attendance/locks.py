@@ -0,0 +1,268 @@
+"""
+Employee-Day Locks
+
+Serializes writers of the same (employee, attendance_date) so the
+first-record/second-record rules see every committed record, while
+writers of different employee-days never wait for each other.
+
+Locks are held until the end of the transaction:
+- MariaDB: named locks (GET_LOCK), released after commit or rollback
+- PostgreSQL: transaction-level advisory locks, released by the database
+- Tests: an in-process stand-in based on threading locks
+
+Once a key is locked, its records are counted with a read-committed read,
+which sees records committed after the transaction started and bypasses
+the occupancy counters, which are only updated after commit. The read
+takes no row or gap locks: the named lock already serializes writers of
+the same employee-day, and gap locks on empty employee-days would also
+block inserts of unrelated employee-days in the same index gap.
+
+job_lock() holds a session-wide lock for a whole background job, for
+jobs that must not run twice at the same time.
+
+Enable with the site config key `advanced_attendance_employee_day_locks: 1`.
+The wait time is set with `advanced_attendance_lock_timeout` (seconds,
+default 10).
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+DEFAULT_LOCK_TIMEOUT = 10
+
+# Poll interval while waiting for a PostgreSQL advisory lock
+ADVISORY_LOCK_POLL = 0.05
+
+
+class LocalLockRegistry:
+    """In-process stand-in for database locks, used in tests."""
+
+    def __init__(self):
+        self.guard = threading.Lock()
+        self.locks = {}
+
+    def acquire(self, lock_name, timeout):
+        with self.guard:
+            lock = self.locks.setdefault(lock_name, threading.Lock())
+
+        if timeout <= 0:
+            return lock.acquire(blocking=False)
+
+        return lock.acquire(timeout=timeout)
+
+    def release(self, lock_name):
+        lock = self.locks.get(lock_name)
+        if lock and lock.locked():
+            lock.release()
+
+
+_local_registry = LocalLockRegistry()
+
+
+def is_employee_day_locking_enabled():
+    """Check whether employee-day locks are enabled for this site."""
+    return bool(cint(frappe.conf.get("advanced_attendance_employee_day_locks")))
+
+
+def get_lock_timeout():
+    return cint(frappe.conf.get("advanced_attendance_lock_timeout")) or DEFAULT_LOCK_TIMEOUT
+
+
+def get_lock_name(employee, attendance_date):
+    """
+    Name of the lock of one employee-day.
+
+    Named locks are server-wide, so the database name is part of the key.
+    Hashed to stay within the 64 character limit of GET_LOCK.
+    """
+    key = f"{frappe.conf.db_name}|{employee}|{getdate(attendance_date)}"
+    return "aa_" + hashlib.sha1(key.encode()).hexdigest()
+
+
+def get_job_lock_name(job):
+    """Name of the session lock of a background job, see job_lock."""
+    return "aa_" + hashlib.sha1(f"{frappe.conf.db_name}|job|{job}".encode()).hexdigest()
+
+
+def get_advisory_key(lock_name):
+    """Signed 64-bit key for pg_advisory_xact_lock."""
+    return int.from_bytes(bytes.fromhex(lock_name[3:19]), "big", signed=True)
+
+
+def is_employee_day_locked(employee, attendance_date):
+    """Check whether the current transaction holds the lock of an employee-day."""
+    return get_lock_name(employee, attendance_date) in get_held_locks()
+
+
+def get_held_locks():
+    """Lock names held by the current transaction."""
+    if not hasattr(frappe.local, "employee_day_locks"):
+        frappe.local.employee_day_locks = set()
+
+    return frappe.local.employee_day_locks
+
+
+def lock_employee_days(keys, timeout=None):
+    """
+    Lock employee-days until the end of the current transaction.
+
+    Keys are locked in sorted order, so writers locking several keys
+    cannot deadlock each other. Keys already held are skipped.
+
+    Args:
+        keys: Iterable of (employee, attendance_date)
+        timeout: Seconds to wait per key, defaults to the site setting
+
+    Raises:
+        frappe.DocumentLockedError: A key stayed locked for longer than timeout
+    """
+    timeout = timeout or get_lock_timeout()
+    held = get_held_locks()
+
+    for employee, attendance_date in sorted({(e, str(getdate(d))) for e, d in keys}):
+        lock_name = get_lock_name(employee, attendance_date)
+        if lock_name in held:
+            continue
+
+        if not _acquire(lock_name, timeout):
+            frappe.throw(
+                _("Attendance of employee {0} on {1} is being saved by another user. Please try again.").format(
+                    employee, frappe.format(attendance_date, {"fieldtype": "Date"})
+                ),
+                exc=frappe.DocumentLockedError,
+                title=_("Attendance Locked")
+            )
+
+        if not held:
+            # First lock of this transaction: release everything when it ends
+            frappe.db.after_commit.add(release_employee_days)
+            frappe.db.after_rollback.add(release_employee_days)
+
+        held.add(lock_name)
+
+
+def _acquire(lock_name, timeout):
+    if frappe.flags.in_test:
+        return _local_registry.acquire(lock_name, timeout)
+
+    if frappe.db.db_type == "postgres":
+        key = get_advisory_key(lock_name)
+        deadline = time.monotonic() + timeout
+        while not frappe.db.sql("select pg_try_advisory_xact_lock(%s)", key)[0][0]:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(ADVISORY_LOCK_POLL)
+        return True
+
+    return cint(frappe.db.sql("select get_lock(%s, %s)", (lock_name, timeout))[0][0]) == 1
+
+
+def release_employee_days():
+    """Release all employee-day locks of the finished transaction."""
+    held = get_held_locks()
+
+    for lock_name in held:
+        if frappe.flags.in_test:
+            _local_registry.release(lock_name)
+        elif frappe.db.db_type != "postgres":
+            # Advisory xact locks are released by PostgreSQL itself
+            frappe.db.sql("select release_lock(%s)", lock_name)
+
+    held.clear()
+
+
+def get_read_committed_prefix():
+    """
+    Prefix running one statement at READ COMMITTED.
+
+    A read-committed statement sees the latest committed records instead
+    of the transaction's snapshot, without taking any locks. PostgreSQL
+    runs every statement at READ COMMITTED already.
+    """
+    if frappe.db.db_type == "postgres":
+        return ""
+
+    return "set statement tx_isolation = 'READ-COMMITTED' for "
+
+
+def count_locked_attendance(keys, exclude=None):
+    """
+    Count non-cancelled attendance per employee-day, reading committed records.
+
+    Sees the latest committed records instead of the transaction's
+    snapshot, without locking rows or gaps. Call after lock_employee_days,
+    which keeps other writers of the keys out until this transaction ends.
+
+    Args:
+        keys: Iterable of (employee, attendance_date)
+        exclude: Name of a record not to count, e.g. the one being saved
+
+    Returns:
+        dict: (employee, date str) -> count, 0 for keys without records
+    """
+    keys = {(employee, str(getdate(attendance_date))) for employee, attendance_date in keys}
+    counts = dict.fromkeys(keys, 0)
+    if not keys:
+        return counts
+
+    # Exact employee-day pairs, not the employees x dates cross product
+    ordered = sorted(keys)
+    pairs = ", ".join(["(%s, %s)"] * len(ordered))
+
+    rows = frappe.db.sql(
+        f"""
+        {get_read_committed_prefix()}select employee, attendance_date, count(*)
+        from `tabAttendance`
+        where (employee, attendance_date) in ({pairs})
+            and docstatus != 2
+            and name != %s
+        group by employee, attendance_date
+        """,
+        [value for key in ordered for value in key] + [exclude or ""]
+    )
+
+    for employee, attendance_date, count in rows:
+        key = (employee, str(getdate(attendance_date)))
+        if key in counts:
+            counts[key] = cint(count)
+
+    return counts
+
+
+@contextmanager
+def job_lock(job):
+    """
+    Hold a session-wide lock for the duration of a background job.
+
+    Unlike employee-day locks, the lock survives the commits of the job,
+    so a job committing per chunk stays the only one running on the site.
+    The lock is not waited for.
+
+    Yields:
+        bool: False if another worker holds the lock
+    """
+    lock_name = get_job_lock_name(job)
+
+    if frappe.flags.in_test:
+        acquired = _local_registry.acquire(lock_name, 0)
+    elif frappe.db.db_type == "postgres":
+        acquired = bool(frappe.db.sql("select pg_try_advisory_lock(%s)", get_advisory_key(lock_name))[0][0])
+    else:
+        acquired = cint(frappe.db.sql("select get_lock(%s, 0)", lock_name)[0][0]) == 1
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            if frappe.flags.in_test:
+                _local_registry.release(lock_name)
+            elif frappe.db.db_type == "postgres":
+                frappe.db.sql("select pg_advisory_unlock(%s)", get_advisory_key(lock_name))
+            else:
+                frappe.db.sql("select release_lock(%s)", lock_name)
@@ -0,0 +1,225 @@
+"""
+Validation Instrumentation
+
+Optional per-stage timing and query counting for attendance validation
+and salary base calculation. Each instrumented stage records its wall
+time and the number of database queries it ran. Totals are aggregated in
+the Frappe cache, so they cover every worker of the site, and are exposed
+in the Prometheus text format by get_metrics.
+
+Stages may nest, e.g. attendance.duplicate_check runs inside
+attendance.parent_validate, so stage times do not add up to a total.
+
+Enable with the site config key `advanced_attendance_instrumentation: 1`.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import frappe
+from frappe.utils import cint, flt
+
+# Cache key of the hash holding aggregated stage totals
+METRICS_KEY = "advanced_attendance:stage_metrics"
+
+# Totals recorded per stage: (field suffix, metric name, help text)
+STAGE_METRICS = (
+    ("calls", "advanced_attendance_stage_calls_total", "Number of executions of the stage."),
+    ("seconds", "advanced_attendance_stage_seconds_total", "Wall time spent in the stage, in seconds."),
+    ("queries", "advanced_attendance_stage_queries_total", "Database queries run by the stage.")
+)
+
+
+class RedisMetricsStore:
+    """Stage totals in the site's Redis cache."""
+
+    def __init__(self):
+        self.cache = frappe.cache()
+        self.key = self.cache.make_key(METRICS_KEY)
+
+    def record(self, name, seconds, queries):
+        pipeline = self.cache.pipeline(transaction=False)
+        pipeline.hincrby(self.key, f"{name}|calls", 1)
+        pipeline.hincrbyfloat(self.key, f"{name}|seconds", seconds)
+        pipeline.hincrby(self.key, f"{name}|queries", queries)
+        pipeline.execute()
+
+    def get_all(self):
+        values = self.cache.execute_command("HGETALL", self.key) or {}
+        return {frappe.safe_decode(field): frappe.safe_decode(value) for field, value in values.items()}
+
+    def clear(self):
+        self.cache.execute_command("DEL", self.key)
+
+
+class LocalMetricsStore:
+    """In-process stand-in for RedisMetricsStore, used in tests."""
+
+    def __init__(self):
+        self.data = {}
+
+    def record(self, name, seconds, queries):
+        totals = self.data.setdefault(frappe.local.site, {})
+        totals[f"{name}|calls"] = totals.get(f"{name}|calls", 0) + 1
+        totals[f"{name}|seconds"] = totals.get(f"{name}|seconds", 0) + seconds
+        totals[f"{name}|queries"] = totals.get(f"{name}|queries", 0) + queries
+
+    def get_all(self):
+        return dict(self.data.get(frappe.local.site, {}))
+
+    def clear(self):
+        self.data.pop(frappe.local.site, None)
+
+
+_local_store = LocalMetricsStore()
+
+
+def get_metrics_store():
+    """Get the metrics store: Redis normally, a local stand-in in tests."""
+    if frappe.flags.in_test:
+        return _local_store
+
+    return RedisMetricsStore()
+
+
+def is_instrumentation_enabled():
+    """Check whether stage instrumentation is enabled for this site."""
+    return bool(cint(frappe.conf.get("advanced_attendance_instrumentation")))
+
+
+def install_query_hook():
+    """
+    Wrap frappe.db.sql of the current connection with the shared query hook.
+
+    The hook counts every query and passes it to the active statement
+    recorders, see record_statements. It is installed once per connection
+    and never removed: the query counter and the slow save profiler both
+    read it instead of replacing db.sql themselves, so neither can drop
+    the other's wrapper.
+
+    Returns:
+        The current database connection
+    """
+    db = frappe.local.db
+    if not getattr(db, "query_hook_installed", False):
+        original_sql = db.sql
+
+        def sql(query, *args, **kwargs):
+            db.query_count += 1
+            if not db.statement_recorders:
+                return original_sql(query, *args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return original_sql(query, *args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                for statements in db.statement_recorders:
+                    statements.append((str(query), elapsed_ms))
+
+        db.query_count = 0
+        db.statement_recorders = []
+        db.sql = sql
+        db.query_hook_installed = True
+
+    return db
+
+
+def get_query_count():
+    """Number of queries run on the current database connection."""
+    return install_query_hook().query_count
+
+
+@contextmanager
+def record_statements():
+    """
+    Record every SQL statement run in the block.
+
+    Yields:
+        list: (query, milliseconds) per statement, filled as they run
+    """
+    db = install_query_hook()
+    statements = []
+    db.statement_recorders.append(statements)
+    try:
+        yield statements
+    finally:
+        db.statement_recorders = [recorder for recorder in db.statement_recorders if recorder is not statements]
+
+
+@contextmanager
+def stage(name):
+    """
+    Record wall time and query count of a block as stage `name`.
+
+    Does nothing unless instrumentation is enabled.
+    """
+    if not is_instrumentation_enabled():
+        yield
+        return
+
+    queries = get_query_count()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        get_metrics_store().record(name, elapsed, get_query_count() - queries)
+
+
+def instrument(name):
+    """Decorator recording a whole function or method as stage `name`."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus(totals):
+    """
+    Render aggregated stage totals in the Prometheus text format.
+
+    Args:
+        totals: dict of "stage|metric" -> value, as returned by the store
+
+    Returns:
+        str: Exposition text
+    """
+    stages = sorted({field.rsplit("|", 1)[0] for field in totals})
+    lines = []
+
+    for suffix, metric, help_text in STAGE_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name in stages:
+            value = flt(totals.get(f"{name}|{suffix}"))
+            value = f"{value:.6f}" if suffix == "seconds" else str(int(value))
+            lines.append(f'{metric}{{stage="{name}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+@frappe.whitelist()
+def get_metrics():
+    """Expose aggregated stage metrics in the Prometheus text format."""
+    from werkzeug.wrappers import Response
+
+    frappe.only_for("System Manager")
+
+    return Response(
+        render_prometheus(get_metrics_store().get_all()),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_metrics():
+    """Clear aggregated stage metrics."""
+    frappe.only_for("System Manager")
+    get_metrics_store().clear()
@@ -0,0 +1,316 @@
+"""
+Attendance Occupancy Counters
+
+Keeps a per-(employee, attendance_date) count of non-cancelled attendance
+records in the Frappe cache, so CustomAttendance can read the number of
+existing records in O(1) instead of running an SQL COUNT on every save.
+
+Counters are stored as one Redis hash per date (field = employee) and are
+maintained by Attendance doc events. Updates are applied after the
+transaction commits, so rolled back saves never change a counter. Until
+then they are kept as pending deltas of the transaction and added to
+reads, so a second insert in the same transaction sees the first.
+
+Counters are seeded lazily from the database on first read. A
+reconciliation job rebuilds them from the database for a date range and
+reports any drift.
+
+Counters can lag behind the database: a counter seeded while another
+transaction commits may miss its record, and reconciling may overwrite
+an increment committed while it counted, until the next reconcile. A
+counter is therefore never trusted on its own: a non-zero count is
+taken from the database, and a zero is confirmed with an indexed exists
+check before a record is treated as the first of its day.
+
+Off by default. Enable with the site config key
+`advanced_attendance_occupancy_cache: 1`.
+"""
+
+import frappe
+from frappe.utils import add_days, cint, date_diff, getdate, nowdate
+
+# Cache key for the hash holding counters of one date
+OCCUPANCY_KEY = "advanced_attendance:attendance_occupancy:{0}"
+
+# Counters expire if untouched, old dates are rarely validated again
+OCCUPANCY_TTL = 60 * 60 * 24 * 40
+
+# Only increment counters that were already seeded; a missing counter is
+# seeded from the database on the next read instead
+INCREMENT_IF_EXISTS = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+
+class RedisOccupancyStore:
+    """Occupancy counters in the site's Redis cache."""
+
+    def __init__(self):
+        self.cache = frappe.cache()
+
+    def _key(self, attendance_date):
+        return self.cache.make_key(OCCUPANCY_KEY.format(attendance_date))
+
+    def get(self, attendance_date, employee):
+        value = self.cache.execute_command("HGET", self._key(attendance_date), employee)
+        return None if value is None else cint(frappe.safe_decode(value))
+
+    def seed(self, attendance_date, employee, count):
+        key = self._key(attendance_date)
+        self.cache.execute_command("HSETNX", key, employee, count)
+        self.cache.execute_command("EXPIRE", key, OCCUPANCY_TTL)
+
+    def increment(self, attendance_date, employee, delta):
+        self.cache.eval(INCREMENT_IF_EXISTS, 1, self._key(attendance_date), employee, delta)
+
+    def get_all(self, attendance_date):
+        values = self.cache.execute_command("HGETALL", self._key(attendance_date)) or {}
+        return {
+            frappe.safe_decode(employee): cint(frappe.safe_decode(count))
+            for employee, count in values.items()
+        }
+
+    def replace(self, attendance_date, counts):
+        key = self._key(attendance_date)
+        self.cache.execute_command("DEL", key)
+        if counts:
+            mapping = [item for pair in counts.items() for item in pair]
+            self.cache.execute_command("HSET", key, *mapping)
+            self.cache.execute_command("EXPIRE", key, OCCUPANCY_TTL)
+
+
+class LocalOccupancyStore:
+    """In-process stand-in for RedisOccupancyStore, used in tests."""
+
+    def __init__(self):
+        self.data = {}
+
+    def _hash(self, attendance_date):
+        return self.data.setdefault((frappe.local.site, str(attendance_date)), {})
+
+    def get(self, attendance_date, employee):
+        return self._hash(attendance_date).get(employee)
+
+    def seed(self, attendance_date, employee, count):
+        self._hash(attendance_date).setdefault(employee, cint(count))
+
+    def increment(self, attendance_date, employee, delta):
+        counters = self._hash(attendance_date)
+        if employee in counters:
+            counters[employee] += cint(delta)
+
+    def get_all(self, attendance_date):
+        return dict(self._hash(attendance_date))
+
+    def replace(self, attendance_date, counts):
+        self.data[(frappe.local.site, str(attendance_date))] = dict(counts)
+
+
+_local_store = LocalOccupancyStore()
+
+
+def get_occupancy_store():
+    """Get the counter store: Redis normally, a local stand-in in tests."""
+    if frappe.flags.in_test:
+        return _local_store
+
+    return RedisOccupancyStore()
+
+
+def is_occupancy_cache_enabled():
+    """Check whether occupancy counters are enabled for this site."""
+    return bool(cint(frappe.conf.get("advanced_attendance_occupancy_cache")))
+
+
+def get_attendance_count(employee, attendance_date):
+    """
+    Get the number of non-cancelled attendance records for employee+date.
+
+    Reads the cached counter, seeding it from the database on a miss, plus
+    the pending deltas of the current transaction.
+
+    Returns:
+        int: Number of non-cancelled records, including the document being saved
+            if it is already stored
+    """
+    attendance_date = str(getdate(attendance_date))
+    store = get_occupancy_store()
+
+    count = store.get(attendance_date, employee)
+    if count is None:
+        count = frappe.db.count("Attendance", filters={
+            "employee": employee,
+            "attendance_date": attendance_date,
+            "docstatus": ["!=", 2]  # Exclude cancelled records
+        })
+        store.seed(attendance_date, employee, count)
+
+    return count + get_pending_deltas().get((employee, attendance_date), 0)
+
+
+def get_occupancy_key(doc):
+    """Get the (employee, date) key a document occupies, or None if it occupies none."""
+    if not doc or doc.docstatus == 2 or not doc.employee or not doc.attendance_date:
+        return None
+
+    return (doc.employee, str(getdate(doc.attendance_date)))
+
+
+def update_occupancy(doc, method=None):
+    """
+    Doc event hook keeping occupancy counters in sync with Attendance.
+
+    on_update runs on insert, save and submit: the document before save is
+    compared with the current one, so inserts add one, and changes of
+    employee or date move the record between counters.
+    on_cancel removes a record, and on_trash removes a deleted record that
+    was not cancelled.
+    """
+    if not is_occupancy_cache_enabled():
+        return
+
+    if method == "on_trash":
+        previous_key, current_key = get_occupancy_key(doc), None
+    else:
+        previous_key = get_occupancy_key(doc.get_doc_before_save())
+        current_key = get_occupancy_key(doc)
+
+    if previous_key == current_key:
+        return
+
+    deltas = []
+    if previous_key:
+        deltas.append((previous_key, -1))
+    if current_key:
+        deltas.append((current_key, 1))
+
+    queue_occupancy_deltas(deltas)
+
+
+def get_pending_deltas():
+    """Counter changes of the current transaction, applied when it commits."""
+    if getattr(frappe.local, "pending_occupancy_deltas", None) is None:
+        frappe.local.pending_occupancy_deltas = {}
+
+    return frappe.local.pending_occupancy_deltas
+
+
+def queue_occupancy_deltas(deltas):
+    """
+    Queue counter changes until the current transaction commits.
+
+    Args:
+        deltas: List of ((employee, date string), delta)
+    """
+    pending = get_pending_deltas()
+    if not pending:
+        # First change of this transaction
+        frappe.db.after_commit.add(apply_pending_deltas)
+        frappe.db.after_rollback.add(clear_pending_deltas)
+
+    for key, delta in deltas:
+        pending[key] = pending.get(key, 0) + delta
+
+
+def apply_pending_deltas():
+    pending = get_pending_deltas()
+    apply_occupancy_deltas(list(pending.items()))
+    pending.clear()
+
+
+def clear_pending_deltas():
+    get_pending_deltas().clear()
+
+
+def apply_occupancy_deltas(deltas):
+    """Apply counter changes, e.g. after the saving transaction commits."""
+    store = get_occupancy_store()
+    for (employee, attendance_date), delta in deltas:
+        store.increment(attendance_date, employee, delta)
+
+
+def reconcile_occupancy(from_date, to_date):
+    """
+    Rebuild occupancy counters from the database for a date range.
+
+    Args:
+        from_date: First date to rebuild
+        to_date: Last date to rebuild
+
+    Returns:
+        dict: Number of dates and counters checked, and a list of drifted
+            counters with their cached and actual values
+    """
+    from_date, to_date = getdate(from_date), getdate(to_date)
+
+    rows = frappe.get_all(
+        "Attendance",
+        filters={
+            "attendance_date": ["between", [from_date, to_date]],
+            "docstatus": ["!=", 2]  # Exclude cancelled records
+        },
+        fields=["employee", "attendance_date", "count(name) as attendance_count"],
+        group_by="employee, attendance_date"
+    )
+
+    actual_by_date = {}
+    for row in rows:
+        actual_by_date.setdefault(str(getdate(row.attendance_date)), {})[row.employee] = cint(row.attendance_count)
+
+    store = get_occupancy_store()
+    drift = []
+    checked = 0
+
+    for offset in range(date_diff(to_date, from_date) + 1):
+        attendance_date = str(add_days(from_date, offset))
+        actual = actual_by_date.get(attendance_date, {})
+        cached = store.get_all(attendance_date)
+
+        # Only seeded counters can drift; unseeded ones are read from the database
+        for employee, cached_count in cached.items():
+            checked += 1
+            actual_count = actual.get(employee, 0)
+            if cached_count != actual_count:
+                drift.append({
+                    "employee": employee,
+                    "attendance_date": attendance_date,
+                    "cached": cached_count,
+                    "actual": actual_count
+                })
+
+        store.replace(attendance_date, actual)
+
+    return {
+        "dates": date_diff(to_date, from_date) + 1,
+        "checked": checked,
+        "drift": drift
+    }
+
+
+def reconcile_recent_occupancy():
+    """Scheduled job: rebuild counters for the last week and log any drift."""
+    if not is_occupancy_cache_enabled():
+        return
+
+    result = reconcile_occupancy(add_days(nowdate(), -7), nowdate())
+    if result["drift"]:
+        frappe.log_error(
+            title="Attendance occupancy drift",
+            message=frappe.as_json(result)
+        )
+
+
+@frappe.whitelist()
+def reconcile_attendance_occupancy(from_date, to_date):
+    """
+    Rebuild occupancy counters for a date range and report drift.
+
+    Args:
+        from_date: First date to rebuild
+        to_date: Last date to rebuild
+    """
+    frappe.only_for("System Manager")
+    return reconcile_occupancy(from_date, to_date)
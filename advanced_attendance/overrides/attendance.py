@@ -9,12 +9,32 @@ attendance records for the same employee on the same day when:
 Business Rules:
 1. FIRST attendance for employee+date: Allowed WITHOUT selecting overlap options
 2. SECOND+ attendance: MUST select exactly ONE of: Overlap OR Additional Attendance
-3. Validation does NOT block workflow state transitions
+3. SECOND+ attendance whose in/out time overlaps another record: MUST select Overlap
+4. Validation does NOT block workflow state transitions
 """
 
+from functools import partial
+
 import frappe
 from frappe import _
-from frappe.utils import cint
+from frappe.utils import cint, format_date, getdate
+
+from advanced_attendance.archive import validate_archived_period
+from advanced_attendance.batch_cache import get_batch_cache
+from advanced_attendance.intervals import validate_time_overlap
+from advanced_attendance.locks import (
+    count_locked_attendance,
+    is_employee_day_locked,
+    is_employee_day_locking_enabled,
+    lock_employee_days
+)
+from advanced_attendance.metrics import instrument, stage
+from advanced_attendance.occupancy import (
+    get_attendance_count,
+    get_occupancy_key,
+    is_occupancy_cache_enabled
+)
+from advanced_attendance.profiler import profiled
 
 # Try to import from hrms first, fall back to erpnext
 try:
@@ -26,6 +46,16 @@ except ImportError:
         from frappe.model.document import Document as Attendance
 
 
+# Fields that decide whether a save is a pure workflow transition.
+# If ANY of these changed, the overlap/duplicate rules must run again.
+VALIDATION_RELEVANT_FIELDS = (
+    'employee',
+    'attendance_date',
+    'custom_overlap',
+    'custom_additional_attendance'
+)
+
+
 class CustomAttendance(Attendance):
     """
     Custom Attendance class that allows duplicate attendance records
@@ -37,25 +67,38 @@ class CustomAttendance(Attendance):
     - Workflow transitions are never blocked
     """
 
+    @profiled('attendance.validate')
     def validate(self):
         """Override validate to conditionally skip duplicate check and enforce business rules."""
+        # Start every save with a fresh validation context so values loaded
+        # by a previous save of this object are never reused
+        self.reset_validation_context()
+        
+        # Archived dates are closed, their records are no longer in Attendance
+        validate_archived_period(self)
+        
         # Always run our custom overlap/additional attendance validation first
         # This runs BEFORE any duplicate check to provide clear messaging
-        self.validate_overlap_additional_attendance()
+        with stage('attendance.overlap_rules'):
+            self.validate_overlap_additional_attendance()
+        
+        with stage('attendance.time_overlap'):
+            self.validate_time_overlap()
         
         # Check if we should skip duplicate validation (for second+ records)
         skip_duplicate_check = self.should_skip_duplicate_check()
         
-        if skip_duplicate_check:
-            # Run individual validation methods without duplicate check
-            self.validate_attendance_date()
-            self.set_roster_and_shift()
-            self.validate_employee()
-            self.validate_working_hours()
-            # Skip validate_duplicate_record from parent
-        else:
-            # Run the standard validation including duplicate check
-            super().validate()
+        with stage('attendance.parent_validate'):
+            if skip_duplicate_check:
+                # Run individual validation methods without duplicate check
+                self.validate_attendance_date()
+                self.set_roster_and_shift()
+                self.validate_employee()
+                self.validate_working_hours()
+                # Skip validate_duplicate_record from parent
+            else:
+                # Run the standard validation including duplicate check
+                super().validate()
     
     def validate_overlap_additional_attendance(self):
         """
@@ -77,19 +120,9 @@ class CustomAttendance(Attendance):
         if not self.employee or not self.attendance_date:
             return
         
-        # Build filters to count existing attendance records
-        filters = {
-            'employee': self.employee,
-            'attendance_date': self.attendance_date,
-            'docstatus': ['!=', 2]  # Exclude cancelled records
-        }
-        
-        # Exclude current document when editing
-        if self.name and not self.is_new():
-            filters['name'] = ['!=', self.name]
-        
-        # Count existing non-cancelled attendance records
-        existing_count = frappe.db.count('Attendance', filters=filters)
+        # Count existing non-cancelled attendance records (shared with
+        # validate_duplicate_record through the validation context)
+        existing_count = self.get_existing_attendance_count()
         
         if existing_count == 0:
             # First record for this employee+date - no validation needed
@@ -97,27 +130,35 @@ class CustomAttendance(Attendance):
             return
         
         # Second or more record - must select exactly ONE option
-        overlap = cint(getattr(self, 'custom_overlap', 0))
-        additional = cint(getattr(self, 'custom_additional_attendance', 0))
+        error = get_overlap_rule_error(
+            existing_count,
+            getattr(self, 'custom_overlap', 0),
+            getattr(self, 'custom_additional_attendance', 0),
+            self.attendance_date
+        )
         
-        # Check for mutual exclusivity (both selected is invalid)
-        if overlap and additional:
-            frappe.throw(
-                _('Please select <b>ONLY ONE</b> option: either "Overlap" OR "Additional Attendance", not both.'),
-                title=_('Invalid Selection')
-            )
+        if error:
+            frappe.throw(error.message, title=error.title)
+    
+    def validate_time_overlap(self):
+        """
+        Check that working times overlapping a same-day record are flagged as Overlap.
         
-        # Check that at least one is selected for second+ record
-        if not overlap and not additional:
-            frappe.throw(
-                _('An attendance record already exists for this employee on <b>{0}</b>.<br><br>'
-                  'To create another attendance record, please select <b>one</b> of the following options:<br>'
-                  '• <b>Overlap</b> - for overlapping time periods on the same day<br>'
-                  '• <b>Additional Attendance</b> - for an additional record on the same day'
-                ).format(frappe.format(self.attendance_date, {'fieldtype': 'Date'})),
-                title=_('Attendance Already Exists')
-            )
+        Only runs when other records exist for employee+date, so the first
+        record of a day never costs an extra query.
+        """
+        if self.is_workflow_transition_only():
+            return
+        
+        if not self.employee or not self.attendance_date:
+            return
+        
+        if not self.get_existing_attendance_count():
+            return
+        
+        validate_time_overlap(self)
     
+    @instrument('attendance.workflow_check')
     def is_workflow_transition_only(self):
         """
         Check if this save is purely a workflow state transition.
@@ -133,43 +174,228 @@ class CustomAttendance(Attendance):
         if self.is_new():
             return False
         
+        # Bulk approval already classified this record against its stored state
+        if self.flags.workflow_transition_only:
+            return True
+        
         # Check if document has a workflow applied
         if not self.meta.get_workflow():
             return False
         
-        try:
-            # Get the previous document state from database
-            previous_doc = frappe.get_doc('Attendance', self.name)
+        context = self.get_validation_context()
+        if context.workflow_transition_only is None:
+            context.workflow_transition_only = self._compare_with_previous_values()
+        
+        return context.workflow_transition_only
+    
+    def _compare_with_previous_values(self):
+        """Return True if none of the validation-relevant fields changed."""
+        previous_values = self.get_previous_values()
+        
+        if previous_values is None:
+            # Document doesn't exist in DB yet (edge case)
+            return False
+        
+        for field in VALIDATION_RELEVANT_FIELDS:
+            current_value = normalize_value(getattr(self, field, None))
+            previous_value = normalize_value(previous_values.get(field))
             
-            # Fields that are relevant to our validation
-            # If ANY of these changed, it's not a workflow-only transition
-            validation_relevant_fields = [
-                'employee',
-                'attendance_date', 
-                'custom_overlap',
-                'custom_additional_attendance'
-            ]
+            if current_value != previous_value:
+                # A validation-relevant field changed - run validation
+                return False
+        
+        # Only workflow_state (or other non-relevant fields) changed
+        return True
+    
+    def load_doc_before_save(self, *args, **kwargs):
+        """
+        Use the stored state preloaded by a bulk path instead of reloading it.
+        
+        Bulk approval fetches the stored rows of a whole batch in one query
+        and passes each one here, so saving does not query the record again.
+        The modified check of the save still locks and verifies the row.
+        """
+        preloaded = self.flags.pop('preloaded_doc_before_save', None)
+        if preloaded is not None:
+            self._doc_before_save = preloaded
+            return
+        
+        super().load_doc_before_save(*args, **kwargs)
+    
+    def reset_validation_context(self):
+        """Drop the per-save validation context."""
+        self.flags.validation_context = None
+    
+    def get_validation_context(self):
+        """
+        Get the per-save validation context.
+        
+        The context holds the sibling attendance count and the previous values
+        of the validation-relevant fields, so that validate,
+        validate_duplicate_record and before_submit share a single lookup of
+        each instead of querying the database again.
+        
+        The context is keyed on employee, attendance date and name. If any of
+        them change after it was built, a fresh context is started.
+        
+        Returns:
+            frappe._dict: The validation context for the current save
+        """
+        key = (
+            self.employee,
+            str(getdate(self.attendance_date)) if self.attendance_date else None,
+            None if self.is_new() else self.name
+        )
+        
+        context = self.flags.validation_context
+        if context is None or context.key != key:
+            # Bulk paths resolve counts for a whole batch up front
+            existing_count = self.flags.pop('preloaded_attendance_count', None)
             
-            for field in validation_relevant_fields:
-                current_value = getattr(self, field, None)
-                previous_value = getattr(previous_doc, field, None)
-                
-                # Normalize None and empty values
-                if current_value in (None, '', 0):
-                    current_value = None
-                if previous_value in (None, '', 0):
-                    previous_value = None
-                    
-                if current_value != previous_value:
-                    # A validation-relevant field changed - run validation
-                    return False
+            # A count preloaded under the employee-day lock, which this
+            # transaction still holds, already saw every committed record
+            locked = bool(
+                existing_count is not None
+                and self.employee
+                and self.attendance_date
+                and is_employee_day_locked(self.employee, self.attendance_date)
+            )
             
-            # Only workflow_state (or other non-relevant fields) changed
-            return True
+            context = frappe._dict(
+                key=key,
+                existing_count=existing_count,
+                previous_values=None,
+                previous_values_loaded=False,
+                workflow_transition_only=None,
+                locked=locked
+            )
+            self.flags.validation_context = context
+        
+        return context
+    
+    def get_existing_attendance_count(self):
+        """
+        Count other non-cancelled attendance records for employee+date.
+        
+        Returns:
+            int: Number of existing records, excluding the current document
+        """
+        context = self.get_validation_context()
+        
+        if is_employee_day_locking_enabled():
+            if not context.locked:
+                # Preloaded and cached counts may miss records committed by
+                # concurrent writers, so count again once the key is locked
+                context.existing_count = self._get_locked_attendance_count()
+                context.locked = True
             
-        except frappe.DoesNotExistError:
-            # Document doesn't exist in DB yet (edge case)
-            return False
+            return context.existing_count
+        
+        if context.existing_count is None:
+            context.existing_count = self._get_cached_attendance_count()
+        
+        if context.existing_count is None:
+            filters = {
+                'employee': self.employee,
+                'attendance_date': self.attendance_date,
+                'docstatus': ['!=', 2]  # Exclude cancelled records
+            }
+            
+            # Exclude current document when editing
+            if self.name and not self.is_new():
+                filters['name'] = ['!=', self.name]
+            
+            context.existing_count = frappe.db.count('Attendance', filters=filters)
+        
+        return context.existing_count
+    
+    def _get_locked_attendance_count(self):
+        """
+        Lock the employee-day and count other records, reading committed records.
+        
+        The lock is held until the transaction ends, so concurrent writers
+        of the same employee-day wait and then see this record.
+        
+        Returns:
+            int: Count of other non-cancelled records
+        """
+        key = (self.employee, str(getdate(self.attendance_date)))
+        lock_employee_days([key])
+        
+        exclude = None if self.is_new() else self.name
+        return count_locked_attendance([key], exclude=exclude)[key]
+    
+    def _get_cached_attendance_count(self):
+        """
+        Read the sibling count from the occupancy counters.
+        
+        The counter includes this document if it is already stored for the
+        same employee+date, in which case it is subtracted. A non-zero count
+        is left to the database. A zero is confirmed with an indexed exists
+        check, since a counter seeded while another writer committed can
+        stay at a stale zero until reconciled.
+        
+        Returns:
+            int | None: 0 if no other record exists, else None
+        """
+        if not is_occupancy_cache_enabled():
+            return None
+        
+        count = get_attendance_count(self.employee, self.attendance_date)
+        
+        if not self.is_new():
+            previous_doc = self.get_doc_before_save()
+            if not previous_doc:
+                # Validated outside of a save - fall back to the database
+                return None
+            
+            if get_occupancy_key(previous_doc) == get_occupancy_key(self):
+                count -= 1
+        
+        if count > 0:
+            return None
+        
+        filters = {
+            'employee': self.employee,
+            'attendance_date': self.attendance_date,
+            'docstatus': ['!=', 2]  # Exclude cancelled records
+        }
+        if not self.is_new():
+            filters['name'] = ['!=', self.name]
+        
+        return None if frappe.db.exists('Attendance', filters) else 0
+    
+    def get_previous_values(self):
+        """
+        Get the stored values of the validation-relevant fields.
+        
+        Uses the document loaded by Frappe before save when available, and
+        otherwise fetches only the relevant columns instead of the full
+        document.
+        
+        Returns:
+            frappe._dict | None: Previous values, or None for unsaved documents
+        """
+        context = self.get_validation_context()
+        
+        if not context.previous_values_loaded:
+            previous_doc = self.get_doc_before_save()
+            if previous_doc:
+                previous_values = frappe._dict(
+                    {field: previous_doc.get(field) for field in VALIDATION_RELEVANT_FIELDS}
+                )
+            else:
+                previous_values = frappe.db.get_value(
+                    'Attendance',
+                    self.name,
+                    list(VALIDATION_RELEVANT_FIELDS),
+                    as_dict=True
+                )
+            
+            context.previous_values = previous_values
+            context.previous_values_loaded = True
+        
+        return context.previous_values
     
     def should_skip_duplicate_check(self):
         """
@@ -204,11 +430,73 @@ class CustomAttendance(Attendance):
         if hasattr(super(), 'validate_employee'):
             super().validate_employee()
     
+    def validate_employee_status(self):
+        """
+        Reject attendance for an Inactive employee, as hrms does.
+        
+        Bulk paths read the employee preloaded for the batch instead of
+        querying it per record. The rule itself is unchanged.
+        """
+        if not hasattr(super(), 'validate_employee_status'):
+            return
+        
+        cache = get_batch_cache()
+        if not cache:
+            super().validate_employee_status()
+            return
+        
+        employee = cache.get_employee(self.employee)
+        if employee and employee.status == 'Inactive':
+            frappe.throw(_('Cannot mark attendance for an Inactive employee {0}').format(self.employee))
+    
+    def check_leave_record(self):
+        """
+        Set the leave details and status from approved leave, as hrms does.
+        
+        Bulk paths read the leave applications preloaded for the batch
+        instead of querying them per record. The rules are unchanged.
+        """
+        if not hasattr(super(), 'check_leave_record'):
+            return
+        
+        cache = get_batch_cache()
+        if not cache:
+            super().check_leave_record()
+            return
+        
+        leave_records = cache.get_leave_records(self.employee, self.attendance_date)
+        for leave in leave_records:
+            self.leave_type = leave.leave_type
+            self.leave_application = leave.name
+            if leave.half_day_date and getdate(leave.half_day_date) == getdate(self.attendance_date):
+                self.status = 'Half Day'
+                frappe.msgprint(_('Employee {0} on Half day on {1}').format(
+                    self.employee, format_date(self.attendance_date)
+                ))
+            else:
+                self.status = 'On Leave'
+                frappe.msgprint(_('Employee {0} is on Leave on {1}').format(
+                    self.employee, format_date(self.attendance_date)
+                ))
+        
+        if self.status in ('On Leave', 'Half Day'):
+            if not leave_records:
+                frappe.msgprint(
+                    _('No leave record found for employee {0} on {1}').format(
+                        self.employee, format_date(self.attendance_date)
+                    ),
+                    alert=1
+                )
+        elif self.leave_type:
+            self.leave_type = None
+            self.leave_application = None
+    
     def validate_working_hours(self):
         """Validate working hours."""
         if hasattr(super(), 'validate_working_hours'):
             super().validate_working_hours()
     
+    @instrument('attendance.duplicate_check')
     def validate_duplicate_record(self):
         """
         Override the parent's duplicate record validation.
@@ -232,15 +520,7 @@ class CustomAttendance(Attendance):
             return
         
         # For first record on employee+date, allow without overlap flag
-        filters = {
-            'employee': self.employee,
-            'attendance_date': self.attendance_date,
-            'docstatus': ['!=', 2]  # Exclude cancelled
-        }
-        if self.name and not self.is_new():
-            filters['name'] = ['!=', self.name]
-        
-        existing_count = frappe.db.count('Attendance', filters=filters)
+        existing_count = self.get_existing_attendance_count()
         if existing_count == 0:
             # First record - no duplicate check needed
             return
@@ -249,6 +529,8 @@ class CustomAttendance(Attendance):
         if hasattr(super(), 'validate_duplicate_record'):
             super().validate_duplicate_record()
     
+    @profiled('attendance.before_submit')
+    @instrument('attendance.before_submit')
     def before_submit(self):
         """
         Hook called before document submission.
@@ -275,6 +557,63 @@ class CustomAttendance(Attendance):
             super().on_update()
 
 
+def get_overlap_rule_error(existing_count, overlap, additional, attendance_date):
+    """
+    Apply the first-record/second-record rules to a single record.
+    
+    Shared by CustomAttendance and the bulk paths, which evaluate many
+    records in memory against counts resolved for the whole batch.
+    
+    Args:
+        existing_count: Number of other non-cancelled records for employee+date
+        overlap: Value of custom_overlap
+        additional: Value of custom_additional_attendance
+        attendance_date: Attendance date, used in the error message
+    
+    Returns:
+        frappe._dict | None: title and message of the violation, or None if allowed
+    """
+    if not existing_count:
+        # First record for this employee+date - no option required
+        return None
+    
+    overlap = cint(overlap)
+    additional = cint(additional)
+    
+    # Check for mutual exclusivity (both selected is invalid)
+    if overlap and additional:
+        return frappe._dict(
+            title=_('Invalid Selection'),
+            message=_('Please select <b>ONLY ONE</b> option: either "Overlap" OR "Additional Attendance", not both.')
+        )
+    
+    # Check that at least one is selected for second+ record
+    if not overlap and not additional:
+        return frappe._dict(
+            title=_('Attendance Already Exists'),
+            message=_('An attendance record already exists for this employee on <b>{0}</b>.<br><br>'
+                      'To create another attendance record, please select <b>one</b> of the following options:<br>'
+                      '• <b>Overlap</b> - for overlapping time periods on the same day<br>'
+                      '• <b>Additional Attendance</b> - for an additional record on the same day'
+                      ).format(frappe.format(attendance_date, {'fieldtype': 'Date'}))
+        )
+    
+    return None
+
+
+def normalize_value(value):
+    """Treat None, empty string and 0 as the same "unset" value."""
+    if value in (None, '', 0):
+        return None
+    
+    # Dates may come back from the database as date objects and from
+    # the form as strings
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    
+    return value
+
+
 def allow_duplicate_attendance(doc, method=None):
     """
     Event hook to check and allow duplicate attendance.
@@ -282,3 +621,81 @@ def allow_duplicate_attendance(doc, method=None):
     """
     if doc.get('custom_overlap') or doc.get('custom_additional_attendance'):
         doc.flags.skip_duplicate_check = True
+
+
+# Cache of attendance preview windows, one hash per employee
+ATTENDANCE_PREVIEW_KEY = 'advanced_attendance:attendance_preview:{0}'
+ATTENDANCE_PREVIEW_TTL = 60 * 10
+
+ATTENDANCE_PREVIEW_FIELDS = [
+    'name',
+    'attendance_date',
+    'status',
+    'docstatus',
+    'custom_overlap',
+    'custom_additional_attendance'
+]
+
+
+@frappe.whitelist()
+def get_attendance_preview(employee, from_date, to_date):
+    """
+    Get an employee's attendance records for a date window in one call.
+    
+    Used by the Attendance form to decide client-side whether the overlap
+    options are required, without a count query on every field change.
+    Results are cached per employee and window, and dropped whenever an
+    Attendance record of the employee changes.
+    
+    Args:
+        employee: Employee ID
+        from_date: First date of the window
+        to_date: Last date of the window
+    
+    Returns:
+        list: Non-cancelled records with their overlap/additional flags and docstatus
+    """
+    frappe.has_permission('Attendance', 'read', throw=True)
+    frappe.has_permission('Employee', 'read', doc=employee, throw=True)
+    
+    from_date, to_date = str(getdate(from_date)), str(getdate(to_date))
+    cache = frappe.cache()
+    key = ATTENDANCE_PREVIEW_KEY.format(employee)
+    window = f'{from_date}|{to_date}'
+    
+    records = cache.hget(key, window)
+    if records is None:
+        records = frappe.get_all(
+            'Attendance',
+            filters={
+                'employee': employee,
+                'attendance_date': ['between', [from_date, to_date]],
+                'docstatus': ['!=', 2]  # Exclude cancelled records
+            },
+            fields=ATTENDANCE_PREVIEW_FIELDS,
+            order_by='attendance_date asc, creation asc'
+        )
+        cache.hset(key, window, records)
+        cache.expire(cache.make_key(key), ATTENDANCE_PREVIEW_TTL)
+    
+    return records
+
+
+def clear_attendance_preview(employees):
+    """Drop cached preview windows of the given employees."""
+    for employee in set(employees):
+        if employee:
+            frappe.cache().delete_value(ATTENDANCE_PREVIEW_KEY.format(employee))
+
+
+def clear_attendance_preview_cache(doc, method=None):
+    """Doc event hook: drop cached previews when an Attendance record changes."""
+    employees = [doc.employee]
+    
+    previous_doc = doc.get_doc_before_save()
+    if previous_doc:
+        employees.append(previous_doc.employee)
+    
+    # Clear after commit, so no request can cache the old state again
+    # between this save and its commit
+    frappe.db.after_commit.add(partial(clear_attendance_preview, employees))
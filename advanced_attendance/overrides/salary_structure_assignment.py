@@ -12,7 +12,12 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
+from advanced_attendance.metrics import instrument
+from advanced_attendance.profiler import profiled
 
+
+@profiled("salary_base.calculate")
+@instrument("salary_base.calculate")
 def calculate_base_from_settings(doc, method=None):
     """
     Calculate base from gross_pay using Settings configuration.
@@ -32,15 +37,14 @@ def calculate_base_from_settings(doc, method=None):
         doc: Salary Structure Assignment document
         method: Event method name (unused, required for hook signature)
     """
-    # Get settings (use cached single doc)
-    try:
-        settings = frappe.get_cached_doc("Salary Base Calculation Settings")
-    except (frappe.DoesNotExistError, ImportError):
-        # Settings not configured yet or DocType module misconfigured - skip calculation
+    if doc.flags.base_precomputed:
+        # Computed for the whole batch by salary_base.create_assignment_rows
         return
     
+    settings = get_base_settings()
+    
     # Check if feature is enabled
-    if not settings.get("enable_auto_base"):
+    if not settings or not settings.enabled:
         return
     
     # Get gross_pay from document (custom field)
@@ -50,34 +54,133 @@ def calculate_base_from_settings(doc, method=None):
     if not gross_pay:
         return
     
-    # Get divider from settings (default to 1.3 to avoid division by zero)
-    gross_divider = flt(settings.get("gross_divider")) or 1.3
+    # Set the base amount
+    doc.base = compute_base(
+        gross_pay,
+        doc.get("custom_minimum_base_amount"),
+        doc.get("custom_maximum_base_amount"),
+        settings
+    )
+
+
+# Shared stamp bumped whenever the Settings are saved
+SETTINGS_VERSION_KEY = "advanced_attendance:base_settings_version"
+
+# Process-local cache of resolved settings: site -> (version, settings)
+_settings_cache = {}
+
+
+def get_base_settings():
+    """
+    Resolve the Salary Base Calculation Settings used by the calculation.
+    
+    Resolved settings are cached in the worker process and reused as long as
+    the shared version stamp is unchanged. The stamp is read at most once
+    per request or job, so repeated validations cost no Redis round-trip,
+    while a save in any worker is picked up by the next request everywhere.
+    
+    Returns:
+        frappe._dict | None: enabled, gross_divider, default_min_base and
+            default_max_base, or None if the Settings are not available
+    """
+    version = get_base_settings_version()
+    cached = _settings_cache.get(frappe.local.site)
+    
+    if cached and cached[0] == version:
+        settings = cached[1]
+    else:
+        settings = load_base_settings()
+        _settings_cache[frappe.local.site] = (version, settings)
+    
+    # Callers may adjust the returned settings, e.g. for simulations
+    return frappe._dict(settings) if settings else None
+
+
+def load_base_settings():
+    """Load and resolve the Settings from the single doc."""
+    # Get settings (use cached single doc)
+    try:
+        settings = frappe.get_cached_doc("Salary Base Calculation Settings")
+    except (frappe.DoesNotExistError, ImportError):
+        # Settings not configured yet or DocType module misconfigured - skip calculation
+        return None
+    
+    return frappe._dict(
+        enabled=bool(settings.get("enable_auto_base")),
+        # Default to 1.3 to avoid division by zero
+        gross_divider=flt(settings.get("gross_divider")) or 1.3,
+        default_min_base=flt(settings.get("default_min_base")),
+        default_max_base=flt(settings.get("default_max_base"))
+    )
+
+
+def get_base_settings_version():
+    """Get the shared settings version stamp, read once per request or job."""
+    version = getattr(frappe.local, "base_settings_version", None)
+    
+    if version is None:
+        version = frappe.cache().get_value(SETTINGS_VERSION_KEY)
+        if version is None:
+            # Stamp missing (e.g. cache cleared) - start a new one so every
+            # worker reloads its copy
+            version = bump_base_settings_version()
+        frappe.local.base_settings_version = version
+    
+    return version
+
+
+def invalidate_base_settings():
+    """
+    Invalidate cached settings after the Settings are saved.
+    
+    The local copy is dropped immediately. The shared stamp is bumped only
+    after commit, otherwise another worker could reload the old values
+    before commit and keep them under the new stamp.
+    """
+    _settings_cache.pop(frappe.local.site, None)
+    frappe.db.after_commit.add(bump_base_settings_version)
+
+
+def bump_base_settings_version():
+    """Start a new settings version, reloading cached settings in every worker."""
+    version = frappe.generate_hash(length=12)
+    frappe.cache().set_value(SETTINGS_VERSION_KEY, version)
+    frappe.local.base_settings_version = version
+    
+    return version
+
+
+def compute_base(gross_pay, ssa_min_base, ssa_max_base, settings):
+    """
+    Calculate base for one assignment: base = gross_pay / gross_divider,
+    limited by the min/max (SSA values take priority over Settings defaults).
+    
+    Args:
+        gross_pay: Gross pay of the assignment
+        ssa_min_base: Minimum base from the assignment (0 = use default)
+        ssa_max_base: Maximum base from the assignment (0 = use default)
+        settings: Resolved settings from get_base_settings
+    
+    Returns:
+        float: The base value after applying limits
+    """
+    gross_divider = settings.gross_divider
     
     # Validate divider is not zero
     if gross_divider == 0:
         frappe.throw(_("Gross Divider cannot be zero in Salary Base Calculation Settings"))
     
     # Calculate base: gross_pay / gross_divider
-    calculated_base = flt(gross_pay / gross_divider, 2)
+    calculated_base = flt(flt(gross_pay) / gross_divider, 2)
     
     # Get min/max limits with priority:
     # 1. Values from Salary Structure Assignment (if provided)
     # 2. Default values from Settings
-    min_base = get_limit_value(
-        doc.get("custom_minimum_base_amount"),
-        settings.get("default_min_base")
-    )
-    
-    max_base = get_limit_value(
-        doc.get("custom_maximum_base_amount"),
-        settings.get("default_max_base")
-    )
+    min_base = get_limit_value(ssa_min_base, settings.default_min_base)
+    max_base = get_limit_value(ssa_max_base, settings.default_max_base)
     
     # Apply limits
-    final_base = apply_limits(calculated_base, min_base, max_base)
-    
-    # Set the base amount
-    doc.base = final_base
+    return apply_limits(calculated_base, min_base, max_base)
 
 
 def get_limit_value(ssa_value, settings_value):
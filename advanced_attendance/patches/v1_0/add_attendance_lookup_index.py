@@ -0,0 +1,8 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+from advanced_attendance.install import ensure_attendance_lookup_index
+
+
+def execute():
+    ensure_attendance_lookup_index()
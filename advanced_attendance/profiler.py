@@ -0,0 +1,129 @@
+"""
+Slow Save Profiling
+
+Opt-in sampled profiling of the attendance and salary base hot paths, for
+investigating single slow saves next to the aggregate stage metrics.
+
+A sampled call runs under cProfile with every SQL statement recorded. If
+it takes longer than the threshold, its call tree and statements are
+stored in Slow Save Log. Logs are written with deferred insert, so a save
+that fails and rolls back is still logged. Old logs are pruned through
+Log Settings.
+
+Configured in Advanced Attendance Settings: enable, sample rate and
+threshold.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import random
+import time
+from functools import wraps
+
+import frappe
+from frappe.utils import cint, flt
+
+from advanced_attendance.metrics import record_statements
+
+SETTINGS_DOCTYPE = "Advanced Attendance Settings"
+
+# Functions shown in the logged call tree
+CALL_TREE_LIMIT = 60
+
+# SQL statements kept per log, longer statements are truncated
+SQL_STATEMENT_LIMIT = 500
+SQL_TEXT_LIMIT = 2000
+
+
+def get_profiling_settings():
+    """Enabled profiling settings, or None when profiling is off."""
+    try:
+        settings = frappe.get_cached_doc(SETTINGS_DOCTYPE)
+    except (frappe.DoesNotExistError, ImportError):
+        # Settings not synced yet
+        return None
+
+    if not settings.get("enable_slow_save_profiling"):
+        return None
+
+    return frappe._dict(
+        sample_rate=flt(settings.profiling_sample_rate) / 100,
+        threshold_ms=cint(settings.slow_save_threshold_ms)
+    )
+
+
+def profiled(name):
+    """
+    Decorator profiling a sampled fraction of calls as `name`.
+
+    The first positional argument is logged as the reference document:
+    `self` for document methods, `doc` for doc event hooks. Calls nested in
+    a profiled call are not profiled on their own.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(frappe.local, "slow_save_profiling", False):
+                return fn(*args, **kwargs)
+
+            settings = get_profiling_settings()
+            if not settings or random.random() >= settings.sample_rate:
+                return fn(*args, **kwargs)
+
+            return _profile_call(name, settings, fn, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _profile_call(name, settings, fn, args, kwargs):
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler, e.g. Frappe's request
+        # profiling: run unprofiled rather than fail the save
+        return fn(*args, **kwargs)
+
+    frappe.local.slow_save_profiling = True
+    start = time.perf_counter()
+    # Statements come from the shared query hook, db.sql is never replaced here
+    with record_statements() as statements:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            frappe.local.slow_save_profiling = False
+
+            if duration_ms >= settings.threshold_ms:
+                log_slow_save(name, args[0] if args else None, duration_ms, profile, list(statements))
+
+
+def log_slow_save(name, doc, duration_ms, profile, statements):
+    """Queue a Slow Save Log entry for a slow profiled call."""
+    from frappe.deferred_insert import deferred_insert
+
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(CALL_TREE_LIMIT)
+
+    is_document = hasattr(doc, "doctype") and hasattr(doc, "name")
+    deferred_insert("Slow Save Log", [{
+        "method": name,
+        "reference_doctype": doc.doctype if is_document else None,
+        "reference_name": doc.name if is_document else None,
+        "duration_ms": flt(duration_ms, 1),
+        "query_count": len(statements),
+        "sql_time_ms": flt(sum(elapsed for _query, elapsed in statements), 1),
+        "call_tree": stream.getvalue(),
+        "sql_statements": json.dumps(
+            [
+                {"query": query[:SQL_TEXT_LIMIT], "ms": flt(elapsed, 2)}
+                for query, elapsed in statements[:SQL_STATEMENT_LIMIT]
+            ],
+            indent=1
+        )
+    }])
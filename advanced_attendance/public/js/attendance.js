@@ -22,14 +22,39 @@ frappe.ui.form.on('Attendance', {
         }
     },
 
+    onload: function (frm) {
+        advanced_attendance.check_duplicate_attendance(frm);
+    },
+
+    employee: function (frm) {
+        advanced_attendance.check_duplicate_attendance(frm);
+    },
+
+    attendance_date: function (frm) {
+        advanced_attendance.check_duplicate_attendance(frm);
+    },
+
     custom_overlap: function (frm) {
         advanced_attendance.update_overlap_indicator(frm);
         advanced_attendance.show_overlap_message(frm);
+        advanced_attendance.update_overlap_requirement(frm);
     },
 
     custom_additional_attendance: function (frm) {
         advanced_attendance.update_overlap_indicator(frm);
         advanced_attendance.show_overlap_message(frm);
+        advanced_attendance.update_overlap_requirement(frm);
+    },
+
+    validate: function (frm) {
+        // Same rule as the server, checked before the save round-trip
+        if (!advanced_attendance.get_existing_records(frm).length) {
+            return;
+        }
+
+        if (frm.doc.custom_overlap && frm.doc.custom_additional_attendance) {
+            frappe.throw(__('Please select ONLY ONE option: either "Overlap" OR "Additional Attendance", not both.'));
+        }
     }
 });
 
@@ -61,36 +86,90 @@ var advanced_attendance = {
     },
 
     /**
-     * Helper to check if duplicate attendance exists
+     * Load the employee's attendance for the month of the attendance date.
+     * Each employee+month window is fetched once per form and then reused,
+     * so changing fields does not send a request every time.
      */
     check_duplicate_attendance: function (frm) {
         if (!frm.doc.employee || !frm.doc.attendance_date) {
+            advanced_attendance.update_overlap_requirement(frm);
+            return;
+        }
+
+        const window = advanced_attendance.get_preview_window(frm);
+        frm.__attendance_preview = frm.__attendance_preview || {};
+
+        if (frm.__attendance_preview[window.key]) {
+            advanced_attendance.update_overlap_requirement(frm);
             return;
         }
 
         frappe.call({
-            method: 'frappe.client.get_count',
+            method: 'advanced_attendance.overrides.attendance.get_attendance_preview',
             args: {
-                doctype: 'Attendance',
-                filters: {
-                    employee: frm.doc.employee,
-                    attendance_date: frm.doc.attendance_date,
-                    name: ['!=', frm.doc.name || ''],
-                    docstatus: ['!=', 2]
-                }
+                employee: frm.doc.employee,
+                from_date: window.from_date,
+                to_date: window.to_date
             },
             callback: function (r) {
-                if (r.message && r.message > 0) {
-                    if (!frm.doc.custom_overlap && !frm.doc.custom_additional_attendance) {
-                        frappe.msgprint({
-                            title: __('Existing Attendance Found'),
-                            message: __('There are {0} existing attendance record(s) for this employee on {1}. Enable "Overlap" or "Additional Attendance" to create another record.',
-                                [r.message, frm.doc.attendance_date]),
-                            indicator: 'orange'
-                        });
-                    }
-                }
+                frm.__attendance_preview[window.key] = r.message || [];
+                advanced_attendance.update_overlap_requirement(frm);
             }
         });
+    },
+
+    /**
+     * Month window containing the attendance date
+     */
+    get_preview_window: function (frm) {
+        const from_date = frappe.datetime.month_start(frm.doc.attendance_date);
+        const to_date = frappe.datetime.month_end(frm.doc.attendance_date);
+
+        return {
+            from_date: from_date,
+            to_date: to_date,
+            key: [frm.doc.employee, from_date, to_date].join('|')
+        };
+    },
+
+    /**
+     * Other non-cancelled records for the same employee and date, from the
+     * loaded preview window
+     */
+    get_existing_records: function (frm) {
+        if (!frm.doc.employee || !frm.doc.attendance_date || !frm.__attendance_preview) {
+            return [];
+        }
+
+        const records = frm.__attendance_preview[advanced_attendance.get_preview_window(frm).key] || [];
+        return records.filter(function (record) {
+            return record.attendance_date === frm.doc.attendance_date && record.name !== frm.doc.name;
+        });
+    },
+
+    /**
+     * Show whether one of the overlap options is required for this record
+     */
+    update_overlap_requirement: function (frm) {
+        const existing = advanced_attendance.get_existing_records(frm);
+
+        // Only clear the intro set here, other scripts may have their own
+        if (frm.__overlap_intro) {
+            frm.set_intro('');
+            frm.__overlap_intro = false;
+        }
+
+        if (!existing.length || frm.doc.docstatus !== 0) {
+            return;
+        }
+
+        if (!frm.doc.custom_overlap && !frm.doc.custom_additional_attendance) {
+            frm.set_intro(
+                __('There are {0} existing attendance record(s) for this employee on {1}. Enable "Overlap" or "Additional Attendance" to create another record.',
+                    [existing.length, frappe.datetime.str_to_user(frm.doc.attendance_date)]),
+                'orange'
+            );
+            frm.__overlap_intro = true;
+        }
     }
 };
@@ -0,0 +1,345 @@
+"""
+Punch Ingestion
+
+Batched, idempotent intake of device punches and their coalescing into
+attendance.
+
+Ingestion only validates the shape of each punch and stores the batch
+with one INSERT that ignores idempotency keys already stored (unique
+index), so gateway retries never create a second punch. No attendance
+is saved in the request, which keeps its latency independent of the
+attendance validation cost.
+
+A single background worker then takes the pending punches of each
+employee, pairs them into IN/OUT sessions and writes one attendance
+record per session through the bulk marking path. Further records of a
+day get Overlap or Additional Attendance as needed (see
+checkin_attendance). Punches waiting for their OUT stay pending; punches
+that cannot be paired within MAX_SESSION_HOURS are skipped.
+
+Ingestion and the scheduler both only queue the worker under one job id,
+and the worker holds a job lock while it runs, so two workers never plan
+the same punches. Punches of an employee whose coalescing keeps failing
+are marked Failed after MAX_COALESCE_ATTEMPTS.
+"""
+
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, getdate, now, now_datetime
+
+from advanced_attendance.bulk_attendance import get_attendance_workflow, mark_attendance_rows
+from advanced_attendance.checkin_attendance import (
+    MAX_SESSION_HOURS,
+    get_existing_attendance,
+    plan_employee_records
+)
+from advanced_attendance.locks import job_lock
+
+PUNCH_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "idempotency_key",
+    "employee",
+    "punch_time",
+    "log_type",
+    "device_id",
+    "status"
+]
+
+# Largest batch accepted per request
+MAX_BATCH_SIZE = 5000
+
+# Pending punches coalesced per committed chunk
+COALESCE_CHUNK_SIZE = 5000
+
+# One coalescing job at a time; ingestion requests and the scheduler share it
+COALESCE_JOB_ID = "advanced_attendance:coalesce_punches"
+
+# Failed coalescing attempts before the punches of an employee are marked Failed
+MAX_COALESCE_ATTEMPTS = 3
+
+
+def check_punch(punch):
+    """Shape checks of one punch; no database access."""
+    if not punch.get("idempotency_key"):
+        return _("Idempotency key is required")
+
+    if len(str(punch.get("idempotency_key"))) > 140:
+        return _("Idempotency key can not be longer than 140 characters")
+
+    if not punch.get("employee"):
+        return _("Employee is required")
+
+    try:
+        punch_time = get_datetime(punch.get("punch_time"))
+    except Exception:
+        punch_time = None
+
+    if not punch_time:
+        return _("Invalid punch time {0}").format(punch.get("punch_time"))
+
+    if punch.get("log_type") not in (None, "", "IN", "OUT"):
+        return _("Log type must be IN or OUT")
+
+    return None
+
+
+def store_punches(punches):
+    """
+    Store a batch of punches, skipping idempotency keys already stored.
+
+    Returns:
+        list: One result per punch with idx, status (accepted, duplicate
+            or rejected) and error
+    """
+    results = []
+    accepted = {}
+
+    for idx, punch in enumerate(punches, start=1):
+        result = frappe._dict(idx=idx, status="rejected", error=check_punch(punch))
+        results.append(result)
+        if result.error:
+            continue
+
+        key = str(punch.get("idempotency_key"))
+        if key in accepted:
+            result.status = "duplicate"
+            continue
+
+        accepted[key] = (punch, result)
+
+    # Keys stored by earlier deliveries, one indexed lookup for the batch
+    stored = set(frappe.get_all(
+        "Attendance Punch",
+        filters={"idempotency_key": ["in", list(accepted)]},
+        pluck="idempotency_key"
+    )) if accepted else set()
+
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+    for key, (punch, result) in accepted.items():
+        if key in stored:
+            result.status = "duplicate"
+            continue
+
+        result.status = "accepted"
+        values.append((
+            frappe.generate_hash(length=12),
+            timestamp,
+            timestamp,
+            user,
+            user,
+            key,
+            punch.get("employee"),
+            get_datetime(punch.get("punch_time")),
+            punch.get("log_type") or None,
+            punch.get("device_id"),
+            "Pending"
+        ))
+
+    # Concurrent deliveries of the same key are dropped by the unique index
+    frappe.db.bulk_insert("Attendance Punch", PUNCH_FIELDS, values, ignore_duplicates=True)
+
+    return results
+
+
+def enqueue_coalesce():
+    """Queue the coalescing worker, unless it is already queued or running."""
+    frappe.enqueue(
+        "advanced_attendance.punches.coalesce_pending_punches",
+        queue="short",
+        job_id=COALESCE_JOB_ID,
+        deduplicate=True,
+        enqueue_after_commit=True
+    )
+
+
+def get_pending_punches(after_employee, limit):
+    """Pending punches of the employees after after_employee, sorted by employee and time."""
+    return frappe.db.sql(
+        """
+        select name, employee, punch_time as time, log_type
+        from `tabAttendance Punch`
+        where status = 'Pending' and employee > %(after_employee)s
+        order by employee, punch_time
+        limit %(limit)s
+        """,
+        {"after_employee": after_employee, "limit": limit},
+        as_dict=True
+    )
+
+
+def set_punch_status(names, status, attendance=None, error=None):
+    if names:
+        frappe.db.sql(
+            """
+            update `tabAttendance Punch`
+            set status = %(status)s, attendance = %(attendance)s, error = %(error)s,
+                modified = %(modified)s
+            where name in %(names)s
+            """,
+            {"names": names, "status": status, "attendance": attendance, "error": error, "modified": now()}
+        )
+
+
+def coalesce_punches(punches, submit=True):
+    """
+    Turn pending punches into attendance, one record per IN/OUT session.
+
+    Args:
+        punches: Pending punches sorted by employee and time
+
+    Returns:
+        dict: Number of created records and of punches left pending
+    """
+    logs_by_employee = {}
+    for punch in punches:
+        logs_by_employee.setdefault(punch.employee, []).append(punch)
+
+    dates = [getdate(punch.time) for punch in punches]
+    from_date, to_date = min(dates), max(dates)
+    existing = get_existing_attendance(list(logs_by_employee), from_date, to_date)
+
+    planned = []
+    for employee, logs in logs_by_employee.items():
+        planned.extend(plan_employee_records(employee, logs, existing, from_date, to_date))
+
+    results = mark_attendance_rows([row for row, _session in planned], submit=submit) if planned else []
+
+    handled = set()
+    created = 0
+    for (_row, session), result in zip(planned, results):
+        handled.update(session["logs"])
+        if result.valid:
+            created += 1
+            set_punch_status(session["logs"], "Processed", attendance=result.name)
+        else:
+            set_punch_status(session["logs"], "Failed", error=result.error)
+
+    # Unpaired punches wait for their pair until a session could no longer close
+    stale_before = now_datetime() - timedelta(hours=MAX_SESSION_HOURS)
+    left = [punch for punch in punches if punch.name not in handled]
+    set_punch_status([punch.name for punch in left if get_datetime(punch.time) < stale_before], "Skipped")
+
+    return {"created": created, "pending": sum(1 for punch in left if get_datetime(punch.time) >= stale_before)}
+
+
+def coalesce_pending_punches(chunk_size=COALESCE_CHUNK_SIZE):
+    """
+    Background job: coalesce all pending punches.
+
+    Walks the employees with pending punches once, in committed chunks.
+    Punches still waiting for their pair do not hold up later employees.
+    Returns at once if another worker is already coalescing.
+    """
+    with job_lock(COALESCE_JOB_ID) as acquired:
+        if not acquired:
+            return
+
+        _coalesce_pending_punches(cint(chunk_size) or COALESCE_CHUNK_SIZE)
+
+
+def _coalesce_pending_punches(chunk_size):
+    # Under a workflow the records are left as drafts for approval
+    submit = not get_attendance_workflow()
+    last_employee = ""
+
+    while True:
+        punches = get_pending_punches(last_employee, chunk_size)
+        if not punches:
+            break
+
+        if len(punches) == chunk_size:
+            # Keep every employee's punches in one chunk: leave the last,
+            # possibly cut off, employee for the next chunk unless it is
+            # the only one
+            trimmed = [punch for punch in punches if punch.employee != punches[-1].employee]
+            punches = trimmed or punches
+
+        try:
+            coalesce_punches(punches, submit=submit)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            # Retry employee by employee, so one failing employee does not
+            # hold up the rest of the chunk
+            coalesce_per_employee(punches, submit)
+
+        last_employee = punches[-1].employee
+
+
+def coalesce_per_employee(punches, submit):
+    """Coalesce a failed chunk one employee at a time, counting failed attempts."""
+    punches_by_employee = {}
+    for punch in punches:
+        punches_by_employee.setdefault(punch.employee, []).append(punch)
+
+    for employee, employee_punches in punches_by_employee.items():
+        try:
+            coalesce_punches(employee_punches, submit=submit)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            error = frappe.get_traceback()
+            record_failed_attempt([punch.name for punch in employee_punches], error)
+            frappe.db.commit()
+            frappe.log_error(title=f"Punch coalescing failed for employee {employee}", message=error)
+
+
+def record_failed_attempt(names, error):
+    """Count a failed attempt; punches out of attempts are marked Failed."""
+    frappe.db.sql(
+        """
+        update `tabAttendance Punch`
+        set attempts = coalesce(attempts, 0) + 1, modified = %(modified)s
+        where name in %(names)s
+        """,
+        {"names": names, "modified": now()}
+    )
+    frappe.db.sql(
+        """
+        update `tabAttendance Punch`
+        set status = 'Failed', error = %(error)s
+        where name in %(names)s and attempts >= %(max_attempts)s
+        """,
+        {"names": names, "error": error, "max_attempts": MAX_COALESCE_ATTEMPTS}
+    )
+
+
+@frappe.whitelist(methods=["POST"])
+def ingest_punches(punches):
+    """
+    Store a batch of device punches and queue their coalescing.
+
+    Args:
+        punches: JSON list of punches with idempotency_key, employee,
+            punch_time and optional log_type and device_id
+
+    Returns:
+        dict: Counts of accepted, duplicate and rejected punches, and the
+            errors of rejected ones
+    """
+    frappe.has_permission("Attendance Punch", "create", throw=True)
+
+    punches = frappe.parse_json(punches) or []
+    if not isinstance(punches, list):
+        frappe.throw(_("Punches must be a list"))
+
+    if len(punches) > MAX_BATCH_SIZE:
+        frappe.throw(_("At most {0} punches can be sent per request").format(MAX_BATCH_SIZE))
+
+    results = store_punches(punches)
+    if any(result.status == "accepted" for result in results):
+        enqueue_coalesce()
+
+    return {
+        "accepted": sum(1 for result in results if result.status == "accepted"),
+        "duplicate": sum(1 for result in results if result.status == "duplicate"),
+        "rejected": [result for result in results if result.status == "rejected"]
+    }
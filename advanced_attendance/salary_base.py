@@ -0,0 +1,543 @@
+"""
+Salary Base Batch Operations
+
+Batch counterparts of calculate_base_from_settings for work that spans
+many Salary Structure Assignments at once.
+
+Recompute: when Salary Base Calculation Settings change, base is
+recomputed for every draft assignment with a gross pay, in chunks.
+Submitted assignments, which salary slips may already have been computed
+from, are only included when Recompute Submitted Assignments is set, and
+only those effective on or after its date; a Version is recorded for each
+of them that changes. Each chunk is read with one query, computed with
+the same compute_base/get_limit_value/apply_limits semantics as a single
+save, and written back with one set-based UPDATE of the rows whose base
+changed.
+
+Simulate: shows the effect of candidate settings on the current
+assignment of every employee before they are saved. All assignments are
+loaded with one query and computed in memory with compute_bases.
+
+Create: inserts many new assignments, e.g. on onboarding or a pay
+revision. Settings are resolved once and base is computed for the whole
+batch with compute_bases, so validate does not compute it again per
+document. Rows are inserted in committed chunks and errors are reported
+per row.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, getdate, now, nowdate, strip_html
+
+from advanced_attendance.overrides.salary_structure_assignment import (
+    apply_limits,
+    compute_base,
+    get_base_settings,
+    get_limit_value
+)
+
+# Assignments read and updated per chunk
+RECOMPUTE_CHUNK_SIZE = 1000
+
+SETTINGS_DOCTYPE = "Salary Base Calculation Settings"
+
+# Number of buckets in the simulated base distribution
+SIMULATION_BUCKETS = 10
+
+# Assignments inserted per committed chunk when creating in bulk
+CREATE_CHUNK_SIZE = 200
+
+# Bulk creations larger than this are moved to a background job
+CREATE_ENQUEUE_THRESHOLD = 500
+
+
+def enqueue_base_recompute(submitted_from=None):
+    """
+    Queue a background recompute of base for all affected assignments.
+
+    Args:
+        submitted_from: Also recompute submitted assignments effective on
+            or after this date (optional)
+    """
+    frappe.enqueue(
+        "advanced_attendance.salary_base.recompute_assignment_bases",
+        queue="long",
+        timeout=3600,
+        enqueue_after_commit=True,
+        submitted_from=submitted_from
+    )
+
+
+def get_recompute_conditions(submitted_from=None):
+    """SQL conditions and values selecting the assignments affected by a settings change."""
+    conditions = "custom_gross_pay > 0 and (docstatus = 0"
+    values = {}
+
+    if submitted_from:
+        conditions += " or (docstatus = 1 and from_date >= %(submitted_from)s)"
+        values["submitted_from"] = getdate(submitted_from)
+
+    return conditions + ")", values
+
+
+def recompute_assignment_bases(chunk_size=RECOMPUTE_CHUNK_SIZE, submitted_from=None):
+    """
+    Recompute base for all affected Salary Structure Assignments.
+
+    Walks assignments in name order so each chunk is an index range scan,
+    commits after every chunk and publishes progress to the Settings form.
+
+    Args:
+        chunk_size: Number of assignments per chunk
+        submitted_from: Also recompute submitted assignments effective on
+            or after this date; drafts only when not set
+
+    Returns:
+        dict: Number of assignments processed and updated
+    """
+    settings = get_base_settings()
+    if not settings or not settings.enabled:
+        return {"processed": 0, "updated": 0}
+
+    chunk_size = cint(chunk_size) or RECOMPUTE_CHUNK_SIZE
+    conditions, values = get_recompute_conditions(submitted_from)
+    total = frappe.db.sql(
+        f"select count(*) from `tabSalary Structure Assignment` where {conditions}",
+        values
+    )[0][0]
+
+    processed = updated = 0
+    last_name = ""
+
+    while True:
+        rows = frappe.db.sql(
+            f"""
+            select name, docstatus, base, custom_gross_pay,
+                custom_minimum_base_amount, custom_maximum_base_amount
+            from `tabSalary Structure Assignment`
+            where {conditions} and name > %(last_name)s
+            order by name
+            limit %(limit)s
+            """,
+            dict(values, last_name=last_name, limit=chunk_size),
+            as_dict=True
+        )
+
+        if not rows:
+            break
+
+        changed = {}
+        versions = []
+        for row in rows:
+            base = compute_base(
+                row.custom_gross_pay,
+                row.custom_minimum_base_amount,
+                row.custom_maximum_base_amount,
+                settings
+            )
+            if flt(base, 2) != flt(row.base, 2):
+                changed[row.name] = base
+                if row.docstatus == 1:
+                    versions.append((row.name, row.base, base))
+
+        update_assignment_bases(changed)
+        record_base_versions(versions)
+        frappe.db.commit()
+
+        processed += len(rows)
+        updated += len(changed)
+        last_name = rows[-1].name
+
+        frappe.publish_progress(
+            processed * 100 / (total or processed),
+            title=_("Recomputing Salary Structure Assignment base"),
+            doctype=SETTINGS_DOCTYPE,
+            docname=SETTINGS_DOCTYPE,
+            description=_("{0} of {1} assignments processed").format(processed, total)
+        )
+
+    return {"processed": processed, "updated": updated}
+
+
+def update_assignment_bases(bases):
+    """
+    Write many base values with a single UPDATE statement.
+
+    Args:
+        bases: dict of assignment name -> new base
+    """
+    if not bases:
+        return
+
+    names = list(bases)
+    cases = " ".join(["when %s then %s"] * len(names))
+    values = [value for name in names for value in (name, bases[name])]
+
+    frappe.db.sql(
+        f"""
+        update `tabSalary Structure Assignment`
+        set base = case name {cases} end,
+            modified = %s,
+            modified_by = %s
+        where name in %s
+        """,
+        values + [now(), frappe.session.user, names]
+    )
+
+
+def record_base_versions(changes):
+    """
+    Record a Version for each recomputed submitted assignment, in one batched insert.
+
+    Args:
+        changes: List of (assignment name, old base, new base)
+    """
+    if not changes:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        "Version",
+        ["name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"],
+        [
+            (
+                frappe.generate_hash(length=10),
+                timestamp,
+                timestamp,
+                user,
+                user,
+                "Salary Structure Assignment",
+                name,
+                frappe.as_json({
+                    "added": [],
+                    "changed": [["base", flt(old_base, 2), flt(new_base, 2)]],
+                    "removed": [],
+                    "row_changed": [],
+                    "comment": _("Recomputed after {0} changed").format(_(SETTINGS_DOCTYPE))
+                })
+            )
+            for name, old_base, new_base in changes
+        ]
+    )
+
+
+def compute_bases(gross_pays, ssa_min_bases, ssa_max_bases, settings):
+    """
+    compute_base over many assignments.
+
+    Follows the same semantics as compute_base: base = gross / divider rounded
+    to 2 decimals, SSA limits take priority over Settings defaults, and a
+    limit of 0 means no limit.
+
+    Args:
+        gross_pays: Sequence of gross pay values
+        ssa_min_bases: Sequence of SSA minimum base values
+        ssa_max_bases: Sequence of SSA maximum base values
+        settings: Resolved settings from get_base_settings
+
+    Returns:
+        tuple: (bases, clamped_at_min, clamped_at_max) lists
+    """
+    if settings.gross_divider == 0:
+        frappe.throw(_("Gross Divider cannot be zero in Salary Base Calculation Settings"))
+
+    bases, at_min, at_max = [], [], []
+
+    for gross, ssa_min, ssa_max in zip(gross_pays, ssa_min_bases, ssa_max_bases):
+        calculated = flt(flt(gross) / settings.gross_divider, 2)
+        min_base = get_limit_value(ssa_min, settings.default_min_base)
+        max_base = get_limit_value(ssa_max, settings.default_max_base)
+
+        limited_by_min = apply_limits(calculated, min_base, 0)
+        base = apply_limits(calculated, min_base, max_base)
+
+        bases.append(base)
+        at_max.append(max_base > 0 and limited_by_min > max_base)
+        at_min.append(limited_by_min != calculated and not at_max[-1])
+
+    return bases, at_min, at_max
+
+
+def get_simulation_settings(gross_divider=None, default_min_base=None, default_max_base=None):
+    """Current settings with any candidate values applied on top."""
+    settings = get_base_settings() or frappe._dict(
+        enabled=False, gross_divider=1.3, default_min_base=0, default_max_base=0
+    )
+
+    if gross_divider not in (None, ""):
+        settings.gross_divider = flt(gross_divider)
+    if default_min_base not in (None, ""):
+        settings.default_min_base = flt(default_min_base)
+    if default_max_base not in (None, ""):
+        settings.default_max_base = flt(default_max_base)
+
+    return settings
+
+
+def get_current_assignments():
+    """
+    Current submitted assignment of each employee, in one window-function query.
+
+    The current assignment is the latest one in effect today; superseded
+    and future assignments are left out.
+
+    Returns:
+        list: (base, custom_gross_pay, custom_minimum_base_amount,
+            custom_maximum_base_amount) of assignments with a gross pay
+    """
+    return frappe.db.sql(
+        """
+        select base, custom_gross_pay, custom_minimum_base_amount, custom_maximum_base_amount
+        from (
+            select base, custom_gross_pay, custom_minimum_base_amount, custom_maximum_base_amount,
+                row_number() over (
+                    partition by employee
+                    order by from_date desc, creation desc
+                ) as assignment_rank
+            from `tabSalary Structure Assignment`
+            where docstatus = 1 and from_date <= %(today)s
+        ) assignments
+        where assignment_rank = 1 and custom_gross_pay > 0
+        """,
+        {"today": nowdate()}
+    )
+
+
+def simulate_base_settings(settings, buckets=SIMULATION_BUCKETS):
+    """
+    Simulate base for the current assignment of every employee with the given settings.
+
+    Args:
+        settings: Settings to simulate, see get_simulation_settings
+        buckets: Number of buckets in the distribution
+
+    Returns:
+        dict: Assignment count, clamped counts, current and simulated totals,
+            total delta and the distribution of simulated base
+    """
+    rows = get_current_assignments()
+
+    if not rows:
+        return {
+            "assignments": 0,
+            "clamped_at_min": 0,
+            "clamped_at_max": 0,
+            "current_total": 0,
+            "simulated_total": 0,
+            "total_delta": 0,
+            "distribution": []
+        }
+
+    current, gross, ssa_min, ssa_max = (list(column) for column in zip(*rows))
+    current = [flt(value) for value in current]
+    bases, at_min, at_max = compute_bases(
+        [flt(value) for value in gross],
+        [flt(value) for value in ssa_min],
+        [flt(value) for value in ssa_max],
+        settings
+    )
+
+    current_total = flt(sum(current), 2)
+    simulated_total = flt(sum(bases), 2)
+
+    return {
+        "assignments": len(rows),
+        "clamped_at_min": int(sum(at_min)),
+        "clamped_at_max": int(sum(at_max)),
+        "current_total": current_total,
+        "simulated_total": simulated_total,
+        "total_delta": flt(simulated_total - current_total, 2),
+        "distribution": get_distribution(bases, current, buckets)
+    }
+
+
+def get_distribution(bases, current, buckets=SIMULATION_BUCKETS):
+    """
+    Bucket simulated base values, with the current base counts per bucket.
+
+    Returns:
+        list: One dict per bucket with from, to, simulated and current counts
+    """
+    low = min(min(bases), min(current))
+    high = max(max(bases), max(current))
+    if high <= low:
+        edges = [low, low + 1]
+    else:
+        edges = [low + (high - low) * i / buckets for i in range(buckets + 1)]
+    simulated_counts = _histogram(bases, edges)
+    current_counts = _histogram(current, edges)
+
+    return [
+        {
+            "from": flt(edges[i], 2),
+            "to": flt(edges[i + 1], 2),
+            "simulated": simulated_counts[i],
+            "current": current_counts[i]
+        }
+        for i in range(len(edges) - 1)
+    ]
+
+
+def _histogram(values, edges):
+    counts = [0] * (len(edges) - 1)
+    width = edges[1] - edges[0]
+    for value in values:
+        index = min(int((value - edges[0]) / width), len(counts) - 1)
+        counts[index] += 1
+
+    return counts
+
+
+@frappe.whitelist()
+def simulate_base_calculation(gross_divider=None, default_min_base=None, default_max_base=None):
+    """
+    Simulate candidate Salary Base Calculation Settings without saving them.
+
+    Args:
+        gross_divider: Candidate divider (current value if not given)
+        default_min_base: Candidate default minimum (current value if not given)
+        default_max_base: Candidate default maximum (current value if not given)
+    """
+    frappe.has_permission(SETTINGS_DOCTYPE, "read", throw=True)
+    frappe.has_permission("Salary Structure Assignment", "read", throw=True)
+
+    settings = get_simulation_settings(gross_divider, default_min_base, default_max_base)
+    return simulate_base_settings(settings)
+
+
+def create_assignment_rows(rows, submit=False, chunk_size=CREATE_CHUNK_SIZE):
+    """
+    Create Salary Structure Assignments with base computed for the whole batch.
+
+    Each row is inserted inside its own savepoint so one failing row does
+    not roll back the rest of the chunk. Each chunk is committed on its own.
+
+    Args:
+        rows: List of assignment rows (dicts) with custom_gross_pay and
+            optional custom_minimum_base_amount / custom_maximum_base_amount
+        submit: Submit each assignment after insert
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        list: One result per row with idx, valid, name, base and error
+    """
+    chunk_size = cint(chunk_size) or CREATE_CHUNK_SIZE
+    bases = get_batch_bases(rows)
+    results = []
+
+    for start in range(0, len(rows), chunk_size):
+        for idx in range(start, min(start + chunk_size, len(rows))):
+            results.append(_create_assignment(rows[idx], idx + 1, bases[idx], submit))
+        frappe.db.commit()
+
+    return results
+
+
+def get_batch_bases(rows):
+    """
+    Compute base for every row in one pass with the settings resolved once.
+
+    Returns:
+        list: Base per row, or None where calculate_base_from_settings would
+            leave base unchanged (feature disabled or no gross pay)
+    """
+    settings = get_base_settings()
+    if not settings or not settings.enabled:
+        return [None] * len(rows)
+
+    indexes = [idx for idx, row in enumerate(rows) if flt(row.get("custom_gross_pay"))]
+    bases = [None] * len(rows)
+    if not indexes:
+        return bases
+
+    computed, _at_min, _at_max = compute_bases(
+        [rows[idx].get("custom_gross_pay") for idx in indexes],
+        [flt(rows[idx].get("custom_minimum_base_amount")) for idx in indexes],
+        [flt(rows[idx].get("custom_maximum_base_amount")) for idx in indexes],
+        settings
+    )
+
+    for idx, base in zip(indexes, computed):
+        bases[idx] = flt(base, 2)
+
+    return bases
+
+
+def _create_assignment(row, idx, base, submit):
+    result = frappe._dict(idx=idx, valid=False, name=None, base=base, error=None)
+
+    savepoint = f"ssa_create_{idx}"
+    frappe.db.savepoint(savepoint)
+    try:
+        doc = frappe.get_doc(dict(row, doctype="Salary Structure Assignment"))
+        if base is not None:
+            doc.base = base
+            # Base already computed for the batch, skip calculate_base_from_settings
+            doc.flags.base_precomputed = True
+
+        doc.insert()
+        if submit:
+            doc.submit()
+    except Exception as e:
+        frappe.db.rollback(save_point=savepoint)
+        frappe.clear_messages()
+        result.error = strip_html(str(e)) or _("Could not create row")
+        return result
+
+    result.update(valid=True, name=doc.name, base=doc.base)
+    return result
+
+
+@frappe.whitelist()
+def create_salary_structure_assignments(rows, submit=0, chunk_size=CREATE_CHUNK_SIZE):
+    """
+    Create Salary Structure Assignments in bulk.
+
+    Small batches run immediately and return per-row results. Large batches
+    run in a background job which publishes the results to the user when done.
+
+    Args:
+        rows: JSON list of assignment rows
+        submit: Submit each assignment after insert
+        chunk_size: Number of rows per chunk
+    """
+    frappe.has_permission("Salary Structure Assignment", "create", throw=True)
+    if cint(submit):
+        frappe.has_permission("Salary Structure Assignment", "submit", throw=True)
+
+    rows = frappe.parse_json(rows) or []
+    if not isinstance(rows, list):
+        frappe.throw(_("Rows must be a list of Salary Structure Assignments"))
+
+    rows = [frappe._dict(row) for row in rows]
+
+    if len(rows) <= CREATE_ENQUEUE_THRESHOLD:
+        return create_assignment_rows(rows, submit=cint(submit), chunk_size=chunk_size)
+
+    frappe.enqueue(
+        "advanced_attendance.salary_base.create_assignments_job",
+        queue="long",
+        timeout=3600,
+        rows=rows,
+        submit=cint(submit),
+        chunk_size=chunk_size,
+        user=frappe.session.user
+    )
+
+    return {"queued": True, "rows": len(rows)}
+
+
+def create_assignments_job(rows, submit=0, chunk_size=CREATE_CHUNK_SIZE, user=None):
+    """Background job for large bulk creations."""
+    results = create_assignment_rows(rows, submit=submit, chunk_size=chunk_size)
+
+    frappe.publish_realtime(
+        "advanced_attendance_ssa_create_complete",
+        {
+            "total": len(results),
+            "created": sum(1 for result in results if result.valid),
+            "errors": [result for result in results if not result.valid]
+        },
+        user=user
+    )
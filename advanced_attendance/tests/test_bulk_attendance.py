@@ -0,0 +1,128 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.bulk_attendance import import_attendance_rows, mark_attendance_rows
+from advanced_attendance.tests.utils import count_attendance, make_attendance, make_test_employee
+
+
+class IntegrationTestBulkMarkAttendance(IntegrationTestCase):
+    def setUp(self):
+        self.employee = make_test_employee("bulk_mark@example.com")
+        self.attendance_date = add_days(nowdate(), -5)
+
+    def mark(self, **values):
+        row = frappe._dict(employee=self.employee, attendance_date=self.attendance_date, status="Present")
+        row.update(values)
+        return row
+
+    def test_second_row_of_batch_needs_a_flag(self):
+        results = mark_attendance_rows([self.mark(), self.mark(status="Absent")], submit=True)
+
+        self.assertTrue(results[0].valid)
+        self.assertFalse(results[1].valid)
+        self.assertTrue(results[1].error)
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_flagged_second_row_is_inserted(self):
+        results = mark_attendance_rows([self.mark(), self.mark(custom_overlap=1)], submit=True)
+
+        self.assertTrue(all(result.valid for result in results))
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 2)
+        self.assertEqual(
+            count_attendance(
+                self.employee, self.attendance_date, custom_overlap=0, custom_additional_attendance=0
+            ),
+            1
+        )
+
+    def test_existing_record_blocks_unflagged_row(self):
+        make_attendance(self.employee, self.attendance_date)
+
+        results = mark_attendance_rows([self.mark()], submit=True)
+
+        self.assertFalse(results[0].valid)
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_marking_the_same_rows_again_adds_nothing(self):
+        rows = [self.mark(), self.mark(attendance_date=add_days(self.attendance_date, -1))]
+
+        first = mark_attendance_rows([frappe._dict(row) for row in rows], submit=True)
+        second = mark_attendance_rows([frappe._dict(row) for row in rows], submit=True)
+
+        self.assertTrue(all(result.valid for result in first))
+        self.assertFalse(any(result.valid for result in second))
+        for row in rows:
+            self.assertEqual(count_attendance(self.employee, row.attendance_date), 1)
+
+    def test_rows_are_checked_on_their_own(self):
+        results = mark_attendance_rows(
+            [
+                self.mark(attendance_date="not a date"),
+                self.mark(attendance_date=add_days(nowdate(), 1)),
+                self.mark(employee="HR-EMP-DOES-NOT-EXIST"),
+                self.mark()
+            ],
+            submit=True
+        )
+
+        self.assertEqual([result.valid for result in results], [False, False, False, True])
+        self.assertTrue(frappe.db.exists("Attendance", results[3].name))
+
+
+class IntegrationTestImportAttendance(IntegrationTestCase):
+    def setUp(self):
+        self.employee = make_test_employee("bulk_import@example.com")
+        self.attendance_date = add_days(nowdate(), -5)
+        # Chunks are committed on their own, keep them inside the test transaction
+        patcher = patch.object(frappe.db, "commit")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def row(self, **values):
+        row = frappe._dict(employee=self.employee, attendance_date=self.attendance_date, status="Present")
+        row.update(values)
+        return row
+
+    def test_duplicate_rows_across_chunks_are_rejected(self):
+        results = import_attendance_rows(
+            [self.row(), self.row(), self.row(custom_additional_attendance=1)],
+            submit=True,
+            chunk_size=1
+        )
+
+        self.assertEqual([result.valid for result in results], [True, False, True])
+        self.assertEqual(
+            count_attendance(
+                self.employee, self.attendance_date, custom_overlap=0, custom_additional_attendance=0
+            ),
+            1
+        )
+
+    def test_importing_the_same_rows_again_adds_nothing(self):
+        rows = [self.row(), self.row(attendance_date=add_days(self.attendance_date, -1))]
+
+        first = import_attendance_rows([frappe._dict(row) for row in rows], submit=True)
+        second = import_attendance_rows([frappe._dict(row) for row in rows], submit=True)
+
+        self.assertTrue(all(result.valid for result in first))
+        self.assertFalse(any(result.valid for result in second))
+        for row in rows:
+            self.assertEqual(count_attendance(self.employee, row.attendance_date), 1)
+
+    def test_invalid_date_only_fails_its_row(self):
+        results = import_attendance_rows([self.row(attendance_date="2026-13-45"), self.row()])
+
+        self.assertFalse(results[0].valid)
+        self.assertTrue(results[1].valid)
+
+    def test_import_flag_is_restored(self):
+        frappe.flags.in_import = False
+        import_attendance_rows([self.row()])
+
+        self.assertFalse(frappe.flags.in_import)
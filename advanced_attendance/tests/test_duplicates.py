@@ -0,0 +1,106 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.duplicates import count_duplicates, resolve_duplicates
+from advanced_attendance.tests.utils import count_attendance, make_attendance, make_test_employee
+
+
+class IntegrationTestDuplicateAttendance(IntegrationTestCase):
+    def setUp(self):
+        # Chunks are committed on their own, keep them inside the test transaction
+        patcher = patch.object(frappe.db, "commit")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.employee = make_test_employee("duplicates@example.com")
+        self.attendance_date = add_days(nowdate(), -7)
+
+    def make_duplicate(self, submit=True, **kwargs):
+        """A second, unflagged record, as left behind by older data or a past race."""
+        doc = make_attendance(self.employee, self.attendance_date, submit=submit, custom_overlap=1, **kwargs)
+        frappe.db.set_value("Attendance", doc.name, "custom_overlap", 0, update_modified=False)
+        return doc
+
+    def count_unflagged(self):
+        return count_attendance(
+            self.employee, self.attendance_date, custom_overlap=0, custom_additional_attendance=0
+        )
+
+    def test_duplicates_are_counted(self):
+        make_attendance(self.employee, self.attendance_date)
+        self.make_duplicate()
+        self.make_duplicate(submit=False)
+
+        counts = count_duplicates(self.attendance_date, self.attendance_date, self.employee)
+
+        self.assertEqual(counts.days, 1)
+        self.assertEqual(counts.extra_records, 2)
+
+    def test_flag_keeps_records_and_leaves_one_unflagged(self):
+        kept = make_attendance(self.employee, self.attendance_date)
+        extra = self.make_duplicate()
+
+        result = resolve_duplicates("flag", self.attendance_date, self.attendance_date, self.employee)
+
+        self.assertEqual(result["names"], [extra.name])
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 2)
+        self.assertEqual(self.count_unflagged(), 1)
+        self.assertEqual(frappe.db.get_value("Attendance", kept.name, "custom_additional_attendance"), 0)
+        self.assertEqual(frappe.db.get_value("Attendance", extra.name, "custom_additional_attendance"), 1)
+        self.assertTrue(frappe.db.exists("Version", {"ref_doctype": "Attendance", "docname": extra.name}))
+
+    def test_flag_marks_overlapping_sessions_as_overlap(self):
+        make_attendance(
+            self.employee, self.attendance_date,
+            in_time=f"{self.attendance_date} 09:00:00", out_time=f"{self.attendance_date} 17:00:00"
+        )
+        extra = self.make_duplicate(
+            in_time=f"{self.attendance_date} 16:00:00", out_time=f"{self.attendance_date} 20:00:00"
+        )
+
+        resolve_duplicates("flag", self.attendance_date, self.attendance_date, self.employee)
+
+        self.assertEqual(frappe.db.get_value("Attendance", extra.name, "custom_overlap"), 1)
+
+    def test_flag_checks_extras_against_each_other(self):
+        def working_time(start, end):
+            return {"in_time": f"{self.attendance_date} {start}", "out_time": f"{self.attendance_date} {end}"}
+
+        make_attendance(self.employee, self.attendance_date, **working_time("08:00:00", "12:00:00"))
+        first_extra = self.make_duplicate(**working_time("13:00:00", "17:00:00"))
+        second_extra = self.make_duplicate(**working_time("16:00:00", "20:00:00"))
+
+        resolve_duplicates("flag", self.attendance_date, self.attendance_date, self.employee, chunk_size=1)
+
+        self.assertEqual(frappe.db.get_value("Attendance", first_extra.name, "custom_additional_attendance"), 1)
+        self.assertEqual(frappe.db.get_value("Attendance", second_extra.name, "custom_overlap"), 1)
+
+    def test_cancel_keeps_the_submitted_record(self):
+        kept = make_attendance(self.employee, self.attendance_date)
+        submitted_extra = self.make_duplicate()
+        draft_extra = self.make_duplicate(submit=False)
+
+        result = resolve_duplicates("cancel", self.attendance_date, self.attendance_date, self.employee)
+
+        self.assertEqual(result["resolved"], 2)
+        self.assertFalse(result["failed"])
+        self.assertEqual(frappe.db.get_value("Attendance", kept.name, "docstatus"), 1)
+        self.assertEqual(frappe.db.get_value("Attendance", submitted_extra.name, "docstatus"), 2)
+        self.assertFalse(frappe.db.exists("Attendance", draft_extra.name))
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_resolving_again_changes_nothing(self):
+        make_attendance(self.employee, self.attendance_date)
+        self.make_duplicate()
+
+        resolve_duplicates("flag", self.attendance_date, self.attendance_date, self.employee)
+        result = resolve_duplicates("flag", self.attendance_date, self.attendance_date, self.employee)
+
+        self.assertEqual(result["resolved"], 0)
+        self.assertEqual(count_duplicates(self.attendance_date, self.attendance_date, self.employee).days, 0)
@@ -0,0 +1,44 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.tests.utils import make_attendance, make_test_employee
+
+
+class IntegrationTestTimeOverlap(IntegrationTestCase):
+    def setUp(self):
+        self.employee = make_test_employee("time_overlap@example.com")
+        self.attendance_date = add_days(nowdate(), -3)
+
+    def working_time(self, start, end):
+        return {
+            "in_time": f"{self.attendance_date} {start}",
+            "out_time": f"{self.attendance_date} {end}"
+        }
+
+    def test_later_overlapping_record_needs_overlap(self):
+        make_attendance(self.employee, self.attendance_date, **self.working_time("09:00:00", "17:00:00"))
+
+        with self.assertRaises(frappe.ValidationError):
+            make_attendance(
+                self.employee, self.attendance_date,
+                custom_additional_attendance=1, **self.working_time("16:00:00", "20:00:00")
+            )
+
+    def test_first_record_can_be_submitted_after_flagged_overlap(self):
+        first = make_attendance(
+            self.employee, self.attendance_date, submit=False, **self.working_time("09:00:00", "17:00:00")
+        )
+        make_attendance(
+            self.employee, self.attendance_date,
+            custom_overlap=1, **self.working_time("16:00:00", "20:00:00")
+        )
+
+        first.reload()
+        first.submit()
+
+        self.assertEqual(first.docstatus, 1)
+        self.assertEqual(first.custom_overlap, 0)
@@ -0,0 +1,101 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.locks import (
+    _local_registry,
+    count_locked_attendance,
+    get_lock_name,
+    is_employee_day_locked,
+    job_lock,
+    release_employee_days
+)
+from advanced_attendance.tests.utils import count_attendance, make_attendance, make_test_employee
+
+
+class IntegrationTestEmployeeDayLocks(IntegrationTestCase):
+    def setUp(self):
+        conf = patch.dict(
+            frappe.conf,
+            {"advanced_attendance_employee_day_locks": 1, "advanced_attendance_lock_timeout": 1}
+        )
+        conf.start()
+        self.addCleanup(conf.stop)
+        self.addCleanup(release_employee_days)
+
+        self.employee = make_test_employee("day_locks@example.com")
+        self.attendance_date = add_days(nowdate(), -4)
+
+    def test_save_locks_the_employee_day(self):
+        make_attendance(self.employee, self.attendance_date)
+
+        self.assertTrue(is_employee_day_locked(self.employee, self.attendance_date))
+        self.assertFalse(is_employee_day_locked(self.employee, add_days(self.attendance_date, -1)))
+
+    def test_unflagged_second_record_is_rejected_under_lock(self):
+        make_attendance(self.employee, self.attendance_date)
+
+        with self.assertRaises(frappe.ValidationError):
+            make_attendance(self.employee, self.attendance_date, status="Absent")
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_save_waits_for_another_writer(self):
+        # Another writer holds the employee-day
+        lock_name = get_lock_name(self.employee, self.attendance_date)
+        self.assertTrue(_local_registry.acquire(lock_name, 0))
+        self.addCleanup(_local_registry.release, lock_name)
+
+        with self.assertRaises(frappe.DocumentLockedError):
+            make_attendance(self.employee, self.attendance_date)
+
+        _local_registry.release(lock_name)
+        make_attendance(self.employee, self.attendance_date)
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_locked_count_only_counts_requested_pairs(self):
+        other_employee = make_test_employee("day_locks_other@example.com")
+        other_date = add_days(self.attendance_date, -1)
+        first = make_attendance(self.employee, self.attendance_date)
+        make_attendance(other_employee, other_date)
+
+        counts = count_locked_attendance([
+            (self.employee, self.attendance_date),
+            (self.employee, other_date),
+            (other_employee, self.attendance_date)
+        ])
+
+        self.assertEqual(counts, {
+            (self.employee, str(self.attendance_date)): 1,
+            (self.employee, str(other_date)): 0,
+            (other_employee, str(self.attendance_date)): 0
+        })
+        self.assertEqual(
+            count_locked_attendance([(self.employee, self.attendance_date)], exclude=first.name),
+            {(self.employee, str(self.attendance_date)): 0}
+        )
+
+    def test_release_frees_the_employee_day(self):
+        make_attendance(self.employee, self.attendance_date)
+        release_employee_days()
+
+        self.assertFalse(is_employee_day_locked(self.employee, self.attendance_date))
+        lock_name = get_lock_name(self.employee, self.attendance_date)
+        self.assertTrue(_local_registry.acquire(lock_name, 0))
+        _local_registry.release(lock_name)
+
+
+class IntegrationTestJobLock(IntegrationTestCase):
+    def test_job_runs_once_at_a_time(self):
+        with job_lock("test_job") as acquired:
+            self.assertTrue(acquired)
+            with job_lock("test_job") as acquired_again:
+                self.assertFalse(acquired_again)
+
+        with job_lock("test_job") as acquired:
+            self.assertTrue(acquired)
@@ -0,0 +1,92 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from advanced_attendance.occupancy import (
+    _local_store,
+    apply_pending_deltas,
+    clear_pending_deltas,
+    get_attendance_count,
+    get_pending_deltas,
+    reconcile_occupancy
+)
+from advanced_attendance.tests.utils import count_attendance, make_attendance, make_test_employee
+
+
+class IntegrationTestOccupancy(IntegrationTestCase):
+    def setUp(self):
+        conf = patch.dict(frappe.conf, {"advanced_attendance_occupancy_cache": 1})
+        conf.start()
+        self.addCleanup(conf.stop)
+        _local_store.data.clear()
+        self.addCleanup(_local_store.data.clear)
+        self.addCleanup(clear_pending_deltas)
+
+        self.employee = make_test_employee("occupancy@example.com")
+        self.attendance_date = str(add_days(nowdate(), -6))
+
+    def test_second_insert_in_the_same_transaction_is_rejected(self):
+        make_attendance(self.employee, self.attendance_date)
+
+        with self.assertRaises(frappe.ValidationError):
+            make_attendance(self.employee, self.attendance_date, status="Absent")
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_counter_changes_wait_for_commit(self):
+        self.assertEqual(get_attendance_count(self.employee, self.attendance_date), 0)
+
+        make_attendance(self.employee, self.attendance_date)
+
+        # Read through the pending delta, the stored counter is unchanged
+        self.assertEqual(get_attendance_count(self.employee, self.attendance_date), 1)
+        self.assertEqual(_local_store.get(self.attendance_date, self.employee), 0)
+
+        apply_pending_deltas()
+        self.assertEqual(_local_store.get(self.attendance_date, self.employee), 1)
+        self.assertFalse(get_pending_deltas())
+
+    def test_rolled_back_changes_are_dropped(self):
+        self.assertEqual(get_attendance_count(self.employee, self.attendance_date), 0)
+        make_attendance(self.employee, self.attendance_date)
+
+        clear_pending_deltas()
+
+        self.assertEqual(get_attendance_count(self.employee, self.attendance_date), 0)
+
+    def test_non_empty_counter_is_checked_against_the_database(self):
+        # A stale counter claiming a record must not block the first record
+        _local_store.seed(self.attendance_date, self.employee, 1)
+
+        make_attendance(self.employee, self.attendance_date)
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_stale_zero_counter_does_not_admit_a_duplicate(self):
+        make_attendance(self.employee, self.attendance_date)
+        # A counter seeded while the first record committed missed it
+        clear_pending_deltas()
+        _local_store.replace(self.attendance_date, {self.employee: 0})
+
+        with self.assertRaises(frappe.ValidationError):
+            make_attendance(self.employee, self.attendance_date, status="Absent")
+
+        self.assertEqual(count_attendance(self.employee, self.attendance_date), 1)
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        make_attendance(self.employee, self.attendance_date)
+        clear_pending_deltas()
+        _local_store.replace(self.attendance_date, {self.employee: 3})
+
+        result = reconcile_occupancy(self.attendance_date, self.attendance_date)
+
+        self.assertIn(
+            {"employee": self.employee, "attendance_date": self.attendance_date, "cached": 3, "actual": 1},
+            result["drift"]
+        )
+        self.assertEqual(_local_store.get(self.attendance_date, self.employee), 1)
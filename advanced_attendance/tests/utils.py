@@ -0,0 +1,42 @@
+# Copyright (c) 2026, eng.khalidselim and Contributors
+# See license.txt
+
+import frappe
+from frappe.utils import getdate
+
+TEST_COMPANY = "_Test Company"
+
+
+def make_test_employee(user, **kwargs):
+    """Active employee of the test company who joined long before any test date."""
+    from erpnext.setup.doctype.employee.test_employee import make_employee
+
+    kwargs.setdefault("company", TEST_COMPANY)
+    kwargs.setdefault("date_of_joining", getdate("2020-01-01"))
+    return make_employee(user, **kwargs)
+
+
+def make_attendance(employee, attendance_date, status="Present", submit=True, **kwargs):
+    """Insert (and submit) an Attendance record through the document path."""
+    doc = frappe.get_doc({
+        "doctype": "Attendance",
+        "employee": employee,
+        "attendance_date": attendance_date,
+        "status": status,
+        **kwargs
+    })
+    doc.insert()
+    if submit:
+        doc.submit()
+
+    return doc
+
+
+def count_attendance(employee, attendance_date, **filters):
+    """Number of non-cancelled records of an employee-day."""
+    return frappe.db.count("Attendance", {
+        "employee": employee,
+        "attendance_date": attendance_date,
+        "docstatus": ["!=", 2],
+        **filters
+    })
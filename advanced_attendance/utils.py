@@ -0,0 +1,27 @@
+# Copyright (c) 2026, eng.khalidselim and contributors
+# For license information, please see license.txt
+
+import frappe
+
+
+def stream_rows(query, values=None, as_dict=True):
+    """
+    Iterate over the rows of a query without loading them all into memory.
+
+    Uses a server-side (unbuffered) cursor where the database layer supports
+    it. While iterating, no other query may run on the same connection.
+
+    Args:
+        query: SQL query
+        values: Query parameters
+        as_dict: Yield rows as dicts instead of tuples
+    """
+    unbuffered_cursor = getattr(frappe.db, "unbuffered_cursor", None)
+
+    if unbuffered_cursor is None:
+        # Older Frappe versions: fall back to a buffered result
+        yield from frappe.db.sql(query, values, as_dict=as_dict)
+        return
+
+    with unbuffered_cursor():
+        yield from frappe.db.sql(query, values, as_dict=as_dict, as_iterator=True)